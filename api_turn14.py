@@ -31,7 +31,9 @@ class Program:
 
         # Подключение к базе данных
         db = database.Database(
-            option_files=cls.args.db_config
+            option_files=cls.args.db_config,
+            commit_policy=cls.args.commit_policy,
+            commit_rows=cls.args.commit_rows
         )
 
         # Создание директории для бэкапа
@@ -51,9 +53,11 @@ class Program:
 
         # Запросы к API
         if cls.args.all_items:
-            api.write_all_items_to_db()
+            with db.transaction():
+                api.write_all_items_to_db()
         if cls.args.all_item_data:
-            api.write_all_item_data_to_db()
+            with db.transaction():
+                api.write_all_item_data_to_db()
 
         print('Finished.')
 
@@ -87,6 +91,23 @@ class Program:
             action='store_true',
             default=False
         )
+        parser.add_argument(
+            '--commit-policy',
+            help='when database writes are committed: after every item (batch, default), after --commit-rows rows '
+                 'or once per request type (step)',
+            dest='commit_policy',
+            action='store',
+            choices=database.Database.COMMIT_POLICIES,
+            default=database.Database.COMMIT_BATCH
+        )
+        parser.add_argument(
+            '--commit-rows',
+            help='number of rows per transaction with --commit-policy rows (default: %(default)s)',
+            dest='commit_rows',
+            type=int,
+            action='store',
+            default=1000
+        )
         parser.add_argument(
             '-t', '--test',
             help='use sandbox (https://*******/)',
@@ -0,0 +1,127 @@
+"""
+Колоночный формат промежуточных (нормализованных) файлов поставщиков.
+
+Файл - zip-архив без сжатия, в котором:
+header.json - заголовки полей и количество записей,
+columns/<номер поля>.pickle - столбец в словарном кодировании: (список различных значений, массив их номеров).
+Каждый столбец хранится отдельно, поэтому читатель загружает только нужные ему столбцы,
+а повторяющиеся значения (бренды, цены, количества) хранятся один раз.
+"""
+
+import csv
+import json
+import pickle
+import zipfile
+from array import array
+from typing import Dict, Iterator, List, Tuple
+
+import constants
+
+EXTENSION = '.columns'
+HEADER_MEMBER = 'header.json'
+COLUMN_MEMBER_T = 'columns/{}.pickle'
+
+
+def _member(name: str) -> zipfile.ZipInfo:
+    """
+    Описание члена архива с постоянной датой, чтобы одинаковое содержимое давало одинаковый файл (и хеш файла)
+    """
+    return zipfile.ZipInfo(filename=name, date_time=(1980, 1, 1, 0, 0, 0))
+
+
+class ColumnarWriter:
+    """
+    Записывает строки (словари, как csv.DictWriter с extrasaction='ignore') в колоночный файл file.
+    Столбцы накапливаются в памяти и записываются при закрытии.
+    """
+
+    def __init__(self, file: str, fieldnames: List[str]):
+        self.file = file
+        self.fieldnames = list(fieldnames)
+        self.rows = 0
+        self._codes = [{} for _ in self.fieldnames]  # {значение: номер значения} для каждого столбца
+        self._columns = [array('I') for _ in self.fieldnames]  # номера значений для каждого столбца
+
+    def writerow(self, row: dict) -> None:
+        for field, codes, column in zip(self.fieldnames, self._codes, self._columns):
+            value = row.get(field)
+            if value is None:
+                value = ''  # как csv.DictWriter с restval=''
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(codes)
+            column.append(code)
+        self.rows += 1
+
+    def writerows(self, rows) -> None:
+        for row in rows:
+            self.writerow(row)
+
+    def close(self) -> None:
+        with zipfile.ZipFile(
+                file=self.file,
+                mode='w',
+                compression=zipfile.ZIP_STORED
+        ) as zf:
+            zf.writestr(_member(HEADER_MEMBER), json.dumps({'fieldnames': self.fieldnames, 'rows': self.rows}))
+            for i, (codes, column) in enumerate(zip(self._codes, self._columns)):
+                # словарь хранит значения в порядке добавления, т.е. в порядке номеров
+                zf.writestr(
+                    _member(COLUMN_MEMBER_T.format(i)),
+                    pickle.dumps((list(codes), column), pickle.HIGHEST_PROTOCOL)
+                )
+
+    def __enter__(self) -> 'ColumnarWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:  # при ошибке файл не записывается
+            self.close()
+
+
+def read_header(file: str) -> Tuple[List[str], int]:
+    """
+    Возвращает заголовки полей и количество записей колоночного файла file
+    """
+    with zipfile.ZipFile(file) as zf:
+        header = json.loads(zf.read(HEADER_MEMBER))
+    return header['fieldnames'], header['rows']
+
+
+def read_columns(file: str, fieldnames: List[str], start: int = 0, end: int = None) -> Dict[str, List[str]]:
+    """
+    Читает из колоночного файла file только столбцы fieldnames (записи с start по end не включительно)
+    :return: {поле: список значений}
+    """
+    with zipfile.ZipFile(file) as zf:
+        header = json.loads(zf.read(HEADER_MEMBER))
+        positions = {field: i for i, field in enumerate(header['fieldnames'])}
+        columns = {}
+        for field in fieldnames:
+            values, codes = pickle.loads(zf.read(COLUMN_MEMBER_T.format(positions[field])))
+            columns[field] = [values[code] for code in codes[start:end]]
+    return columns
+
+
+def iter_rows(file: str, fieldnames: List[str], start: int = 0, end: int = None) -> Iterator[Tuple[str, ...]]:
+    """
+    Возвращает записи колоночного файла file как кортежи значений полей fieldnames (в порядке fieldnames)
+    """
+    columns = read_columns(file, fieldnames, start, end)
+    return zip(*(columns[field] for field in fieldnames))
+
+
+def export_csv(file: str, file_out: str) -> None:
+    """
+    Выгружает колоночный файл file в csv-файл file_out в диалекте constants.PROJECT_STANDARD_DIALECT (для людей)
+    """
+    fieldnames, _ = read_header(file)
+    with open(
+            file=file_out,
+            mode='w',
+            newline='',
+            encoding='utf8'
+    ) as f_out:
+        writer = csv.writer(f_out, dialect=constants.PROJECT_STANDARD_DIALECT)
+        writer.writerow(fieldnames)
+        writer.writerows(iter_rows(file, fieldnames))
@@ -6,8 +6,11 @@ import csv
 import os
 import re
 from collections import namedtuple
-from string import punctuation, whitespace, printable
-from typing import FrozenSet
+from functools import lru_cache
+from typing import FrozenSet, List, Optional, Tuple
+
+# очистка значений вынесена в sanitizers; имена остаются доступными и как constants.*
+from sanitizers import delete_unprintable, normalize_brand, normalize_number
 
 
 class MyDialect(csv.Dialect):
@@ -23,23 +26,17 @@ class MyDialect(csv.Dialect):
 PROJECT_STANDARD_DIALECT = MyDialect()
 # =================================================================
 
-NUMBER_TRANSLATION_TABLE = str.maketrans('', '', punctuation + whitespace)
-
-BRAND_TRANSLATION_TABLE = str.maketrans(dict.fromkeys(punctuation + whitespace, ' '))
-
-p_unprintable = re.compile(r'[^{}]'.format(printable))
-
-
-def delete_unprintable(s: str) -> str:
-    return p_unprintable.sub('', s)
 
-
-def normalize_number(number: str) -> str:
-    return number.translate(NUMBER_TRANSLATION_TABLE).casefold()
-
-
-def normalize_brand(brand: str) -> str:
-    return ' '.join(brand.casefold().translate(BRAND_TRANSLATION_TABLE).split())
+@lru_cache(maxsize=None)
+def clean_brand(brand: str) -> Tuple[str, str]:
+    """
+    Возвращает (бренд без непечатаемых символов, нормализованный бренд).
+    Бренд повторяется во многих строках файла поставщика, поэтому результат вычисляется один раз на каждый различный
+    бренд (в каждом процессе; статистика - clean_brand.cache_info()), а одинаковые бренды всех item'ов становятся
+    одними и теми же объектами str
+    """
+    brand = delete_unprintable(brand)
+    return brand, normalize_brand(brand)
 
 
 # =================================================================
@@ -85,6 +82,9 @@ PARSE_SUPPLIERS_FILES_BRAND_NAME_OF_CHAIN_FILE_NECESSARY_FIELDS_SET = {'name', '
 
 DATABASE_DB_CONFIG_FILE = os.path.join(DATABASE_IN_DIR, 'db_config.cnf')
 
+PARSE_SUPPLIERS_FILES_DOWNLOAD_MANIFEST_FILE = os.path.join(PARSE_SUPPLIERS_FILES_TEMP_DIR, 'download_manifest.json')
+PARSE_SUPPLIERS_FILES_CONTENT_INDEX_FILE = os.path.join(PARSE_SUPPLIERS_FILES_BACKUP_DIR, 'content_index.json')
+
 SPECIAL_GET_ALL_WEATHER_TECH_ITEMS_OUT_FILE = os.path.join(
     SPECIAL_GET_ALL_WEATHER_TECH_ITEMS_OUT_DIR,
     'WeatherTech.csv'
@@ -131,6 +131,57 @@ SPECIAL_INPUT_TRANS_FILE_INTO_DB_IN_FILE_NECESSARY_FIELDS_SET = {
 
 SupplierBrandKey = namedtuple('SupplierBrandKey', ['name', 'supplier_id'])
 BrandCheck = namedtuple('BrandKey', ['name', 'check'])
+# item поставщика, разобранный из входного файла и сохранённый на диск для записи в базу данных:
+# brand_code - номер бренда в BrandDictionary поставщика или None, если item не записывается в supplier_item
+# (нет бренда или номера),
+# specific - значения полей supplier.SPECIFIC_FIELDS, extra - значения полей supplier.EXTRA_FIELDS
+ParsedItem = namedtuple('ParsedItem', ['brand_code', 'norm_mpn', 'prefix', 'mpn', 'number', 'specific', 'extra'])
+
+
+class BrandDictionary:
+    """
+    Словарь брендов одного поставщика: каждый различный бренд получает номер (code) в порядке появления,
+    и дальше item'ы несут этот номер вместо строки, а supplier_brand_id ищется один раз на номер (см. resolve)
+    """
+
+    def __init__(self) -> None:
+        self.codes = {}  # {brand: code}
+        self.brands = []  # [brand], индекс - code
+        self.lookups = 0  # количество вызовов encode
+
+    def encode(self, brand: str) -> int:
+        """
+        Возвращает номер бренда brand (новый бренд получает следующий номер)
+        """
+        self.lookups += 1
+        code = self.codes.get(brand)
+        if code is None:
+            code = self.codes[brand] = len(self.brands)
+            self.brands.append(brand)
+        return code
+
+    def resolve(self, supplier_brand_ids: dict, supplier_id: int) -> List[Optional[int]]:
+        """
+        Возвращает supplier_brand_id для каждого номера бренда (None, если бренда нет в supplier_brand_ids)
+        :param supplier_brand_ids: {(name, supplier_id): supplier_brand_id}
+        """
+        return [supplier_brand_ids.get((brand, supplier_id)) for brand in self.brands]
+
+    def __len__(self) -> int:
+        return len(self.brands)
+
+    def hit_rate(self) -> float:
+        """
+        Доля вызовов encode, которые нашли бренд в словаре
+        """
+        return 1 - len(self.brands) / self.lookups if self.lookups else 0.0
+
+    def __repr__(self) -> str:
+        return '<BrandDictionary: {} brands, {} lookups, hit rate {:.1%}>'.format(
+            len(self.brands), self.lookups, self.hit_rate()
+        )
+
+
 NOT_CHECKED_BRAND_P = 'NOT_CHECKED: {}'
 BRAND_CHAIN_P = re.compile(r'^(?P<supplier_brand_name>.+) \((?P<supplier_id>\d+)\)$')
 
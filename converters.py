@@ -3,6 +3,9 @@ Type convert function and value checker classes
 """
 import abc
 import logging
+import random
+from collections import namedtuple
+from operator import itemgetter
 
 
 def convert_with_check(
@@ -19,7 +22,8 @@ def convert_with_check(
         replace_if_checker_error=True,
         value_if_checker_error=None,
         warn_if_checker_error=False,
-        info=None
+        info=None,
+        field=None
 ):
     """
     Convert the value to output_type, and check it using checker
@@ -38,20 +42,19 @@ def convert_with_check(
     :param warn_if_checker_error:
     :return: value of type==output_type
     :param info: more info
+    :param field: the name of the value (e.g. the column), it's used only by ValidationCollector
     """
     if replace_if_false and not bool(value):
         if warn_if_false:
-            logging.warning(
-                'bool({!r})==False'.format(value) + (' <info: {}>'.format(info) if info else '')
-            )
+            report_failure('bool({!r})==False', value, info, field, FALSE_FAILURE, '')
         return value_if_false
     try:
         new_value = output_type(value)
     except ValueError:
         if warn_if_conversion_error:
-            logging.warning(
-                'Conversion the value of {!r} to type {} failed'.format(value, output_type) + (
-                    ' <info: {}>'.format(info) if info else '')
+            report_failure(
+                'Conversion the value of {{!r}} to type {} failed'.format(_escape(output_type)),
+                value, info, field, CONVERSION_FAILURE, getattr(output_type, '__name__', repr(output_type))
             )
         if replace_if_conversion_error:
             return value_if_conversion_error
@@ -61,9 +64,9 @@ def convert_with_check(
             checker(new_value)
         except ValueError:
             if warn_if_checker_error:
-                logging.warning(
-                    'Checking the value of {!r} with the checker {} failed'.format(new_value, checker) + (
-                        ' <info: {}>'.format(info) if info else '')
+                report_failure(
+                    'Checking the value of {{!r}} with the checker {} failed'.format(_escape(checker)),
+                    new_value, info, field, CHECKER_FAILURE, repr(checker)
                 )
             if replace_if_checker_error:
                 return value_if_checker_error
@@ -72,11 +75,166 @@ def convert_with_check(
             return new_value
 
 
+FALSE_FAILURE = 'false'  # bool(value)==False
+CONVERSION_FAILURE = 'conversion'  # output_type(value) raised ValueError
+CHECKER_FAILURE = 'checker'  # checker(value) raised ValueError
+
+_collector = None  # the active ValidationCollector (see ValidationCollector.__enter__)
+
+
+def report_failure(message: str, value, info, field, kind: str, detail: str) -> None:
+    """
+    Report the failure (the warning of convert_with_check or of the compiled fields) about the value:
+    log message.format(value) with the info or, if a ValidationCollector is active, pass it to the collector
+    """
+    if _collector is None:
+        logging.warning(message.format(value) + (' <info: {}>'.format(info) if info else ''))
+    else:
+        _collector.record(field, kind, detail, value, info)
+
+
+def _escape(obj) -> str:
+    """str(obj) for a format string"""
+    return str(obj).replace('{', '{{').replace('}', '}}')
+
+
+def active_collector():
+    """
+    Return the active ValidationCollector or None
+    """
+    return _collector
+
+
+class ValidationAbort(Exception):
+    """
+    Raised by ValidationCollector.add_rows when the failures per row exceed max_error_rate
+    """
+    pass
+
+
+class ValidationCollector:
+    """
+    Collects the failures of convert_with_check and of the compiled fields reported inside `with collector:`
+    instead of logging every one of them with its row: counts them per (field, kind, detail)
+    (detail is the checker of the checker failures and the output type of the conversion failures)
+    and keeps a bounded reservoir of sample values with their rows per key.
+    summary() makes one table of all the failures.
+    """
+
+    def __init__(self, name: str, *, samples: int = 3, max_error_rate: float = None, min_rows: int = 1000):
+        """
+        :param name: the name of the collected data (e.g. the supplier) for the summary
+        :param samples: the number of sample values kept per key
+        :param max_error_rate: add_rows raises ValidationAbort when there are more failures per row
+                               (None - never)
+        :param min_rows: the number of rows after which max_error_rate is checked
+        """
+        self.name = name
+        self.samples = samples
+        self.max_error_rate = max_error_rate
+        self.min_rows = min_rows
+        self.rows = 0
+        self.failures = 0
+        self.counts = {}  # {(field, kind, detail): count}
+        self.reservoirs = {}  # {(field, kind, detail): [(value, info)]}
+        self._random = random.Random(0)
+        self._previous = None
+
+    def record(self, field, kind: str, detail: str, value, info) -> None:
+        key = (field, kind, detail)
+        count = self.counts[key] = self.counts.get(key, 0) + 1
+        self.failures += 1
+        reservoir = self.reservoirs.setdefault(key, [])
+        if len(reservoir) < self.samples:
+            reservoir.append((value, info))
+        else:
+            i = self._random.randrange(count)  # every failure is kept with the same probability
+            if i < self.samples:
+                reservoir[i] = (value, info)
+
+    def add_rows(self, rows: int = 1) -> None:
+        """
+        Count the rows checked so far and raise ValidationAbort if there are too many failures per row
+        """
+        self.rows += rows
+        if self.max_error_rate is not None and self.rows >= self.min_rows \
+                and self.failures > self.max_error_rate * self.rows:
+            raise ValidationAbort(
+                '{}: {} failures in {} rows, more than {} per row'.format(
+                    self.name, self.failures, self.rows, self.max_error_rate
+                )
+            )
+
+    def merge(self, other: 'ValidationCollector') -> None:
+        """
+        Add the failures collected by other (e.g. in another process) to the failures of the collector
+        (the rows are counted by add_rows)
+        """
+        for key, other_count in other.counts.items():
+            count = self.counts.get(key, 0)
+            self.counts[key] = count + other_count
+            self.failures += other_count
+            # the reservoir of the union: each sample is taken from one of the reservoirs in proportion to the number
+            # of the failures it stands for
+            mine, theirs = list(self.reservoirs.get(key, ())), list(other.reservoirs[key])
+            merged = []
+            while len(merged) < self.samples and (mine or theirs):
+                if theirs and (not mine or self._random.random() * (count + other_count) < other_count):
+                    merged.append(theirs.pop())
+                else:
+                    merged.append(mine.pop())
+            self.reservoirs[key] = merged
+
+    def error_rate(self) -> float:
+        """
+        The failures per row
+        """
+        return self.failures / self.rows if self.rows else 0.0
+
+    def summary(self) -> str:
+        """
+        Return the table of the failures (the most frequent first) with the sample values and rows
+        """
+        lines = ['Validation failures of {}: {} in {} rows ({:.3f} per row)'.format(
+            self.name, self.failures, self.rows, self.error_rate()
+        )]
+        if not self.counts:
+            return lines[0]
+        lines.append('{:>9}  {:<24} {:<10} {}'.format('count', 'field', 'kind', 'detail'))
+        for key, count in sorted(self.counts.items(), key=lambda x: (-x[1], str(x[0]))):
+            field, kind, detail = key
+            lines.append('{:>9}  {:<24} {:<10} {}'.format(count, str(field), kind, detail))
+            for value, info in self.reservoirs[key]:
+                lines.append('{:>9}  e.g. {!r}'.format('', value) + (' <info: {}>'.format(info) if info else ''))
+        return '\n'.join(lines)
+
+    def __enter__(self) -> 'ValidationCollector':
+        global _collector
+        self._previous, _collector = _collector, self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        global _collector
+        _collector, self._previous = self._previous, None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['_previous'] = None
+        return state
+
+
 class BaseChecker(abc.ABC):
     @abc.abstractmethod
     def __call__(self, value):
         pass
 
+    def failure_expression(self, name: str):
+        """
+        Return the source code of an expression which is true if the check of the variable name fails,
+        or None if the check can't be inlined (then compile_fields calls the checker itself)
+        """
+        return None
+
 
 class MaxLenChecker(BaseChecker):
     def __init__(self, max_len):
@@ -88,6 +246,9 @@ class MaxLenChecker(BaseChecker):
                 'length of {} is greater than the maximum allowed length of {}'.format(len(value), self.max_len)
             )
 
+    def failure_expression(self, name: str):
+        return 'len({}) > {!r}'.format(name, self.max_len)
+
     def __repr__(self):
         return '<Checker={}: max_len={}>'.format(self.__class__.__name__, self.max_len)
 
@@ -103,6 +264,9 @@ class RangeChecker(BaseChecker):
         if value > self.maximum:
             raise ValueError('{} is greater than the maximum allowed of {}'.format(value, self.maximum))
 
+    def failure_expression(self, name: str):
+        return '{0} < {1!r} or {0} > {2!r}'.format(name, self.minimum, self.maximum)
+
     def __repr__(self):
         return '<Checker={}: minimum={}, maximum={}>'.format(self.__class__.__name__, self.minimum, self.maximum)
 
@@ -117,10 +281,234 @@ class EnumChecker(BaseChecker):
                 'The value of {} is not a valid value. Valid values: {}'.format(value, self.valid_values)
             )
 
+    def failure_expression(self, name: str):
+        return '{} not in {!r}'.format(name, self.valid_values)
+
     def __repr__(self):
         return '<Checker={}: valid_values={}>'.format(self.__class__.__name__, self.valid_values)
 
 
+# The arguments of convert_with_check which define what to do with bad values (the same defaults)
+Policy = namedtuple(
+    'Policy',
+    [
+        'replace_if_false', 'value_if_false', 'warn_if_false',
+        'replace_if_conversion_error', 'value_if_conversion_error', 'warn_if_conversion_error',
+        'replace_if_checker_error', 'value_if_checker_error', 'warn_if_checker_error'
+    ],
+    defaults=(True, None, False, True, None, False, True, None, False)
+)
+DEFAULT_POLICY = Policy()
+
+# Declaration of an item attribute made from a source column:
+# attribute = convert_with_check(prepare(data[column]), output_type=output_type, checker=checker, **policy, info=data)
+# prepare is an optional function applied to the raw value (e.g. removing thousands separators),
+# output_type may be any function which raises ValueError for bad values, checker may be None (no check)
+Field = namedtuple('Field', ['attribute', 'column', 'output_type', 'checker', 'prepare', 'policy'])
+Field.__new__.__defaults__ = (None, None, DEFAULT_POLICY)
+
+
+def no_check(value):
+    """The checker of the fields without checks"""
+    pass
+
+
+def convert_fields_with_check(item, data, fields) -> None:
+    """
+    Set the attributes of the item from the data according to the fields one by one with convert_with_check
+    (the reference implementation of the functions made by compile_fields)
+    """
+    for field in fields:
+        value = data[field.column]
+        if field.prepare is not None:
+            value = field.prepare(value)
+        setattr(
+            item,
+            field.attribute,
+            convert_with_check(
+                value,
+                output_type=field.output_type,
+                checker=field.checker or no_check,
+                info=data,
+                **field.policy._asdict()
+            )
+        )
+
+
+def compile_fields(fields, name='convert_fields'):
+    """
+    Compile the fields into one function f(item, data) doing the same as convert_fields_with_check(item, data, fields)
+    but with the conversions and the checks inlined: no keyword arguments, no exceptions from the checkers
+    and no calls at all for str values with inlinable checkers.
+    The function is compiled once (e.g. at import time) and called for every row.
+    """
+    return _compile(fields, name, item=True)
+
+
+def compile_value(field, name='convert_value'):
+    """
+    Compile the field into a function f(value, data=None) which returns the converted value of its column
+    (data is the row of the value, it's only used in the warnings)
+    """
+    return _compile([field], name, item=False)
+
+
+def _compile(fields, name, item):
+    namespace = {'report_failure': report_failure}
+    lines = ['def {}(item, data):'.format(name) if item else 'def {}(value, data=None):'.format(name)]
+
+    def emit(indent, line):
+        lines.append('    ' * indent + line)
+
+    def emit_warning(indent, message, value, field, kind, detail):
+        # the same reports as in convert_with_check
+        emit(indent, 'report_failure({!r}, {}, data, {!r}, {!r}, {!r})'.format(message, value, field, kind, detail))
+
+    for i, field in enumerate(fields):
+        policy = field.policy
+        target = 'item.{}'.format(field.attribute) if item else 'result'
+        f = 'f{}_'.format(i)  # prefix of the names of the field objects in the namespace of the function
+        namespace.update({
+            f + 'type': field.output_type,
+            f + 'checker': field.checker,
+            f + 'prepare': field.prepare,
+            f + 'if_false': policy.value_if_false,
+            f + 'if_conversion_error': policy.value_if_conversion_error,
+            f + 'if_checker_error': policy.value_if_checker_error
+        })
+
+        source = 'data[{!r}]'.format(field.column) if item else 'value'
+        if field.prepare is not None:
+            emit(1, 'value = {}prepare({})'.format(f, source))
+        elif item:
+            emit(1, 'value = {}'.format(source))
+        indent = 1
+        if policy.replace_if_false:
+            emit(indent, 'if not value:')
+            if policy.warn_if_false:
+                emit_warning(indent + 1, 'bool({!r})==False', 'value', field.column, FALSE_FAILURE, '')
+            emit(indent + 1, '{} = {}if_false'.format(target, f))
+            emit(indent, 'else:')
+            indent += 1
+
+        if field.output_type is str:
+            emit(indent, 'if value.__class__ is not str:')
+            emit(indent + 1, 'value = str(value)')
+        else:
+            emit(indent, 'try:')
+            emit(indent + 1, 'new_value = {}type(value)'.format(f))
+            emit(indent, 'except ValueError:')
+            if policy.warn_if_conversion_error:
+                emit_warning(
+                    indent + 1,
+                    'Conversion the value of {{!r}} to type {} failed'.format(_escape(field.output_type)),
+                    'value',
+                    field.column,
+                    CONVERSION_FAILURE,
+                    getattr(field.output_type, '__name__', repr(field.output_type))
+                )
+            if policy.replace_if_conversion_error:
+                emit(indent + 1, '{} = {}if_conversion_error'.format(target, f))
+            else:
+                emit(indent + 1, 'raise')
+            emit(indent, 'else:')
+            indent += 1
+            emit(indent, 'value = new_value')
+
+        if field.checker is None:
+            emit(indent, '{} = value'.format(target))
+            continue
+        expression = field.checker.failure_expression('value')
+        if expression is None:
+            emit(indent, 'try:')
+            emit(indent + 1, '{}checker(value)'.format(f))
+            emit(indent, 'except ValueError:')
+        else:
+            emit(indent, 'if {}:'.format(expression))
+        if policy.warn_if_checker_error:
+            emit_warning(
+                indent + 1,
+                'Checking the value of {{!r}} with the checker {} failed'.format(_escape(field.checker)),
+                'value',
+                field.column,
+                CHECKER_FAILURE,
+                repr(field.checker)
+            )
+        if policy.replace_if_checker_error:
+            emit(indent + 1, '{} = {}if_checker_error'.format(target, f))
+        elif expression is None:
+            emit(indent + 1, 'raise')
+        else:
+            emit(indent + 1, '{}checker(value)  # raises ValueError with the message of the checker'.format(f))
+        emit(indent, 'else:')
+        emit(indent + 1, '{} = value'.format(target))
+
+    if not item:
+        emit(1, 'return result')
+    elif len(lines) == 1:
+        emit(1, 'pass')
+    source = '\n'.join(lines)
+    exec(compile(source, '<compiled fields: {}>'.format(name), 'exec'), namespace)
+    function = namespace[name]
+    function.source = source
+    return function
+
+
+_value_converters = {}  # {field: compile_value(field)}
+_REPEATS_SAMPLE_SIZE = 100  # the number of the first values of a column in which repeats are looked for
+
+
+def value_converter(field):
+    """
+    Return compile_value(field) compiled once for all the callers
+    """
+    try:
+        return _value_converters[field]
+    except KeyError:
+        convert = _value_converters[field] = compile_value(field, 'convert_{}'.format(field.attribute))
+        return convert
+
+
+def _warns(field) -> bool:
+    policy = field.policy
+    return policy.warn_if_false or policy.warn_if_conversion_error or policy.warn_if_checker_error
+
+
+def repetitive_fields(rows, fields) -> tuple:
+    """
+    Return the fields which are worth converting with convert_columns: at least half of the first values of their
+    columns are repeats (quantities, prices, flags) and there are no warnings about bad values
+    (every warning has to show its row)
+    """
+    sample = rows[:_REPEATS_SAMPLE_SIZE]
+    return tuple(
+        field for field in fields
+        if not _warns(field) and len(set(map(itemgetter(field.column), sample))) * 2 <= len(sample)
+    )
+
+
+def convert_columns(rows, fields) -> list:
+    """
+    Convert the fields of all the rows (dicts) column by column and return the list of columns (one list per field);
+    zip(*columns) gives the converted rows (e.g. for executemany).
+    Every distinct value of the columns of repetitive_fields is converted once and the results are spread over
+    the column, the other columns are converted value by value.
+    """
+    repetitive = repetitive_fields(rows, fields)
+    columns = []
+    for field in fields:
+        convert = value_converter(field)
+        values = list(map(itemgetter(field.column), rows))
+        if field in repetitive:
+            converted = {value: convert(value) for value in set(values)}
+            columns.append(list(map(converted.__getitem__, values)))
+        elif _warns(field):
+            columns.append(list(map(convert, values, rows)))
+        else:
+            columns.append(list(map(convert, values)))
+    return columns
+
+
 if __name__ == '__main__':
     a = 14.2
     b = convert_with_check(
@@ -3,16 +3,18 @@
 Все действия с базой необходимо выполнять с помощью экземпляра Database данного модуля
 """
 
+import contextlib
 import logging
+import os
+import tempfile
+import threading
 from collections import OrderedDict
-from typing import List, Dict
-
-import mysql.connector
-from mysql.connector import errorcode
-from mysql.connector.cursor import MySQLCursorNamedTuple
+from typing import Iterator, List, Dict, Sequence
 
 import constants
+import db_drivers
 import suppliers
+from db_drivers import errorcode
 
 
 class Database:
@@ -633,22 +635,61 @@ class Database:
         """
     ]
 
+    # специфические таблицы поставщиков (см. insert_into_specific_supplier_item)
+    SPECIFIC_TABLES = {
+        suppliers.Keystone: 'keystone_item',
+        suppliers.Meyer: 'meyer_item',
+        suppliers.Premier: 'premier_item',
+        suppliers.Trans: 'trans_item',
+        suppliers.Turn14: 'turn14_item',
+    }
+
+    # Политики фиксации транзакций (когда фиксируются изменения, отмеченные commit=True в execute_without_results):
+    COMMIT_STATEMENT = 'statement'  # после каждой строки (пакет many=True выполняется построчно)
+    COMMIT_BATCH = 'batch'  # после каждого пакета (как было всегда)
+    COMMIT_ROWS = 'rows'  # когда набралось не менее commit_rows незафиксированных строк
+    COMMIT_STEP = 'step'  # при выходе из блока transaction() (шага записи), т.е. одной транзакцией на шаг
+    COMMIT_POLICIES = (COMMIT_STATEMENT, COMMIT_BATCH, COMMIT_ROWS, COMMIT_STEP)
+
+    # ошибки, после которых пакет откатывается до точки сохранения и выполняется повторно
+    # (при ER_LOCK_DEADLOCK сервер откатывает всю транзакцию, поэтому повторить только пакет нельзя)
+    RETRY_ERROR_CODES = (errorcode.ER_LOCK_WAIT_TIMEOUT,)
+
     def __init__(
             self,
             *,
             create: bool = False,
             option_files=None,
             option_groups=None,
+            driver: str = None,
+            commit_policy: str = COMMIT_BATCH,
+            commit_rows: int = 50000,
+            batch_retries: int = 2,
             **kwargs
     ):
-        kwargs.update({'use_pure': True})
-
+        """
+        :param driver: драйвер MySQL (см. db_drivers.DRIVERS); по умолчанию - параметр driver из option_files,
+                       а если его нет - db_drivers.DEFAULT_DRIVER
+        :param commit_policy: политика фиксации транзакций (см. COMMIT_POLICIES)
+        :param commit_rows: количество строк, после которого фиксируется транзакция при commit_policy == 'rows'
+        :param batch_retries: сколько раз повторять пакет после ошибки из RETRY_ERROR_CODES
+        """
+        if commit_policy not in self.COMMIT_POLICIES:
+            raise ValueError('Неизвестная политика фиксации транзакций {!r}, возможные: {}'.format(
+                commit_policy, ', '.join(self.COMMIT_POLICIES)
+            ))
+        self.commit_policy = commit_policy
+        self.commit_rows = commit_rows
+        self.batch_retries = batch_retries
+        self._uncommitted_rows = 0  # строк, записанных после последней фиксации транзакции
+        self._transaction_depth = 0  # вложенность блоков transaction()
         if option_files:
-            kwargs.update({'option_files': option_files})
-            if option_groups:
-                kwargs.update({'option_groups': option_groups})
-            kwargs = mysql.connector.optionfiles.read_option_files(**kwargs)
-        logging.debug('Параметры подключения: {}'.format(kwargs))
+            kwargs = dict(db_drivers.read_option_files(option_files, option_groups), **kwargs)
+        # явно, т.к. в некоторых версиях библиотек LOAD DATA LOCAL INFILE разрешён по умолчанию
+        kwargs.setdefault('allow_local_infile', False)
+        self.driver = db_drivers.get_driver(driver or kwargs.pop('driver', None))
+        kwargs.pop('driver', None)
+        logging.debug('Драйвер: {}. Параметры подключения: {}'.format(self.driver.name, kwargs))
 
         try:
             db_name = None
@@ -656,15 +697,20 @@ class Database:
                 db_name = kwargs.pop('database')
 
             logging.info('Установка соединения с сервером MySQL')
-            self.connection = mysql.connector.connect(**kwargs)
+            self.connection = self.driver.connect(**kwargs)
             logging.info('Соединение установлено: OK')
 
             if create:
                 self._connect_to_db(db_name)
                 self._create_tables_if_needed()
+                kwargs['database'] = db_name
+            self.connection_kwargs = kwargs  # для новых соединений ConnectionPool
 
             self._create_stored_procedures()
-        except mysql.connector.Error as err:
+            # LOAD DATA LOCAL INFILE позволяет серверу читать файлы клиента, поэтому включается только явно
+            # (allow_local_infile = True в option_files) и используется только BulkLoad
+            self.local_infile = bool(kwargs['allow_local_infile']) and self._server_allows_local_infile()
+        except self.driver.Error as err:
             logging.error(str(err))
             raise
 
@@ -674,13 +720,13 @@ class Database:
         """
         try:
             logging.debug('Попытка подключится к базе данных {}.'.format(db_name))
-            self.connection.database = db_name
-        except mysql.connector.Error as err:
-            if err.errno == errorcode.ER_BAD_DB_ERROR:
+            self.driver.select_db(self.connection, db_name)
+        except self.driver.Error as err:
+            if db_drivers.error_code(err) == errorcode.ER_BAD_DB_ERROR:
                 logging.warning('База данных {} не существует.'.format(db_name))
                 logging.debug('Попытка создать базу данных {}.'.format(db_name))
                 self._create_db(db_name)
-                self.connection.database = db_name
+                self.driver.select_db(self.connection, db_name)
                 logging.info('База данных {} успешно создана.'.format(db_name))
                 logging.info('Подключение к базе данных {}: ОК.'.format(db_name))
             else:
@@ -721,12 +767,118 @@ class Database:
             logging.debug('Процедура {} создана: OK.'.format(procedure))
         logging.info('{} Создание или обновление хранимых процедур базы данных.'.format(constants.LOGGING_FINISH))
 
-    def __del__(self):
-        """Закрывает соединение с сервером MySQL"""
-        if hasattr(self, 'connection') and self.connection.is_connected():
+    def _server_allows_local_infile(self) -> bool:
+        """
+        Разрешает ли сервер LOAD DATA LOCAL INFILE (переменная local_infile)
+        """
+        cursor = self.execute_with_results('SELECT @@GLOBAL.local_infile AS local_infile;')
+        try:
+            local_infile = bool(cursor.fetchone().local_infile)
+        finally:
+            cursor.close()
+        if not local_infile:
+            logging.warning(
+                'Сервер MySQL не разрешает LOAD DATA LOCAL INFILE (local_infile=OFF), '
+                'массовая запись в промежуточные таблицы выполняется многострочными INSERT.'
+            )
+        return local_infile
+
+    def new_connection(self) -> 'Database':
+        """
+        Возвращает новый экземпляр Database с отдельным соединением с той же базой данных
+        (база данных, таблицы и процедуры уже созданы этим экземпляром)
+        """
+        db = Database.__new__(Database)
+        db.driver = db_drivers.get_driver(self.driver.name)
+        try:
+            db.connection = db.driver.connect(**self.connection_kwargs)
+        except db.driver.Error as err:
+            logging.error(str(err))
+            raise
+        db.connection_kwargs = self.connection_kwargs
+        db.local_infile = self.local_infile
+        db.commit_policy = self.commit_policy
+        db.commit_rows = self.commit_rows
+        db.batch_retries = self.batch_retries
+        db._uncommitted_rows = 0
+        db._transaction_depth = 0
+        return db
+
+    def connection_pool(self, size: int) -> 'ConnectionPool':
+        """
+        Возвращает пул не более size соединений с той же базой данных (см. ConnectionPool)
+        """
+        return ConnectionPool(self, size)
+
+    def commit(self) -> None:
+        """
+        Фиксирует транзакцию
+        """
+        self.connection.commit()
+        self._uncommitted_rows = 0
+
+    def rollback(self) -> None:
+        """
+        Откатывает транзакцию
+        """
+        self.connection.rollback()
+        self._uncommitted_rows = 0
+
+    def _commit_point(self, rows: int) -> None:
+        """
+        Точка фиксации после записи rows строк: транзакция фиксируется согласно commit_policy
+        """
+        self._uncommitted_rows += rows
+        if self.commit_policy == self.COMMIT_STEP and self._transaction_depth:
+            return
+        if self.commit_policy == self.COMMIT_ROWS and self._uncommitted_rows < self.commit_rows:
+            return
+        self.commit()
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator['Database']:
+        """
+        Шаг записи в базу данных (например, запись item'ов одного поставщика).
+        При commit_policy == 'step' все изменения шага фиксируются одной транзакцией при выходе из блока with,
+        т.е. читающие базу данных видят их сразу все; при остальных политиках при выходе фиксируются ещё
+        не зафиксированные изменения. При ошибке внутри блока незафиксированные изменения откатываются.
+        Вложенные блоки относятся к внешнему шагу
+        """
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if not self._transaction_depth:
+                logging.warning('Откат незафиксированных изменений ({} строк).'.format(self._uncommitted_rows))
+                self.rollback()
+            raise
+        else:
+            self._transaction_depth -= 1
+            if not self._transaction_depth:
+                self.commit()
+
+    def close(self) -> None:
+        """
+        Закрывает соединение с сервером MySQL.
+        Незафиксированные изменения (например, при commit_policy == 'rows') откатываются: close() вызывается и из
+        __del__, в т.ч. после ошибки вне блока transaction(), поэтому фиксировать их нужно явно (commit()
+        или выход из блока transaction())
+        """
+        if hasattr(self, 'connection') and self.driver.is_connected(self.connection):
+            if self._uncommitted_rows:
+                logging.warning(
+                    'Откат незафиксированных изменений ({} строк) при закрытии соединения.'.format(
+                        self._uncommitted_rows
+                    )
+                )
+                self.rollback()
             self.connection.close()
             logging.debug('Закрыто соединение с сервером MySQL')
 
+    def __del__(self):
+        self.close()
+
     def insert_into_supplier_brand(self, data: List[Dict]) -> None:
         statement = """
             INSERT INTO supplier_brand(name, supplier_id)
@@ -758,6 +910,33 @@ class Database:
         """
         self.execute_without_results(statement, data, many=True, commit=True)
 
+    def bulk_insert_into_supplier_item(self) -> 'BulkLoad':
+        """
+        То же, что insert_into_supplier_item, для всех item'ов сразу (через промежуточную таблицу, см. BulkLoad)
+        """
+        return BulkLoad(
+            self,
+            'supplier_item',
+            ('supplier_brand_id', 'norm_mpn', 'available', 'prefix', 'mpn', 'number'),
+            update_columns=('available', 'prefix', 'mpn', 'number')
+        )
+
+    def bulk_insert_into_specific_supplier_item(self, supplier) -> 'BulkLoad':
+        """
+        То же, что insert_into_specific_supplier_item, для всех item'ов поставщика supplier сразу
+        (через промежуточную таблицу, см. BulkLoad)
+        """
+        try:
+            table = self.SPECIFIC_TABLES[supplier]
+        except KeyError:
+            raise TypeError('Wrong supplier')
+        return BulkLoad(
+            self,
+            table,
+            ['supplier_item_id'] + supplier.SPECIFIC_FIELDS,
+            update_columns=supplier.SPECIFIC_FIELDS
+        )
+
     def insert_into_specific_supplier_item(self, supplier, data: List[Dict]) -> None:
         if supplier == suppliers.Keystone:
             statement = """
@@ -779,12 +958,7 @@ class Database:
                                           HazardousMaterial)
                   VALUES
                     (
-                        (SELECT supplier_item_id
-                           FROM
-                             supplier_item
-                           WHERE supplier_brand_id = %(supplier_brand_id)s
-                             AND norm_mpn = %(norm_mpn)s
-                        ),
+                        %(supplier_item_id)s,
                         %(LongDescription)s,
                         %(JobberPrice)s,
                         %(Cost)s,
@@ -823,12 +997,7 @@ class Database:
                                        Weight, Height, Length, Width, Description, LTL_Eligible, Discontinued)
                   VALUES
                     (
-                        (SELECT supplier_item_id
-                           FROM
-                             supplier_item
-                           WHERE supplier_brand_id = %(supplier_brand_id)s
-                             AND norm_mpn = %(norm_mpn)s
-                        ),
+                        %(supplier_item_id)s,
                         %(Jobber_Price)s,
                         %(Customer_Price)s,
                         %(UPC)s,
@@ -866,12 +1035,7 @@ class Database:
                                          Inventory_Type)
                   VALUES
                     (
-                        (SELECT supplier_item_id
-                           FROM
-                             supplier_item
-                           WHERE supplier_brand_id = %(supplier_brand_id)s
-                             AND norm_mpn = %(norm_mpn)s
-                        ), 
+                        %(supplier_item_id)s,
                         %(Distributor_Cost)s,
                         %(Package_Quantity)s,
                         %(Core_Price)s,
@@ -895,12 +1059,7 @@ class Database:
                                        LIST_PRICE, JOBBER_PRICE, TOTAL, STATUS)
                   VALUES
                     (
-                        (SELECT supplier_item_id
-                           FROM
-                             supplier_item
-                           WHERE supplier_brand_id = %(supplier_brand_id)s
-                             AND norm_mpn = %(norm_mpn)s
-                        ),
+                        %(supplier_item_id)s,
                         %(CA)s,
                         %(TX)s,
                         %(FL)s,
@@ -947,12 +1106,7 @@ class Database:
                                         Weight)
                   VALUES
                     (
-                        (SELECT supplier_item_id
-                           FROM
-                             supplier_item
-                           WHERE supplier_brand_id = %(supplier_brand_id)s
-                             AND norm_mpn = %(norm_mpn)s
-                        ),
+                        %(supplier_item_id)s,
                         %(Description)s,
                         %(Cost)s,
                         %(Retail)s,
@@ -1007,12 +1161,7 @@ class Database:
                                     STATUS)
               VALUES
                 (
-                    (SELECT supplier_item_id
-                       FROM
-                         supplier_item
-                       WHERE supplier_brand_id = %(supplier_brand_id)s
-                         AND norm_mpn = %(norm_mpn)s
-                    ),
+                    %(supplier_item_id)s,
                     %(DESCRIPTION)s,
                     %(YOUR_PRICE)s,
                     %(JOBBER_PRICE)s,
@@ -1069,7 +1218,7 @@ class Database:
         self.execute_without_results(statement, data, many=True, commit=True)
 
     def get_from_supplier_brand__name_and_supplier_id_2_supplier_brand_id(self) -> dict:
-        cursor = self.connection.cursor(named_tuple=True)
+        cursor = self.driver.cursor(self.connection, named_tuple=True)
         statement = """
             SELECT supplier_brand_id, name, supplier_id
               FROM
@@ -1082,7 +1231,7 @@ class Database:
         return result
 
     def get_supplier_number_2_supplier_item_id(self, supplier_id) -> dict:
-        cursor = self.connection.cursor(named_tuple=True)
+        cursor = self.driver.cursor(self.connection, named_tuple=True)
         statement = """
             SELECT si.number, si.supplier_item_id
               FROM
@@ -1098,15 +1247,52 @@ class Database:
             result[row.number] = row.supplier_item_id
         return result
 
+    def get_supplier_item_ids(self, supplier_id) -> dict:
+        """
+        Возвращает {(supplier_brand_id, norm_mpn): supplier_item_id} для item'ов поставщика supplier_id
+        с признаком available, чтобы записывать специфические данные item'ов с готовым supplier_item_id
+        (многострочными INSERT, без подзапроса на каждую строку).
+        Строки читаются с сервера по мере обхода курсора, без буферизации всего результата
+        """
+        cursor = self.driver.cursor(self.connection, unbuffered=True)
+        statement = """
+            SELECT si.supplier_brand_id, si.norm_mpn, si.supplier_item_id
+              FROM
+                supplier_item               si
+                  INNER JOIN supplier_brand sb ON si.supplier_brand_id = sb.supplier_brand_id
+              WHERE sb.supplier_id = %s AND si.available = TRUE;
+        """
+        try:
+            cursor.execute(statement, (supplier_id,))
+            return {
+                (supplier_brand_id, norm_mpn): supplier_item_id
+                for supplier_brand_id, norm_mpn, supplier_item_id in cursor
+            }
+        finally:
+            cursor.close()
+
     # noinspection SqlWithoutWhere
 
-    def update_supplier_item_with_available(self) -> None:
-        statement = """
-            UPDATE supplier_item
-              SET
-                available = FALSE ;
+    def update_supplier_item_with_available(self, supplier_ids: List[int] = None) -> None:
+        """
+        Снимает признак available с item'ов поставщиков supplier_ids (по умолчанию - всех поставщиков)
         """
-        self.execute_without_results(statement, many=False, commit=True)
+        if supplier_ids is None:
+            statement = """
+                UPDATE supplier_item
+                  SET
+                    available = FALSE ;
+            """
+            self.execute_without_results(statement, many=False, commit=True)
+        elif supplier_ids:
+            statement = """
+                UPDATE supplier_item si
+                  INNER JOIN supplier_brand sb ON si.supplier_brand_id = sb.supplier_brand_id
+                  SET
+                    si.available = FALSE
+                  WHERE sb.supplier_id IN ({});
+            """.format(', '.join(['%s'] * len(supplier_ids)))
+            self.execute_without_results(statement, tuple(supplier_ids), many=False, commit=True)
 
     def write_turn14_item_info_from_get_items_api(
             self,
@@ -1134,7 +1320,7 @@ class Database:
                     p_barcode,
                 )
             )
-            self.connection.commit()
+            self._commit_point(1)
         finally:
             cursor.close()
 
@@ -1158,7 +1344,7 @@ class Database:
                     p_width,
                 )
             )
-            self.connection.commit()
+            self._commit_point(1)
         finally:
             cursor.close()
 
@@ -1188,7 +1374,7 @@ class Database:
                 """,
                 [(item_id, vehicle_fitments_id) for vehicle_fitments_id in vehicle_fitments_ids]
             )
-            self.connection.commit()
+            self._commit_point(len(vehicle_fitments_ids))
         cursor.close()
 
     def insert_into_meyer_item__item_information(self, data: List[Dict]) -> None:
@@ -1335,39 +1521,375 @@ class Database:
             many: bool,
             commit: bool
     ) -> None:
+        """
+        Выполняет statement (при many - для каждой строки data); commit - точка фиксации транзакции,
+        транзакция фиксируется согласно commit_policy.
+        Ошибки с кодами allowable_error_codes только записываются в лог (точка фиксации при этом пропускается)
+        """
         cursor = self.connection.cursor()
         try:
-            if many:
-                cursor.executemany(statement, data)
-            else:
-                cursor.execute(statement, data)
-        except mysql.connector.Error as e:
-            if e.errno in allowable_error_codes:
-                logging.warning('Error: {} while \n{}'.format(e, cursor.statement))
-            else:
-                logging.error('Error: {} while \n{}'.format(e, cursor.statement))
-                raise
-        else:
-            if commit:
-                self.connection.commit()
+            if many and commit and self.commit_policy == self.COMMIT_STATEMENT:
+                for row in data:
+                    if self._execute(cursor, statement, row, allowable_error_codes, many=False):
+                        self._commit_point(1)
+            elif self._execute(cursor, statement, data, allowable_error_codes, many=many) and commit:
+                self._commit_point(len(data) if many else 1)
         finally:
             cursor.close()
 
+    def _execute(self, cursor, statement: str, data, allowable_error_codes: tuple, *, many: bool) -> bool:
+        """
+        Выполняет statement курсором cursor; возвращает False, если произошла ошибка из allowable_error_codes.
+        Пакет строк (many) выполняется внутри точки сохранения (SAVEPOINT): при ошибке из RETRY_ERROR_CODES
+        откатывается только этот пакет и выполняется повторно (не более batch_retries раз), а незафиксированные
+        изменения предыдущих пакетов транзакции сохраняются
+        """
+        attempt = 0
+        while True:
+            if many:
+                cursor.execute('SAVEPOINT batch;')
+            try:
+                if many:
+                    cursor.executemany(statement, data)
+                else:
+                    cursor.execute(statement, data or None)
+            except self.driver.Error as e:
+                code = db_drivers.error_code(e)
+                if code in allowable_error_codes:
+                    logging.warning('Error: {} while \n{}'.format(e, db_drivers.last_statement(cursor)))
+                    if many:
+                        cursor.execute('RELEASE SAVEPOINT batch;')
+                    return False
+                if many and code in self.RETRY_ERROR_CODES and attempt < self.batch_retries:
+                    attempt += 1
+                    logging.warning('Error: {} while \n{}\nПовтор пакета ({} из {}).'.format(
+                        e, db_drivers.last_statement(cursor), attempt, self.batch_retries
+                    ))
+                    cursor.execute('ROLLBACK TO SAVEPOINT batch;')
+                    continue
+                logging.error('Error: {} while \n{}'.format(e, db_drivers.last_statement(cursor)))
+                if many and code != errorcode.ER_LOCK_DEADLOCK:
+                    try:
+                        cursor.execute('ROLLBACK TO SAVEPOINT batch;')
+                    except self.driver.Error:
+                        pass
+                raise
+            else:
+                if many:
+                    cursor.execute('RELEASE SAVEPOINT batch;')
+                return True
+
     def execute_with_results(
             self,
             statement: str,
             data=()
-    ) -> MySQLCursorNamedTuple:
-        cursor = self.connection.cursor(named_tuple=True)
+    ):
+        """
+        Выполняет statement и возвращает курсор с результатом (строки - namedtuple с именами столбцов)
+        """
+        cursor = self.driver.cursor(self.connection, named_tuple=True)
         try:
-            cursor.execute(statement, data)
-        except mysql.connector.Error as e:
-            logging.error('Error: {} while \n{}'.format(e, cursor.statement))
+            cursor.execute(statement, data or None)
+        except self.driver.Error as e:
+            logging.error('Error: {} while \n{}'.format(e, db_drivers.last_statement(cursor)))
             raise
         else:
             return cursor
 
 
+# Экранирование значений для LOAD DATA с FIELDS ESCAPED BY '\\' (по умолчанию MySQL)
+_INFILE_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+
+
+def _infile_field(value) -> str:
+    """
+    Значение value как поле строки файла для LOAD DATA (None - NULL, т.е. \\N)
+    """
+    if value is None:
+        return '\\N'
+    if value is True:
+        return '1'
+    if value is False:
+        return '0'
+    if isinstance(value, str):
+        return value.translate(_INFILE_ESCAPES)
+    return str(value)
+
+
+class BulkLoad:
+    """
+    Массовая запись строк (словарей, как для execute_without_results(..., many=True)) в таблицу target.
+    Строки, переданные методу write частями, пишутся во временный файл и загружаются командой
+    LOAD DATA LOCAL INFILE во временную (TEMPORARY, видимую только этому соединению) промежуточную таблицу
+    stage_<target>, а при закрытии переносятся в target одним INSERT ... SELECT ... ON DUPLICATE KEY UPDATE
+    (строки переносятся в порядке записи, т.е. из повторяющихся по ключу строк остаётся последняя, как и при
+    построчной записи). Если сервер не разрешает LOAD DATA LOCAL INFILE, строки пишутся в промежуточную таблицу
+    многострочными INSERT.
+    Используется как контекстный менеджер: при ошибке внутри with в target ничего не записывается.
+    """
+
+    LOAD_ROWS = 100000  # строк во временном файле, после которых он загружается в промежуточную таблицу
+
+    def __init__(
+            self,
+            db: Database,
+            target: str,
+            columns: Sequence[str],
+            *,
+            update_columns: Sequence[str] = None
+    ):
+        """
+        :param columns: столбцы target (ключи словарей строк)
+        :param update_columns: столбцы, обновляемые у существующих строк target (по умолчанию - все columns)
+        """
+        self.db = db
+        self.target = target
+        self.stage = 'stage_{}'.format(target)
+        self.rows = 0  # строк записано
+        self.fields = tuple(columns)  # столбцы промежуточной таблицы
+        quoted_columns = ', '.join('`{}`'.format(column) for column in columns)
+        self.merge_statement = """
+            INSERT INTO `{target}`({columns})
+              SELECT {columns}
+                FROM
+                  `{stage}`
+                ORDER BY stage_row
+              ON DUPLICATE KEY UPDATE
+                {update};
+        """.format(
+            target=target,
+            columns=quoted_columns,
+            stage=self.stage,
+            update=',\n                '.join(
+                '`{0}` = VALUES(`{0}`)'.format(column)
+                for column in (columns if update_columns is None else update_columns)
+            )
+        )
+        # столбцы промежуточной таблицы - текст без ограничений: LOAD DATA LOCAL выполняется как LOAD DATA IGNORE
+        # и молча заменил бы NULL в NOT NULL столбце на '' или 0, обрезал бы длинные строки и т.п.;
+        # значения проверяет и преобразует в типы target перенос (INSERT ... SELECT в строгом режиме сервера),
+        # т.е. ошибки те же, что при записи в target многострочными INSERT
+        self.create_statement = """
+            CREATE TEMPORARY TABLE `{}`
+              (
+                `stage_row` INT(11) NOT NULL AUTO_INCREMENT PRIMARY KEY,
+                {}
+              )
+              CHARACTER SET = utf8mb4;
+        """.format(
+            self.stage,
+            ',\n                '.join('`{}` MEDIUMTEXT NULL'.format(column) for column in columns)
+        )
+        self.load_statement = """
+            LOAD DATA LOCAL INFILE %s
+              INTO TABLE `{}`
+              CHARACTER SET utf8mb4
+              FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+              LINES TERMINATED BY '\\n'
+              ({});
+        """.format(self.stage, ', '.join('`{}`'.format(field) for field in self.fields))
+        self.insert_statement = 'INSERT INTO `{}`({}) VALUES ({});'.format(
+            self.stage,
+            ', '.join('`{}`'.format(field) for field in self.fields),
+            ', '.join('%({})s'.format(field) for field in self.fields)
+        )
+
+        self._file = None
+        self._file_rows = 0  # строк во временном файле
+        self._drop_stage()
+        self.db.execute_without_results(self.create_statement, many=False, commit=False)
+        if self.db.local_infile:
+            self._file = tempfile.NamedTemporaryFile(
+                mode='w', encoding='utf8', newline='\n', suffix='.tsv', prefix=self.stage + '_', delete=False
+            )
+
+    def write(self, data: List[Dict]) -> None:
+        """
+        Записывает строки data в промежуточную таблицу (через временный файл)
+        """
+        if self._file is None:
+            self.db.execute_without_results(self.insert_statement, data, many=True, commit=False)
+        else:
+            fields = self.fields
+            self._file.writelines(
+                '\t'.join([_infile_field(row[field]) for field in fields]) + '\n' for row in data
+            )
+            self._file_rows += len(data)
+            if self._file_rows >= self.LOAD_ROWS:
+                self._load_file()
+        self.rows += len(data)
+
+    def _load_file(self) -> None:
+        """
+        Загружает строки временного файла в промежуточную таблицу и очищает файл
+        """
+        if not self._file_rows:
+            return
+        self._file.flush()
+        logging.debug('Загрузка {} строк в {}.'.format(self._file_rows, self.stage))
+        self.db.execute_without_results(self.load_statement, (self._file.name,), many=False, commit=False)
+        self._check_load_warnings()
+        self._file.seek(0)
+        self._file.truncate()
+        self._file_rows = 0
+
+    def _check_load_warnings(self) -> None:
+        """
+        Проверяет предупреждения LOAD DATA (например, неверное количество полей в строке файла):
+        LOAD DATA LOCAL не прерывается на них, как INSERT, поэтому они записываются в лог и прерывают запись
+        """
+        cursor = self.db.execute_with_results('SHOW WARNINGS LIMIT 10;')
+        try:
+            warnings = cursor.fetchall()
+        finally:
+            cursor.close()
+        if warnings:
+            for warning in warnings:
+                logging.error('LOAD DATA в {}: {} {} {}'.format(self.stage, *warning))
+            raise ValueError('LOAD DATA в {} завершилась с предупреждениями'.format(self.stage))
+
+    def _drop_stage(self) -> None:
+        self.db.execute_without_results(
+            'DROP TEMPORARY TABLE IF EXISTS `{}`;'.format(self.stage), many=False, commit=False
+        )
+
+    def close(self) -> None:
+        """
+        Переносит записанные строки в target (точка фиксации транзакции, см. Database.commit_policy)
+        """
+        try:
+            logging.debug('{} Перенос {} строк из {} в {}.'.format(
+                constants.LOGGING_START, self.rows, self.stage, self.target
+            ))
+            if self._file is not None:
+                self._load_file()
+            self.db.execute_without_results(self.merge_statement, many=False, commit=False)
+            self.db._commit_point(self.rows)
+        finally:
+            self._discard()
+            logging.debug('{} Перенос {} строк из {} в {}.'.format(
+                constants.LOGGING_FINISH, self.rows, self.stage, self.target
+            ))
+
+    def _discard(self) -> None:
+        """
+        Удаляет временный файл и промежуточную таблицу
+        """
+        if self._file is not None:
+            self._file.close()
+            os.remove(self._file.name)
+            self._file = None
+        self._drop_stage()
+
+    def __enter__(self) -> 'BulkLoad':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+
+class ConnectionPool:
+    """
+    Пул соединений с базой данных для одновременной записи из нескольких потоков.
+    Каждое соединение - отдельный экземпляр Database (Database.new_connection), которым в каждый момент пользуется
+    только один поток (соединения драйверов MySQL нельзя использовать из нескольких потоков одновременно).
+    Соединения открываются по мере надобности, не более size сразу; если все они заняты, connection() ждёт
+    освобождения одного из них. Соединение, при работе с которым произошла ошибка, откатывает транзакцию
+    и закрывается, а не возвращается в пул, поэтому ошибка одного потока не затрагивает остальные.
+    Используется как контекстный менеджер: при выходе соединения пула закрываются.
+    """
+
+    def __init__(self, db: Database, size: int):
+        """
+        :param db: экземпляр Database, параметры подключения которого используются для новых соединений
+        :param size: наибольшее количество одновременно открытых соединений
+        """
+        self.db = db
+        self.size = max(1, size)
+        self._idle = []  # свободные соединения
+        self._opened = 0  # открытых соединений (свободных и занятых)
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def _acquire(self) -> Database:
+        with self._condition:
+            while not self._closed and not self._idle and self._opened >= self.size:
+                self._condition.wait()
+            if self._closed:
+                raise RuntimeError('Пул соединений закрыт')
+            if self._idle:
+                return self._idle.pop()
+            self._opened += 1
+        try:
+            db = self.db.new_connection()
+        except BaseException:
+            self._forget()
+            raise
+        logging.debug('Открыто соединение пула ({} из {}).'.format(self._opened, self.size))
+        return db
+
+    def _forget(self) -> None:
+        with self._condition:
+            self._opened -= 1
+            self._condition.notify()
+
+    def _release(self, db: Database) -> None:
+        with self._condition:
+            if not self._closed:
+                self._idle.append(db)
+                self._condition.notify()
+                return
+        self._forget()
+        db.close()
+
+    def _discard(self, db: Database) -> None:
+        """
+        Откатывает транзакцию соединения db после ошибки и закрывает его
+        """
+        try:
+            db.rollback()
+        except db.driver.Error as err:
+            logging.warning('Ошибка {} при откате транзакции соединения пула.'.format(err))
+        finally:
+            self._forget()
+            db.close()
+
+    @contextlib.contextmanager
+    def connection(self) -> Iterator[Database]:
+        """
+        Выдаёт свободное соединение пула на время блока with
+        """
+        db = self._acquire()
+        try:
+            yield db
+        except BaseException:
+            self._discard(db)
+            raise
+        else:
+            self._release(db)
+
+    def close(self) -> None:
+        """
+        Закрывает свободные соединения пула; занятые закрываются при освобождении
+        """
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+            self._condition.notify_all()
+        for db in idle:
+            db.close()
+
+    def __enter__(self) -> 'ConnectionPool':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
 if __name__ == '__main__':
     logging.basicConfig(
         format='%(asctime)s %(levelname)s:%(message)s',
@@ -0,0 +1,329 @@
+"""
+Драйверы подключения к MySQL-server для database.Database.
+
+Драйвер выбирается параметром driver в файле конфигурации подключения (constants.DATABASE_DB_CONFIG_FILE),
+например:
+    [connector_python]
+    driver = mysqlclient
+Возможные значения - ключи DRIVERS (по умолчанию DEFAULT_DRIVER, т.е. mysql-connector с реализацией на Python,
+как до выбора драйверов; остальные драйверы, в т.ч. C extension mysql-connector, - по выбору после сравнения
+на своём сервере: python db_drivers.py).
+Остальные параметры файла - параметры подключения в именах mysql-connector (user, password, host, port, database,
+allow_local_infile, ...), драйвер сам переводит их в имена своей библиотеки.
+Библиотека драйвера импортируется только при подключении, поэтому установлена должна быть только выбранная.
+"""
+
+import ast
+import configparser
+import logging
+from collections import namedtuple
+from typing import Dict, Iterable, Union
+
+
+class errorcode:
+    """
+    Коды ошибок сервера MySQL, которые обрабатывает database (одинаковые для всех драйверов;
+    то же, что mysql.connector.errorcode)
+    """
+    ER_BAD_NULL_ERROR = 1048
+    ER_BAD_DB_ERROR = 1049
+    ER_LOCK_WAIT_TIMEOUT = 1205
+    ER_LOCK_DEADLOCK = 1213
+
+
+def read_option_files(option_files: Union[str, Iterable[str]], option_groups: Iterable[str] = None) -> Dict:
+    """
+    Читает параметры подключения из файлов option_files (формат файлов конфигурации MySQL) из групп option_groups
+    (по умолчанию, как у mysql-connector, - client и connector_python; параметры следующих групп и файлов
+    заменяют предыдущие). Значения, похожие на литералы Python (числа, True, строки в кавычках), преобразуются
+    """
+    if isinstance(option_files, str):
+        option_files = [option_files]
+    option_groups = option_groups or ['client', 'connector_python']
+    parser = configparser.ConfigParser(allow_no_value=True, strict=False, interpolation=None)
+    kwargs = {}
+    for option_file in option_files:
+        if not parser.read(option_file, encoding='utf8'):
+            raise ValueError('Файл {} не найден или не может быть прочитан'.format(option_file))
+    for group in option_groups:
+        if parser.has_section(group):
+            for option, value in parser.items(group):
+                try:
+                    value = ast.literal_eval(value)
+                except (ValueError, SyntaxError):
+                    pass
+                kwargs[option.replace('-', '_')] = value
+    return kwargs
+
+
+def error_code(err: Exception) -> int:
+    """
+    Код ошибки сервера MySQL исключения err драйвера (None, если кода нет)
+    """
+    errno = getattr(err, 'errno', None)  # mysql-connector
+    if errno is None and err.args and isinstance(err.args[0], int):  # PyMySQL, mysqlclient
+        errno = err.args[0]
+    return errno
+
+
+def last_statement(cursor) -> str:
+    """
+    Последний выполненный курсором cursor запрос (для записи в лог)
+    """
+    statement = getattr(cursor, 'statement', None)  # mysql-connector
+    if statement is None:
+        statement = getattr(cursor, '_executed', None)  # PyMySQL, mysqlclient
+    if isinstance(statement, bytes):
+        statement = statement.decode('utf8', errors='replace')
+    return statement
+
+
+class NamedTupleCursor:
+    """
+    Курсор, возвращающий строки результата как namedtuple с именами столбцов
+    (как курсор mysql-connector с named_tuple=True) - для драйверов, у которых такого курсора нет
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._row = None
+
+    def execute(self, statement: str, data=None) -> None:
+        self._cursor.execute(statement, data or None)
+        if self._cursor.description:
+            self._row = namedtuple('Row', [column[0] for column in self._cursor.description])
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return None if row is None else self._row._make(row)
+
+    def fetchall(self) -> list:
+        return [self._row._make(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        return map(self._row._make, self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class Driver:
+    """
+    Драйвер: подключение к серверу и различия библиотек, которые нужны database.Database
+    """
+    name = None
+    Error = Exception  # базовый класс ошибок библиотеки (задаётся при подключении)
+
+    def connect(self, **kwargs):
+        """
+        Возвращает соединение (DB-API 2.0) с параметрами подключения kwargs в именах mysql-connector
+        """
+        raise NotImplementedError
+
+    def cursor(self, connection, *, named_tuple: bool = False, unbuffered: bool = False):
+        """
+        Возвращает курсор соединения connection
+        :param named_tuple: строки результата - namedtuple с именами столбцов
+        :param unbuffered: строки результата читаются с сервера по мере обхода курсора, а не все сразу
+        """
+        raise NotImplementedError
+
+    def select_db(self, connection, db_name: str) -> None:
+        connection.select_db(db_name)
+
+    def is_connected(self, connection) -> bool:
+        return bool(connection.open)
+
+    def __repr__(self):
+        return '<Driver {}>'.format(self.name)
+
+
+class MySQLConnectorDriver(Driver):
+    """
+    mysql-connector-python; use_pure=False - C extension (если она установлена, иначе реализация на Python)
+    """
+    name = 'mysql-connector'
+    use_pure = False
+
+    def connect(self, **kwargs):
+        import mysql.connector
+
+        self.Error = mysql.connector.Error
+        connection = mysql.connector.connect(**dict(kwargs, use_pure=self.use_pure))
+        logging.debug('Соединение mysql-connector: {}.'.format(type(connection).__name__))
+        return connection
+
+    def cursor(self, connection, *, named_tuple: bool = False, unbuffered: bool = False):
+        return connection.cursor(named_tuple=named_tuple)  # курсоры mysql-connector не буферизуют результат
+
+    def select_db(self, connection, db_name: str) -> None:
+        connection.database = db_name
+
+    def is_connected(self, connection) -> bool:
+        return connection.is_connected()
+
+
+class MySQLConnectorPureDriver(MySQLConnectorDriver):
+    """
+    mysql-connector-python, реализация протокола на Python (как было до выбора драйверов; драйвер по умолчанию)
+    """
+    name = 'mysql-connector-pure'
+    use_pure = True
+
+
+class _DBAPIDriver(Driver):
+    """
+    Драйвер библиотеки в стиле MySQLdb (mysqlclient, PyMySQL)
+    """
+    module = None  # имя модуля библиотеки
+
+    def _module(self):
+        module = __import__(self.module)
+        self.Error = module.MySQLError
+        return module
+
+    @staticmethod
+    def _kwargs(kwargs: Dict) -> Dict:
+        kwargs = dict(kwargs)
+        kwargs['local_infile'] = bool(kwargs.pop('allow_local_infile', False))
+        kwargs.setdefault('charset', 'utf8mb4')
+        return kwargs
+
+    def connect(self, **kwargs):
+        return self._module().connect(**self._kwargs(kwargs))
+
+    def _cursor_class(self, unbuffered: bool):
+        raise NotImplementedError
+
+    def cursor(self, connection, *, named_tuple: bool = False, unbuffered: bool = False):
+        cursor = connection.cursor(self._cursor_class(unbuffered))
+        return NamedTupleCursor(cursor) if named_tuple else cursor
+
+
+class MySQLClientDriver(_DBAPIDriver):
+    """
+    mysqlclient (модуль MySQLdb, обёртка над libmysqlclient)
+    """
+    name = 'mysqlclient'
+    module = 'MySQLdb'
+
+    def _cursor_class(self, unbuffered: bool):
+        import MySQLdb.cursors
+
+        return MySQLdb.cursors.SSCursor if unbuffered else MySQLdb.cursors.Cursor
+
+
+class PyMySQLDriver(_DBAPIDriver):
+    """
+    PyMySQL (реализация протокола на Python)
+    """
+    name = 'pymysql'
+    module = 'pymysql'
+
+    def _cursor_class(self, unbuffered: bool):
+        import pymysql.cursors
+
+        return pymysql.cursors.SSCursor if unbuffered else pymysql.cursors.Cursor
+
+
+DRIVERS = {
+    driver.name: driver
+    for driver in (MySQLConnectorDriver, MySQLConnectorPureDriver, MySQLClientDriver, PyMySQLDriver)
+}
+DEFAULT_DRIVER = MySQLConnectorPureDriver.name
+
+
+def get_driver(name: str = None) -> Driver:
+    """
+    Возвращает драйвер name (по умолчанию DEFAULT_DRIVER)
+    """
+    try:
+        return DRIVERS[name or DEFAULT_DRIVER]()
+    except KeyError:
+        raise ValueError('Неизвестный драйвер MySQL {!r}, возможные: {}'.format(name, ', '.join(DRIVERS)))
+
+
+if __name__ == '__main__':
+    # Сравнение драйверов на запросах database: запись в supplier_item (insert_into_supplier_item, новые item'ы и
+    # обновление существующих), обновление meyer_item (update_meyer_item__inventory) и SELECT'ы со строками-namedtuple
+    # (get_from_supplier_brand__name_and_supplier_id_2_supplier_brand_id, get_supplier_number_2_supplier_item_id).
+    # Выполняется в отдельной базе данных <database>_driver_benchmark, которая создаётся и затем удаляется:
+    #     python db_drivers.py [файл конфигурации подключения] [количество item'ов]
+    import sys
+    import time
+
+    import constants
+    import database
+    from items import MeyerItem
+    from suppliers import Meyer
+
+    option_file = sys.argv[1] if len(sys.argv) > 1 else constants.DATABASE_DB_CONFIG_FILE
+    items_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    options = read_option_files(option_file)
+    options.pop('driver', None)
+    options['database'] = '{}_driver_benchmark'.format(options.get('database', 'suppliers'))
+    logging.basicConfig(format='%(asctime)s %(levelname)s:%(message)s', level=logging.WARNING)
+
+    def in_batches(data: list, size: int = 5000):
+        for i in range(0, len(data), size):
+            yield data[i:i + size]
+
+    brands = [{'name': 'Brand {}'.format(i), 'supplier_id': Meyer.id_in_db} for i in range(100)]
+    inventory_fields = [field.attribute for field in MeyerItem.INVENTORY_FIELDS]
+
+    results = {}
+    for name in DRIVERS:
+        try:
+            db = database.Database(create=True, driver=name, **options)
+        except ImportError as err:
+            print('{:<22} не установлен: {}'.format(name, err))
+            continue
+        try:
+            timings = results[name] = {}
+            db.insert_into_supplier_brand(brands)
+            supplier_brand_ids = list(db.get_from_supplier_brand__name_and_supplier_id_2_supplier_brand_id().values())
+            supplier_items = [
+                {
+                    'supplier_brand_id': supplier_brand_ids[i % len(supplier_brand_ids)], 'norm_mpn': 'mpn{}'.format(i),
+                    'available': True, 'prefix': 'MEY', 'mpn': 'MPN-{}'.format(i), 'number': 'MEYMPN-{}'.format(i)
+                }
+                for i in range(items_count)
+            ]
+            for step in ('insert supplier_item', 'upsert supplier_item'):
+                started = time.perf_counter()
+                for batch in in_batches(supplier_items):
+                    db.insert_into_supplier_item(batch)
+                timings[step] = items_count / (time.perf_counter() - started)
+
+            started = time.perf_counter()
+            supplier_item_ids = db.get_supplier_number_2_supplier_item_id(Meyer.id_in_db)
+            timings['SELECT supplier_item'] = len(supplier_item_ids) / (time.perf_counter() - started)
+            started = time.perf_counter()
+            for _ in range(100):
+                db.get_from_supplier_brand__name_and_supplier_id_2_supplier_brand_id()
+            timings['SELECT supplier_brand x100'] = 100 * len(brands) / (time.perf_counter() - started)
+
+            for batch in in_batches(list(supplier_item_ids.values())):
+                db.insert_into_specific_supplier_item(
+                    Meyer, [dict(dict.fromkeys(Meyer.SPECIFIC_FIELDS), supplier_item_id=i) for i in batch]
+                )
+            inventory = [
+                dict(
+                    {field: i % 50 for field in inventory_fields}, supplier_item_id=supplier_item_id, Discontinued=False
+                )
+                for i, supplier_item_id in enumerate(supplier_item_ids.values())
+            ]
+            started = time.perf_counter()
+            for batch in in_batches(inventory):
+                db.update_meyer_item__inventory(batch)
+            timings['update meyer_item'] = len(inventory) / (time.perf_counter() - started)
+            print('{:<22} соединение {}'.format(name, type(db.connection).__module__))
+        finally:
+            db.execute_without_results(
+                'DROP DATABASE IF EXISTS {};'.format(options['database']), many=False, commit=True
+            )
+
+    steps = [step for timings in results.values() for step in timings]
+    print('{:<28}'.format('строк/с') + ''.join('{:>22}'.format(name) for name in results))
+    for step in dict.fromkeys(steps):
+        print('{:<28}'.format(step) + ''.join('{:>22.0f}'.format(results[name].get(step, 0)) for name in results))
@@ -4,23 +4,156 @@ Items of different kinds made from dictionaries
 
 import abc
 import datetime
-from typing import Dict
+from operator import attrgetter
+from typing import Callable, Dict, List
 
 import constants
-from converters import convert_with_check, MaxLenChecker, RangeChecker, EnumChecker
+import sanitizers
+from converters import (
+    compile_fields, convert_columns, convert_with_check, Field, MaxLenChecker, Policy, RangeChecker, EnumChecker,
+    repetitive_fields, value_converter
+)
 from trans_prefix_brand import trans_code
 
 
+def _integer_part(value: str) -> str:
+    """'12.0' -> '12'"""
+    return value.split('.')[0]
+
+
+def _remove_thousands_separators(value: str) -> str:
+    """'1,234.50' -> '1234.50'"""
+    return value.replace(',', '')
+
+
+def _true_false(value: str):
+    """'True' -> True, 'False' -> False, otherwise None"""
+    return True if value == 'True' else False if value == 'False' else None
+
+
+def _yes_no(value: str):
+    """'YES' -> True, 'NO' -> False, otherwise None"""
+    return True if value == 'YES' else False if value == 'NO' else None
+
+
+def _iso_date(value: str) -> datetime.date:
+    """'2019-01-31' -> datetime.date(2019, 1, 31) (ValueError if the value is not a date)"""
+    return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+
+
+# bool(value) for flags, which are True if the value is not empty
+FLAG_POLICY = Policy(replace_if_false=False)
+
+
+def _field_attributes(*field_groups) -> tuple:
+    """The attributes of the fields of all the groups, each once (for __slots__)"""
+    return tuple(dict.fromkeys(field.attribute for fields in field_groups for field in fields))
+
+
+_row_setters = {}  # {(full_parse fields, fields converted by columns): compile_fields(the other fields)}
+
+
 class BaseItem(abc.ABC):
+    # The items keep their attributes in __slots__ (no __dict__ per item): every class declares all the attributes
+    # its __init__ may set, including the attributes of its fields (see _field_attributes).
+    # The items made without full_parse keep their row in the slot _data and convert the full_parse attributes
+    # on the first access (see __getattr__)
+    __slots__ = ()
     mpn_checker = brand_checker = MaxLenChecker(256)
     prefix_checker = MaxLenChecker(10)
+    FULL_PARSE_FIELDS = ()  # attributes set if full_parse (see converters.Field)
+    _lazy_fields = {}  # {attribute: full_parse field}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._lazy_fields = {field.attribute: field for field in cls.FULL_PARSE_FIELDS}
 
     @abc.abstractmethod
     def __init__(self):
         pass
 
+    @classmethod
+    def from_batch(cls, rows: List[Dict[str, str]], *, full_parse=False, **kwargs) -> list:
+        """
+        Make the items of all the rows at once (the same items as cls(row, full_parse=full_parse, **kwargs)):
+        the full_parse attributes with many repeated values (quantities, prices, flags) are converted column by column,
+        every distinct value once (see converters.convert_columns), the rest of the attributes row by row
+        """
+        items = [cls(row, **kwargs) for row in rows]
+        fields = cls._full_parse_fields(**kwargs) if full_parse else ()
+        if fields:
+            by_columns = repetitive_fields(rows, fields)
+            try:
+                set_by_rows = _row_setters[fields, by_columns]
+            except KeyError:
+                set_by_rows = _row_setters[fields, by_columns] = compile_fields(
+                    [field for field in fields if field not in by_columns],
+                    'set_{}_fields_by_rows'.format(cls.__name__)
+                )
+            for item, row in zip(items, rows):
+                del item._data  # the items are made without full_parse, but their attributes are set here
+                set_by_rows(item, row)
+            for field, column in zip(by_columns, convert_columns(rows, by_columns)):
+                attribute = field.attribute
+                for item, value in zip(items, column):
+                    setattr(item, attribute, value)
+        return items
+
+    @classmethod
+    def _full_parse_fields(cls, **kwargs) -> tuple:
+        """
+        Return the fields set if full_parse for the other arguments kwargs of __init__
+        """
+        return cls.FULL_PARSE_FIELDS
+
+    @classmethod
+    def attributes(cls) -> tuple:
+        """
+        Return the names of all the attributes of the items of the class (the __slots__ of the class and its bases)
+        """
+        return tuple(
+            name for klass in reversed(cls.__mro__) for name in vars(klass).get('__slots__', ()) if name != '_data'
+        )
+
+    @staticmethod
+    def values_getter(attributes) -> Callable[['BaseItem'], tuple]:
+        """
+        Return the function f(item) which returns the tuple of the values of the attributes of the item
+        (e.g. the parameters of executemany), it's operator.attrgetter for more than one attribute
+        """
+        if len(attributes) > 1:
+            return attrgetter(*attributes)
+        if attributes:
+            getter = attrgetter(*attributes)
+            return lambda item: (getter(item),)
+        return lambda item: ()
+
+    def __getattr__(self, name: str):
+        """
+        Called only if the slot name is empty: if name is a full_parse attribute of the item made without full_parse,
+        convert its value from the row of the item (with the same checks and warnings as full_parse)
+        and keep it in the slot, so every attribute is converted at most once and only if it's used
+        """
+        try:
+            field = self._lazy_fields[name]
+            data = self._data
+            value = data[field.column]
+        except (KeyError, AttributeError):
+            raise AttributeError('{!r} object has no attribute {!r}'.format(self.__class__.__name__, name)) from None
+        value = value_converter(field)(value, data)
+        setattr(self, name, value)
+        return value
+
     def __repr__(self):
-        return '<{} object: __dict__:{}>'.format(self.__class__.__name__, self.__dict__)
+        values = {}
+        for klass in reversed(self.__class__.__mro__):
+            for name in vars(klass).get('__slots__', ()):
+                try:
+                    values[name] = vars(klass)[name].__get__(self)  # without the conversion of lazy attributes
+                except AttributeError:
+                    pass
+        values.pop('_data', None)
+        return '<{} object: attributes:{}>'.format(self.__class__.__name__, values)
 
 
 class KeystoneItem(BaseItem):
@@ -31,9 +164,34 @@ class KeystoneItem(BaseItem):
     UPCCode_checker = MaxLenChecker(100)
     Prop65Toxicity_checker = EnumChecker(('B', 'C', 'N', 'R'))
 
+    # attributes set if full_parse
+    FULL_PARSE_FIELDS = (
+        Field('LongDescription', 'LongDescription', str, LongDescription_checker),
+        Field('JobberPrice', 'JobberPrice', float, JobberPrice_checker),
+        Field('Cost', 'Cost', float, Cost_checker),
+        Field('Fedexable', 'Fedexable', _true_false, None),
+        Field('ExeterQty', 'ExeterQty', int, ExeterQty_checker),
+        Field('MidWestQty', 'MidWestQty', int, MidWestQty_checker),
+        Field('SouthEastQty', 'SouthEastQty', int, SouthEastQty_checker),
+        Field('TexasQty', 'TexasQty', int, TexasQty_checker),
+        Field('PacificNWQty', 'PacificNWQty', int, PacificNWQty_checker),
+        Field('GreatLakesQty', 'GreatLakesQty', int, GreatLakesQty_checker),
+        Field('CaliforniaQty', 'CaliforniaQty', int, CaliforniaQty_checker),
+        Field('TotalQty', 'TotalQty', int, TotalQty_checker),
+        Field('UPCCode', 'UPCCode', str, UPCCode_checker, sanitizers.strip_excel_quotes),
+        Field('Prop65Toxicity', 'Prop65Toxicity', str, Prop65Toxicity_checker),
+        Field('HazardousMaterial', 'HazardousMaterial', bool, None, policy=FLAG_POLICY),
+    )
+    _set_full_parse_fields = compile_fields(FULL_PARSE_FIELDS, 'set_keystone_full_parse_fields')
+
+    __slots__ = (
+        'mpn', 'brand', 'prefix', 'number', 'norm_mpn', 'norm_brand', '_data'
+    ) + _field_attributes(FULL_PARSE_FIELDS)
+
     def __init__(self, data: Dict[str, str], *, full_parse=False) -> None:
         mpn = convert_with_check(
             value=data['PartNumber'].lstrip('="').rstrip('"'),
+            field='PartNumber',
             output_type=str,
             checker=self.mpn_checker,
             replace_if_false=False,
@@ -44,10 +202,11 @@ class KeystoneItem(BaseItem):
             warn_if_checker_error=True,
             info=data
         )
-        self.mpn = constants.delete_unprintable(mpn)
+        self.mpn, self.norm_mpn = sanitizers.clean_number(mpn)
 
         brand = convert_with_check(
             value=data['VendorName'],
+            field='VendorName',
             output_type=str,
             checker=self.brand_checker,
             replace_if_false=False,
@@ -58,10 +217,11 @@ class KeystoneItem(BaseItem):
             warn_if_checker_error=True,
             info=data
         )
-        self.brand = constants.delete_unprintable(brand)
+        self.brand, self.norm_brand = constants.clean_brand(brand)
 
         prefix = convert_with_check(
             value=data['VenCode'],
+            field='VenCode',
             output_type=str,
             checker=self.prefix_checker,
             replace_if_false=False,
@@ -72,93 +232,14 @@ class KeystoneItem(BaseItem):
             warn_if_checker_error=True,
             info=data
         )
-        self.prefix = constants.delete_unprintable(prefix)
+        self.prefix = sanitizers.delete_unprintable(prefix)
 
         self.number = self.prefix + ' ' + self.mpn
-        self.norm_mpn = constants.normalize_number(self.mpn)
-        self.norm_brand = constants.normalize_brand(self.brand)
 
         if full_parse:
-            self.LongDescription = convert_with_check(
-                value=data['LongDescription'],
-                output_type=str,
-                checker=self.LongDescription_checker,
-                info=data
-            )
-            self.JobberPrice = convert_with_check(
-                value=data['JobberPrice'],
-                output_type=float,
-                checker=self.JobberPrice_checker,
-                info=data
-            )
-            self.Cost = convert_with_check(
-                value=data['Cost'],
-                output_type=float,
-                checker=self.Cost_checker,
-                info=data
-            )
-            self.Fedexable = True if data['Fedexable'] == 'True' else False if data['Fedexable'] == 'False' else None
-            self.ExeterQty = convert_with_check(
-                value=data['ExeterQty'],
-                output_type=int,
-                checker=self.ExeterQty_checker,
-                info=data
-            )
-            self.MidWestQty = convert_with_check(
-                value=data['MidWestQty'],
-                output_type=int,
-                checker=self.MidWestQty_checker,
-                info=data
-            )
-            self.SouthEastQty = convert_with_check(
-                value=data['SouthEastQty'],
-                output_type=int,
-                checker=self.SouthEastQty_checker,
-                info=data
-            )
-            self.TexasQty = convert_with_check(
-                value=data['TexasQty'],
-                output_type=int,
-                checker=self.TexasQty_checker,
-                info=data
-            )
-            self.PacificNWQty = convert_with_check(
-                value=data['PacificNWQty'],
-                output_type=int,
-                checker=self.PacificNWQty_checker,
-                info=data
-            )
-            self.GreatLakesQty = convert_with_check(
-                value=data['GreatLakesQty'],
-                output_type=int,
-                checker=self.GreatLakesQty_checker,
-                info=data
-            )
-            self.CaliforniaQty = convert_with_check(
-                value=data['CaliforniaQty'],
-                output_type=int,
-                checker=self.CaliforniaQty_checker,
-                info=data
-            )
-            self.TotalQty = convert_with_check(
-                value=data['TotalQty'],
-                output_type=int,
-                checker=self.TotalQty_checker,
-                info=data
-            )
-            self.UPCCode = convert_with_check(
-                value=data['UPCCode'].lstrip('="').rstrip('"'),
-                output_type=str,
-                checker=self.UPCCode_checker,
-                info=data
-            )
-            self.Prop65Toxicity = convert_with_check(
-                value=data['Prop65Toxicity'],
-                output_type=str,
-                checker=self.Prop65Toxicity_checker,
-                info=data
-            )
-            self.HazardousMaterial = True if data['HazardousMaterial'] else False
+            self._set_full_parse_fields(data)
+        else:
+            self._data = data
 
         super().__init__()
 
@@ -175,10 +256,60 @@ class MeyerItem(BaseItem):
     Weight_checker = Height_checker = Length_checker = Width_checker = RangeChecker(0, 999999.99)
     Category_checker = Sub_Category_checker = MaxLenChecker(256)
 
+    # attributes set if inventory
+    INVENTORY_FIELDS = (
+        Field('Qty_008', '008 Qty', int, Qty_008_checker, _integer_part),
+        Field('Qty_032', '032 Qty', int, Qty_032_checker, _integer_part),
+        Field('Qty_041', '041 Qty', int, Qty_041_checker, _integer_part),
+        Field('Qty_044', '044 Qty', int, Qty_044_checker, _integer_part),
+        Field('Qty_053', '053 Qty', int, Qty_053_checker, _integer_part),
+        Field('Qty_062', '062 Qty', int, Qty_062_checker, _integer_part),
+        Field('Qty_063', '063 Qty', int, Qty_063_checker, _integer_part),
+        Field('Qty_065', '065 Qty', int, Qty_065_checker, _integer_part),
+        Field('Qty_068', '068 Qty', int, Qty_068_checker, _integer_part),
+        Field('Qty_069', '069 Qty', int, Qty_069_checker, _integer_part),
+        Field('Qty_070', '070 Qty', int, Qty_070_checker, _integer_part),
+        Field('Qty_071', '071 Qty', int, Qty_071_checker, _integer_part),
+        Field('Qty_072', '072 Qty', int, Qty_072_checker, _integer_part),
+        Field('Qty_077', '077 Qty', int, Qty_077_checker, _integer_part),
+        Field('Qty_093', '093 Qty', int, Qty_093_checker, _integer_part),
+        Field('Qty_094', '094 Qty', int, Qty_094_checker, _integer_part),
+        Field('Qty_098', '098 Qty', int, Qty_098_checker, _integer_part),
+        Field('Discontinued', 'Discontinued', _yes_no, None),
+    )
+    _set_inventory_fields = compile_fields(INVENTORY_FIELDS, 'set_meyer_inventory_fields')
+
+    # attributes set if full_parse (pricing)
+    FULL_PARSE_FIELDS = (
+        Field('Description', 'Description', str, Description_checker),
+        Field('Jobber_Price', 'Jobber Price', float, Jobber_Price_checker),
+        Field('Customer_Price', 'Customer Price', float, Customer_Price_checker),
+        Field('UPC', 'UPC', str, UPC_checker),
+        Field('MAP', 'MAP', float, MAP_checker),
+        Field('Length', 'Length', float, Length_checker),
+        Field('Width', 'Width', float, Width_checker),
+        Field('Height', 'Height', float, Height_checker),
+        Field('Weight', 'Weight', float, Weight_checker),
+        Field('Category', 'Category', str, Category_checker),
+        Field('Sub_Category', 'Sub-Category', str, Sub_Category_checker),
+        Field('LTL_Eligible', 'LTL Eligible', _true_false, None),
+        Field('Discontinued', 'Discontinued', _yes_no, None),
+    )
+    _set_full_parse_fields = compile_fields(FULL_PARSE_FIELDS, 'set_meyer_full_parse_fields')
+
+    __slots__ = (
+        'Meyer_SKU', 'mpn', 'brand', 'prefix', 'number', 'norm_mpn', 'norm_brand', '_data'
+    ) + _field_attributes(INVENTORY_FIELDS, FULL_PARSE_FIELDS)
+
+    @classmethod
+    def _full_parse_fields(cls, *, inventory=False) -> tuple:
+        return () if inventory else cls.FULL_PARSE_FIELDS
+
     def __init__(self, data: Dict[str, str], *, full_parse=False, inventory=False) -> None:
         if inventory:  # Разбор inventory
             _Meyer_SKU = convert_with_check(
                 value=data['Meyer SKU'],
+                field='Meyer SKU',
                 output_type=str,
                 checker=self.Meyer_SKU_checker,
                 replace_if_false=False,
@@ -189,116 +320,14 @@ class MeyerItem(BaseItem):
                 warn_if_checker_error=True,
                 info=data
             )
-            self.Meyer_SKU = constants.delete_unprintable(_Meyer_SKU)
+            self.Meyer_SKU = sanitizers.delete_unprintable(_Meyer_SKU)
 
-            self.Qty_008 = convert_with_check(
-                value=data['008 Qty'].split('.')[0],
-                output_type=int,
-                checker=self.Qty_008_checker,
-                info=data
-            )
-            self.Qty_032 = convert_with_check(
-                value=data['032 Qty'].split('.')[0],
-                output_type=int,
-                checker=self.Qty_032_checker,
-                info=data
-            )
-            self.Qty_041 = convert_with_check(
-                value=data['041 Qty'].split('.')[0],
-                output_type=int,
-                checker=self.Qty_041_checker,
-                info=data
-            )
-            self.Qty_044 = convert_with_check(
-                value=data['044 Qty'].split('.')[0],
-                output_type=int,
-                checker=self.Qty_044_checker,
-                info=data
-            )
-            self.Qty_053 = convert_with_check(
-                value=data['053 Qty'].split('.')[0],
-                output_type=int,
-                checker=self.Qty_053_checker,
-                info=data
-            )
-            self.Qty_062 = convert_with_check(
-                value=data['062 Qty'].split('.')[0],
-                output_type=int,
-                checker=self.Qty_062_checker,
-                info=data
-            )
-            self.Qty_063 = convert_with_check(
-                value=data['063 Qty'].split('.')[0],
-                output_type=int,
-                checker=self.Qty_063_checker,
-                info=data
-            )
-            self.Qty_065 = convert_with_check(
-                value=data['065 Qty'].split('.')[0],
-                output_type=int,
-                checker=self.Qty_065_checker,
-                info=data
-            )
-            self.Qty_068 = convert_with_check(
-                value=data['068 Qty'].split('.')[0],
-                output_type=int,
-                checker=self.Qty_068_checker,
-                info=data
-            )
-            self.Qty_069 = convert_with_check(
-                value=data['069 Qty'].split('.')[0],
-                output_type=int,
-                checker=self.Qty_069_checker,
-                info=data
-            )
-            self.Qty_070 = convert_with_check(
-                value=data['070 Qty'].split('.')[0],
-                output_type=int,
-                checker=self.Qty_070_checker,
-                info=data
-            )
-            self.Qty_071 = convert_with_check(
-                value=data['071 Qty'].split('.')[0],
-                output_type=int,
-                checker=self.Qty_071_checker,
-                info=data
-            )
-            self.Qty_072 = convert_with_check(
-                value=data['072 Qty'].split('.')[0],
-                output_type=int,
-                checker=self.Qty_072_checker,
-                info=data
-            )
-            self.Qty_077 = convert_with_check(
-                value=data['077 Qty'].split('.')[0],
-                output_type=int,
-                checker=self.Qty_077_checker,
-                info=data
-            )
-            self.Qty_093 = convert_with_check(
-                value=data['093 Qty'].split('.')[0],
-                output_type=int,
-                checker=self.Qty_093_checker,
-                info=data
-            )
-            self.Qty_094 = convert_with_check(
-                value=data['094 Qty'].split('.')[0],
-                output_type=int,
-                checker=self.Qty_094_checker,
-                info=data
-            )
-            self.Qty_098 = convert_with_check(
-                value=data['098 Qty'].split('.')[0],
-                output_type=int,
-                checker=self.Qty_098_checker,
-                info=data
-            )
-            self.Discontinued = True if data['Discontinued'] == 'YES' \
-                else False if data['Discontinued'] == 'NO' else None
+            self._set_inventory_fields(data)
 
         else:  # Разбор pricing
             mpn = convert_with_check(
                 value=data['Meyer SKU'][3:],
+                field='Meyer SKU',
                 output_type=str,
                 checker=self.mpn_checker,
                 replace_if_false=False,
@@ -309,10 +338,11 @@ class MeyerItem(BaseItem):
                 warn_if_checker_error=True,
                 info=data
             )
-            self.mpn = constants.delete_unprintable(mpn)
+            self.mpn, self.norm_mpn = sanitizers.clean_number(mpn)
 
             brand = convert_with_check(
                 value=data['Manufacturer Name'],
+                field='Manufacturer Name',
                 output_type=str,
                 checker=self.brand_checker,
                 replace_if_false=False,
@@ -323,10 +353,11 @@ class MeyerItem(BaseItem):
                 warn_if_checker_error=True,
                 info=data
             )
-            self.brand = constants.delete_unprintable(brand)
+            self.brand, self.norm_brand = constants.clean_brand(brand)
 
             prefix = convert_with_check(
                 value=data['Meyer SKU'][:3],
+                field='Meyer SKU',
                 output_type=str,
                 checker=self.prefix_checker,
                 replace_if_false=False,
@@ -337,84 +368,14 @@ class MeyerItem(BaseItem):
                 warn_if_checker_error=True,
                 info=data
             )
-            self.prefix = constants.delete_unprintable(prefix)
+            self.prefix = sanitizers.delete_unprintable(prefix)
 
             self.number = self.prefix + self.mpn
-            self.norm_mpn = constants.normalize_number(self.mpn)
-            self.norm_brand = constants.normalize_brand(self.brand)
 
             if full_parse:
-                self.Description = convert_with_check(
-                    value=data['Description'],
-                    output_type=str,
-                    checker=self.Description_checker,
-                    info=data
-                )
-
-                self.Jobber_Price = convert_with_check(
-                    value=data['Jobber Price'],
-                    output_type=float,
-                    checker=self.Jobber_Price_checker,
-                    info=data
-                )
-                self.Customer_Price = convert_with_check(
-                    value=data['Customer Price'],
-                    output_type=float,
-                    checker=self.Customer_Price_checker,
-                    info=data
-                )
-                self.UPC = convert_with_check(
-                    value=data['UPC'],
-                    output_type=str,
-                    checker=self.UPC_checker,
-                    info=data
-                )
-                self.MAP = convert_with_check(
-                    value=data['MAP'],
-                    output_type=float,
-                    checker=self.MAP_checker,
-                    info=data
-                )
-                self.Length = convert_with_check(
-                    value=data['Length'],
-                    output_type=float,
-                    checker=self.Length_checker,
-                    info=data
-                )
-                self.Width = convert_with_check(
-                    value=data['Width'],
-                    output_type=float,
-                    checker=self.Width_checker,
-                    info=data
-                )
-                self.Height = convert_with_check(
-                    value=data['Height'],
-                    output_type=float,
-                    checker=self.Height_checker,
-                    info=data
-                )
-                self.Weight = convert_with_check(
-                    value=data['Weight'],
-                    output_type=float,
-                    checker=self.Weight_checker,
-                    info=data
-                )
-                self.Category = convert_with_check(
-                    value=data['Category'],
-                    output_type=str,
-                    checker=self.Category_checker,
-                    info=data
-                )
-                self.Sub_Category = convert_with_check(
-                    value=data['Sub-Category'],
-                    output_type=str,
-                    checker=self.Sub_Category_checker,
-                    info=data
-                )
-                self.LTL_Eligible = True if data['LTL Eligible'] == 'True' \
-                    else False if data['LTL Eligible'] == 'False' else None
-                self.Discontinued = True if data['Discontinued'] == 'YES' \
-                    else False if data['Discontinued'] == 'NO' else None
+                self._set_full_parse_fields(data)
+            else:
+                self._data = data
 
         super().__init__()
 
@@ -426,9 +387,26 @@ class PremierItem(BaseItem):
     Part_Description_checker = MaxLenChecker(5000)
     Inventory_Type_checker = EnumChecker(('Discontinued', 'NonStocking', 'Stocking'))
 
+    # attributes set if full_parse
+    FULL_PARSE_FIELDS = (
+        Field('Distributor_Cost', 'Distributor Cost', float, Distributor_Cost_checker),
+        Field('Package_Quantity', 'Package Quantity', int, Package_Quantity_checker),
+        Field('Core_Price', 'Core Price', float, Core_Price_checker),
+        Field('UPC', 'UPC', str, UPC_checker),
+        Field('Part_Description', 'Part Description', str, Part_Description_checker),
+        Field('Inventory_Count', 'Inventory Count', int, Inventory_Count_checker),
+        Field('Inventory_Type', 'Inventory Type', str, Inventory_Type_checker),
+    )
+    _set_full_parse_fields = compile_fields(FULL_PARSE_FIELDS, 'set_premier_full_parse_fields')
+
+    __slots__ = (
+        'brand', 'prefix', 'mpn', 'number', 'norm_mpn', 'norm_brand', '_data'
+    ) + _field_attributes(FULL_PARSE_FIELDS)
+
     def __init__(self, data: Dict[str, str], *, full_parse=False) -> None:
         brand = convert_with_check(
             value=data['Brand'],
+            field='Brand',
             output_type=str,
             checker=self.brand_checker,
             replace_if_false=False,
@@ -439,10 +417,11 @@ class PremierItem(BaseItem):
             warn_if_checker_error=True,
             info=data
         )
-        self.brand = constants.delete_unprintable(brand)
+        self.brand, self.norm_brand = constants.clean_brand(brand)
 
         prefix = convert_with_check(
             value=data['Line Code'],
+            field='Line Code',
             output_type=str,
             checker=self.prefix_checker,
             replace_if_false=False,
@@ -453,10 +432,11 @@ class PremierItem(BaseItem):
             warn_if_checker_error=True,
             info=data
         )
-        self.prefix = constants.delete_unprintable(prefix)
+        self.prefix = sanitizers.delete_unprintable(prefix)
 
         mpn = convert_with_check(
             value=data['SKU'].replace(prefix, '', 1),
+            field='SKU',
             output_type=str,
             checker=self.mpn_checker,
             replace_if_false=False,
@@ -467,55 +447,14 @@ class PremierItem(BaseItem):
             warn_if_checker_error=True,
             info=data
         )
-        self.mpn = constants.delete_unprintable(mpn)
+        self.mpn, self.norm_mpn = sanitizers.clean_number(mpn)
 
         self.number = self.prefix + self.mpn
-        self.norm_mpn = constants.normalize_number(self.mpn)
-        self.norm_brand = constants.normalize_brand(self.brand)
 
         if full_parse:
-            self.Distributor_Cost = convert_with_check(
-                value=data['Distributor Cost'],
-                output_type=float,
-                checker=self.Distributor_Cost_checker,
-                info=data
-            )
-            self.Package_Quantity = convert_with_check(
-                value=data['Package Quantity'],
-                output_type=int,
-                checker=self.Package_Quantity_checker,
-                info=data
-            )
-            self.Core_Price = convert_with_check(
-                value=data['Core Price'],
-                output_type=float,
-                checker=self.Core_Price_checker,
-                info=data
-            )
-            self.UPC = convert_with_check(
-                value=data['UPC'],
-                output_type=str,
-                checker=self.UPC_checker,
-                info=data
-            )
-            self.Part_Description = convert_with_check(
-                value=data['Part Description'],
-                output_type=str,
-                checker=self.Part_Description_checker,
-                info=data
-            )
-            self.Inventory_Count = convert_with_check(
-                value=data['Inventory Count'],
-                output_type=int,
-                checker=self.Inventory_Count_checker,
-                info=data
-            )
-            self.Inventory_Type = convert_with_check(
-                value=data['Inventory Type'],
-                output_type=str,
-                checker=self.Inventory_Type_checker,
-                info=data
-            )
+            self._set_full_parse_fields(data)
+        else:
+            self._data = data
 
         super().__init__()
 
@@ -526,9 +465,30 @@ class TransItem(BaseItem):
     LIST_PRICE_checker = JOBBER_PRICE_checker = RangeChecker(0, 999999.9999)
     STATUS_checker = EnumChecker(('A', 'B', 'D', 'K', 'M', 'N', 'R'))
 
+    # attributes set if full_parse
+    FULL_PARSE_FIELDS = (
+        Field('CA', 'CA', int, CA_checker),
+        Field('TX', 'TX', int, TX_checker),
+        Field('FL', 'FL', int, FL_checker),
+        Field('CO', 'CO', int, CO_checker),
+        Field('OH', 'OH', int, OH_checker),
+        Field('ID', 'ID', int, ID_checker),
+        Field('PA', 'PA', int, PA_checker),
+        Field('LIST_PRICE', 'LIST_PRICE', float, LIST_PRICE_checker),
+        Field('JOBBER_PRICE', 'JOBBER_PRICE', float, JOBBER_PRICE_checker),
+        Field('TOTAL', 'TOTAL', int, TOTAL_checker),
+        Field('STATUS', 'STATUS', str, STATUS_checker),
+    )
+    _set_full_parse_fields = compile_fields(FULL_PARSE_FIELDS, 'set_trans_full_parse_fields')
+
+    __slots__ = (
+        'prefix', 'mpn', 'brand', 'number', 'norm_mpn', 'norm_brand', '_data'
+    ) + _field_attributes(FULL_PARSE_FIELDS)
+
     def __init__(self, data: Dict[str, str], *, full_parse=False) -> None:
         prefix = convert_with_check(
             value=data['LINE'],
+            field='LINE',
             output_type=str,
             checker=self.prefix_checker,
             replace_if_false=False,
@@ -539,10 +499,11 @@ class TransItem(BaseItem):
             warn_if_checker_error=True,
             info=data
         )
-        self.prefix = constants.delete_unprintable(prefix)
+        self.prefix = sanitizers.delete_unprintable(prefix)
 
         mpn = convert_with_check(
             value=data['PART_NUMBER_FULL'].replace(prefix, '', 1),
+            field='PART_NUMBER_FULL',
             output_type=str,
             checker=self.mpn_checker,
             replace_if_false=False,
@@ -553,10 +514,11 @@ class TransItem(BaseItem):
             warn_if_checker_error=True,
             info=data
         )
-        self.mpn = constants.delete_unprintable(mpn)
+        self.mpn, self.norm_mpn = sanitizers.clean_number(mpn)
 
         brand = convert_with_check(
             value=trans_code.get(self.prefix, 'NOT DEFINED IN TRANS WITH PREFIX  ' + self.prefix),
+            field='LINE',
             output_type=str,
             checker=self.brand_checker,
             replace_if_false=False,
@@ -567,79 +529,14 @@ class TransItem(BaseItem):
             warn_if_checker_error=True,
             info=data
         )
-        self.brand = constants.delete_unprintable(brand)
+        self.brand, self.norm_brand = constants.clean_brand(brand)
 
         self.number = self.prefix + self.mpn
-        self.norm_mpn = constants.normalize_number(self.mpn)
-        self.norm_brand = constants.normalize_brand(self.brand)
 
         if full_parse:
-            self.CA = convert_with_check(
-                data['CA'],
-                output_type=int,
-                checker=self.CA_checker,
-                info=data
-            )
-            self.TX = convert_with_check(
-                data['TX'],
-                output_type=int,
-                checker=self.TX_checker,
-                info=data
-            )
-            self.FL = convert_with_check(
-                data['FL'],
-                output_type=int,
-                checker=self.FL_checker,
-                info=data
-            )
-            self.CO = convert_with_check(
-                data['CO'],
-                output_type=int,
-                checker=self.CO_checker,
-                info=data
-            )
-            self.OH = convert_with_check(
-                data['OH'],
-                output_type=int,
-                checker=self.OH_checker,
-                info=data
-            )
-            self.ID = convert_with_check(
-                data['ID'],
-                output_type=int,
-                checker=self.ID_checker,
-                info=data
-            )
-            self.PA = convert_with_check(
-                data['PA'],
-                output_type=int,
-                checker=self.PA_checker,
-                info=data
-            )
-            self.LIST_PRICE = convert_with_check(
-                data['LIST_PRICE'],
-                output_type=float,
-                checker=self.LIST_PRICE_checker,
-                info=data
-            )
-            self.JOBBER_PRICE = convert_with_check(
-                data['JOBBER_PRICE'],
-                output_type=float,
-                checker=self.JOBBER_PRICE_checker,
-                info=data
-            )
-            self.TOTAL = convert_with_check(
-                data['TOTAL'],
-                output_type=int,
-                checker=self.TOTAL_checker,
-                info=data
-            )
-            self.STATUS = convert_with_check(
-                data['STATUS'],
-                output_type=str,
-                checker=self.STATUS_checker,
-                info=data
-            )
+            self._set_full_parse_fields(data)
+        else:
+            self._data = data
 
         super().__init__()
 
@@ -656,9 +553,36 @@ class Turn14Item(BaseItem):
     DSFee_checker = MaxLenChecker(100)
     Weight_checker = RangeChecker(0, 999999.99)
 
+    # attributes set if full_parse
+    FULL_PARSE_FIELDS = (
+        Field('Description', 'Description', str, Description_checker),
+        Field('Cost', 'Cost', float, Cost_checker, _remove_thousands_separators),
+        Field('Retail', 'Retail', float, Retail_checker, _remove_thousands_separators),
+        Field('Jobber', 'Jobber', float, Jobber_checker, _remove_thousands_separators),
+        Field('CoreCharge', 'CoreCharge', float, CoreCharge_checker, _remove_thousands_separators),
+        Field('Map', 'Map', float, Map_checker, _remove_thousands_separators),
+        Field('Other', 'Other', float, Other_checker, _remove_thousands_separators),
+        Field('OtherName', 'OtherName', str, OtherName_checker),
+        Field('EastStock', 'EastStock', int, EastStock_checker),
+        Field('WestStock', 'WestStock', int, WestStock_checker),
+        Field('CentralStock', 'CentralStock', int, CentralStock_checker),
+        Field('Stock', 'Stock', int, Stock_checker),
+        Field('MfrStock', 'MfrStock', int, MfrStock_checker),
+        Field('MfrStockDate', 'MfrStockDate', _iso_date, None),
+        Field('DropShip', 'DropShip', str, DropShip_checker),
+        Field('DSFee', 'DSFee', str, DSFee_checker),
+        Field('Weight', 'Weight', float, Weight_checker, _remove_thousands_separators),
+    )
+    _set_full_parse_fields = compile_fields(FULL_PARSE_FIELDS, 'set_turn14_full_parse_fields')
+
+    __slots__ = (
+        'mpn', 'brand', 'prefix', 'number', 'norm_mpn', 'norm_brand', '_data'
+    ) + _field_attributes(FULL_PARSE_FIELDS)
+
     def __init__(self, data: Dict[str, str], *, full_parse=False) -> None:
         mpn = convert_with_check(
             value=data['PartNumber'],
+            field='PartNumber',
             output_type=str,
             checker=self.mpn_checker,
             replace_if_false=False,
@@ -669,10 +593,11 @@ class Turn14Item(BaseItem):
             warn_if_checker_error=True,
             info=data
         )
-        self.mpn = constants.delete_unprintable(mpn)
+        self.mpn, self.norm_mpn = sanitizers.clean_number(mpn)
 
         brand = convert_with_check(
             value=data['PrimaryVendor'],
+            field='PrimaryVendor',
             output_type=str,
             checker=self.brand_checker,
             replace_if_false=False,
@@ -683,10 +608,11 @@ class Turn14Item(BaseItem):
             warn_if_checker_error=True,
             info=data
         )
-        self.brand = constants.delete_unprintable(brand)
+        self.brand, self.norm_brand = constants.clean_brand(brand)
 
         prefix = convert_with_check(
             value=''.join(data['InternalPartNumber'].rsplit(mpn, 1)),
+            field='InternalPartNumber',
             output_type=str,
             checker=self.prefix_checker,
             replace_if_false=False,
@@ -697,119 +623,20 @@ class Turn14Item(BaseItem):
             warn_if_checker_error=True,
             info=data
         )
-        self.prefix = constants.delete_unprintable(prefix)
+        self.prefix = sanitizers.delete_unprintable(prefix)
 
         self.number = self.prefix + self.mpn
-        self.norm_mpn = constants.normalize_number(self.mpn)
-        self.norm_brand = constants.normalize_brand(self.brand)
 
         if full_parse:
-            self.Description = convert_with_check(
-                value=data['Description'],
-                output_type=str,
-                checker=self.Description_checker,
-                info=data
-            )
-            self.Cost = convert_with_check(
-                value=data['Cost'].replace(',', ''),
-                output_type=float,
-                checker=self.Cost_checker,
-                info=data
-            )
-            self.Retail = convert_with_check(
-                value=data['Retail'].replace(',', ''),
-                output_type=float,
-                checker=self.Retail_checker,
-                info=data
-            )
-            self.Jobber = convert_with_check(
-                value=data['Jobber'].replace(',', ''),
-                output_type=float,
-                checker=self.Jobber_checker,
-                info=data
-            )
-            self.CoreCharge = convert_with_check(
-                value=data['CoreCharge'].replace(',', ''),
-                output_type=float,
-                checker=self.CoreCharge_checker,
-                info=data
-            )
-            self.Map = convert_with_check(
-                value=data['Map'].replace(',', ''),
-                output_type=float,
-                checker=self.Map_checker,
-                info=data
-            )
-            self.Other = convert_with_check(
-                value=data['Other'].replace(',', ''),
-                output_type=float,
-                checker=self.Other_checker,
-                info=data
-            )
-            self.OtherName = convert_with_check(
-                value=data['OtherName'],
-                output_type=str,
-                checker=self.OtherName_checker,
-                info=data
-            )
-            self.EastStock = convert_with_check(
-                value=data['EastStock'],
-                output_type=int,
-                checker=self.EastStock_checker,
-                info=data
-            )
-            self.WestStock = convert_with_check(
-                value=data['WestStock'],
-                output_type=int,
-                checker=self.WestStock_checker,
-                info=data
-            )
-            self.CentralStock = convert_with_check(
-                value=data['CentralStock'],
-                output_type=int,
-                checker=self.CentralStock_checker,
-                info=data
-            )
-            self.Stock = convert_with_check(
-                value=data['Stock'],
-                output_type=int,
-                checker=self.Stock_checker,
-                info=data
-            )
-            self.MfrStock = convert_with_check(
-                value=data['MfrStock'],
-                output_type=int,
-                checker=self.MfrStock_checker,
-                info=data
-            )
-            try:
-                _MfrStockDate = datetime.datetime.strptime(data['MfrStockDate'], '%Y-%m-%d').date()
-            except ValueError:
-                _MfrStockDate = None
-            self.MfrStockDate = _MfrStockDate
-            self.DropShip = convert_with_check(
-                value=data['DropShip'],
-                output_type=str,
-                checker=self.DropShip_checker,
-                info=data
-            )
-            self.DSFee = convert_with_check(
-                value=data['DSFee'],
-                output_type=str,
-                checker=self.DSFee_checker,
-                info=data
-            )
-            self.Weight = convert_with_check(
-                value=data['Weight'].replace(',', ''),
-                output_type=float,
-                checker=self.Weight_checker,
-                info=data
-            )
+            self._set_full_parse_fields(data)
+        else:
+            self._data = data
 
         super().__init__()
 
 
 class AutocareBrandItem(BaseItem):
+    __slots__ = ('brand_id', 'brand_name', 'owner_id', 'owner_name', 'parent_id', 'parent_name')
     brand_id_checker = owner_id_checker = parent_id_checker = MaxLenChecker(4)
     brand_name_checker = owner_name_checker = parent_name_checker = MaxLenChecker(256)
 
@@ -865,6 +692,7 @@ class AutocareBrandItem(BaseItem):
 
 
 class BrandAutocareBrandItem(AutocareBrandItem):
+    __slots__ = ('norm_name',)
     name_checker = MaxLenChecker(256)
 
     def __init__(self, data: dict) -> None:
@@ -874,8 +702,8 @@ class BrandAutocareBrandItem(AutocareBrandItem):
             checker=self.name_checker
         )
         if name:
-            name = constants.delete_unprintable(name)
-            self.norm_name = constants.normalize_brand(name)
+            name = sanitizers.delete_unprintable(name)
+            self.norm_name = sanitizers.normalize_brand(name)
         else:
             self.norm_name = None
 
@@ -883,6 +711,7 @@ class BrandAutocareBrandItem(AutocareBrandItem):
 
 
 class ExactBrandItem(BaseItem):
+    __slots__ = ('exact_name', 'norm_name')
     exact_name_checker = norm_name_checker = MaxLenChecker(256)
 
     def __init__(self, data: dict) -> None:
@@ -892,8 +721,8 @@ class ExactBrandItem(BaseItem):
             checker=self.norm_name_checker
         )
         if name:
-            name = constants.delete_unprintable(name)
-            self.norm_name = constants.normalize_brand(name)
+            name = sanitizers.delete_unprintable(name)
+            self.norm_name = sanitizers.normalize_brand(name)
         else:
             self.norm_name = None
 
@@ -906,6 +735,11 @@ class ExactBrandItem(BaseItem):
 
 
 class MeyerAPIInformationItem(BaseItem):
+    __slots__ = (
+        'Additional_Handling_Charge', 'CustomerPrice', 'Height', 'ItemDescription', 'ItemNumber', 'JobberPrice', 'Kit',
+        'Kit_Only', 'LTL_Required', 'Length', 'MinAdvertisedPrice', 'Oversize', 'Discontinued', 'QtyAvailable',
+        'SuggestedRetailPrice', 'UPC', 'Weight', 'Width'
+    )
     ItemNumber_checker = MaxLenChecker(266)
     CustomerPrice_checker = JobberPrice_checker = MinAdvertisedPrice_checker = SuggestedRetailPrice_checker = \
         RangeChecker(0, 999999.9999)
@@ -1066,6 +900,10 @@ class MeyerAPIInformationItem(BaseItem):
 
 
 class PremierAPIPricingItem(BaseItem):
+    __slots__ = (
+        'premier_number', 'cost_usd', 'jobber_usd', 'map_usd', 'retail_usd', 'cost_cad', 'jobber_cad', 'map_cad',
+        'retail_cad'
+    )
     premier_number_checker = MaxLenChecker(266)
     cost_usd_checker = cost_cad_checker = jobber_usd_checker = jobber_cad_checker = \
         map_usd_checker = map_cad_checker = retail_usd_checker = retail_cad_checker = RangeChecker(0, 999999.99)
@@ -1171,6 +1009,10 @@ class PremierAPIPricingItem(BaseItem):
 
 # noinspection PyPep8Naming
 class PremierAPIInventoryItem(BaseItem):
+    __slots__ = (
+        'premier_number', 'Qty_UT_1_US', 'Qty_KY_1_US', 'Qty_TX_1_US', 'Qty_CA_1_US', 'Qty_AB_1_CA', 'Qty_WA_1_US',
+        'Qty_CO_1_US', 'Qty_PO_1_CA'
+    )
     premier_number_checker = MaxLenChecker(266)
     Qty_UT_1_US_checker = Qty_KY_1_US_checker = Qty_TX_1_US_checker = Qty_CA_1_US_checker = Qty_AB_1_CA_checker = \
         Qty_WA_1_US_checker = Qty_CO_1_US_checker = Qty_PO_1_CA_checker = RangeChecker(0, 16777215)
@@ -1294,6 +1136,9 @@ class PremierAPIInventoryItem(BaseItem):
 
 
 class Turn14APIAllItemsItem(BaseItem):
+    __slots__ = (
+        'item_id_in_api', 'product_name', 'number', 'category', 'subcategory', 'dimensions', 'thumbnail', 'barcode'
+    )
     item_id_in_api_checker = MaxLenChecker(20)
     product_name_checker = category_checker = subcategory_checker = \
         dimensions_checker = thumbnail_checker = MaxLenChecker(256)
@@ -1324,7 +1169,7 @@ class Turn14APIAllItemsItem(BaseItem):
             warn_if_conversion_error=True,
             warn_if_checker_error=True
         )
-        self.number = constants.delete_unprintable(number) if number else None
+        self.number = sanitizers.delete_unprintable(number) if number else None
         self.category = convert_with_check(
             value=attributes.get('category'),
             output_type=str,
@@ -1363,6 +1208,7 @@ class Turn14APIAllItemsItem(BaseItem):
 
 
 class Turn14APIAllItemDataItem(BaseItem):
+    __slots__ = ('item_id_in_api', 'files', 'vehicle_fitments_ids')
     item_id_in_api_checker = MaxLenChecker(20)
     media_content_checker = url_checker = MaxLenChecker(256)
     height_checker = width_checker = RangeChecker(0, 65535)
@@ -1434,6 +1280,10 @@ class Turn14APIAllItemDataItem(BaseItem):
 
 
 class TransFileItem(BaseItem):
+    __slots__ = (
+        'prefix', 'mpn', 'brand', 'number', 'norm_mpn', 'norm_brand', 'Description', 'Your_Price', 'Jobber',
+        'MAP_CONFIRM_W_JOBBER', 'Core_Price', 'Federal_Excise_Tax', 'Oversize', 'Status'
+    )
     Description_checker = MaxLenChecker(5000)
     Your_Price_checker = Jobber_checker = MAP_CONFIRM_W_JOBBER_checker = \
         Core_Price_checker = Federal_Excise_Tax_checker = RangeChecker(0, 999999.9999)
@@ -1456,7 +1306,7 @@ class TransFileItem(BaseItem):
             warn_if_checker_error=True,
             info=data
         )
-        self.prefix = constants.delete_unprintable(prefix)
+        self.prefix = sanitizers.delete_unprintable(prefix)
 
         mpn = convert_with_check(
             value=data['TAW PN'].replace(prefix, '', 1),
@@ -1470,7 +1320,7 @@ class TransFileItem(BaseItem):
             warn_if_checker_error=True,
             info=data
         )
-        self.mpn = constants.delete_unprintable(mpn)
+        self.mpn, self.norm_mpn = sanitizers.clean_number(mpn)
 
         brand = convert_with_check(
             value=trans_code.get(self.prefix, 'NOT DEFINED IN TRANS WITH PREFIX  ' + self.prefix),
@@ -1484,11 +1334,9 @@ class TransFileItem(BaseItem):
             warn_if_checker_error=True,
             info=data
         )
-        self.brand = constants.delete_unprintable(brand)
+        self.brand, self.norm_brand = constants.clean_brand(brand)
 
         self.number = self.prefix + self.mpn
-        self.norm_mpn = constants.normalize_number(self.mpn)
-        self.norm_brand = constants.normalize_brand(self.brand)
 
         self.Description = convert_with_check(
             value=data['Description'],
@@ -1545,3 +1393,103 @@ class TransFileItem(BaseItem):
         )
 
         super().__init__()
+
+
+if __name__ == '__main__':
+    # Benchmark of the conversion of the full_parse (and Meyer inventory) fields of 50000 random rows:
+    # one convert_with_check call per field (as before the schemas were compiled),
+    # the compiled function row by row and the conversion column by column (converters.convert_columns)
+    import random
+    import time
+    from converters import EnumChecker as _EnumChecker
+
+    def random_value(field: Field) -> str:
+        if isinstance(field.checker, _EnumChecker):
+            return random.choice(field.checker.valid_values + ('',))
+        if field.output_type is int:
+            return str(random.randint(0, 99))
+        if field.output_type is float:
+            return '{:.2f}'.format(random.randint(0, 100000) / 100)
+        return {
+            _true_false: random.choice(('True', 'False', '')),
+            _yes_no: random.choice(('YES', 'NO', '')),
+            _iso_date: '2019-01-{:02d}'.format(random.randint(1, 31)),
+            bool: random.choice(('Y', ''))
+        }.get(field.output_type, 'text {}'.format(random.randint(0, 1000)))
+
+    class _Item:
+        pass
+
+    for item_class, fields, convert in (
+            (KeystoneItem, KeystoneItem.FULL_PARSE_FIELDS, KeystoneItem._set_full_parse_fields),
+            (MeyerItem, MeyerItem.FULL_PARSE_FIELDS, MeyerItem._set_full_parse_fields),
+            (MeyerItem, MeyerItem.INVENTORY_FIELDS, MeyerItem._set_inventory_fields),
+            (PremierItem, PremierItem.FULL_PARSE_FIELDS, PremierItem._set_full_parse_fields),
+            (TransItem, TransItem.FULL_PARSE_FIELDS, TransItem._set_full_parse_fields),
+            (Turn14Item, Turn14Item.FULL_PARSE_FIELDS, Turn14Item._set_full_parse_fields),
+    ):
+        rows = [{field.column: random_value(field) for field in fields} for _ in range(50000)]
+        calls = [
+            (
+                field.attribute,
+                field.column,
+                field.prepare,
+                dict(field.policy._asdict(), output_type=field.output_type, checker=field.checker or (lambda v: None))
+            )
+            for field in fields
+        ]
+        item = _Item()
+        started = time.perf_counter()
+        for data in rows:
+            for attribute, column, prepare, kwargs in calls:
+                value = data[column] if prepare is None else prepare(data[column])
+                setattr(item, attribute, convert_with_check(value, info=data, **kwargs))
+        before = len(rows) / (time.perf_counter() - started)
+        started = time.perf_counter()
+        for data in rows:
+            convert(item, data)
+        compiled = len(rows) / (time.perf_counter() - started)
+        started = time.perf_counter()
+        for i in range(0, len(rows), 5000):
+            convert_columns(rows[i:i + 5000], fields)
+        columns = len(rows) / (time.perf_counter() - started)
+        print(
+            '{:<12} {:>2} fields, rows/s: {:>7.0f} convert_with_check, {:>7.0f} compiled (x{:.1f}), '
+            '{:>7.0f} by columns (x{:.1f})'.format(
+                item_class.__name__, len(fields), before, compiled, compiled / before, columns, columns / before
+            )
+        )
+
+    # Memory of 1M items kept in memory at once (as special_input_trans_file_into_db keeps TransFileItem),
+    # measured with tracemalloc on 100000 items: the items with their attributes, without the rows
+    import tracemalloc
+
+    trans_file_rows = [
+        {
+            'Line Code': 'ABC', 'TAW PN': 'ABC{}'.format(100000 + i), 'Description': 'text {}'.format(i % 1000),
+            'Your Price': '{},{:02d}'.format(i % 500, i % 100), 'Jobber': '{},50'.format(i % 700),
+            'MAP-CONFIRM W JOBBER': '', 'Core Price': '0', 'Federal Excise Tax': '0', 'Oversize': 'N',
+            'Status Code': 'A'
+        }
+        for i in range(100000)
+    ]
+    keystone_rows = [
+        dict(
+            {field.column: random_value(field) for field in KeystoneItem.FULL_PARSE_FIELDS},
+            VendorName='Brand {}'.format(i % 300), PartNumber='P{}'.format(i), VenCode='ABC'
+        )
+        for i in range(100000)
+    ]
+    for item_class, rows, kwargs in (
+            (TransFileItem, trans_file_rows, {}),
+            (KeystoneItem, keystone_rows, {'full_parse': True}),
+    ):
+        tracemalloc.start()
+        started = tracemalloc.get_traced_memory()[0]
+        kept = [item_class(row, **kwargs) for row in rows]
+        size = tracemalloc.get_traced_memory()[0] - started
+        tracemalloc.stop()
+        print('{:<12} {}: {:>5.0f} MB per 1M items'.format(
+            item_class.__name__, kwargs or '', size * 1000000 / len(rows) / 2 ** 20
+        ))
+        del kept
@@ -17,17 +17,22 @@ python parse_suppliers_files.py -h
 import argparse
 import csv
 import datetime
+import json
 import logging
 import os
+import pickle
 import pycurl
 import shutil
+import time
 import zipfile
 from collections import namedtuple
-from typing import Tuple, Dict, FrozenSet
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Tuple, Dict, FrozenSet, Iterator
 
 import constants
+import converters
 import database
-from suppliers import Keystone, Meyer, Premier, Trans, Turn14
+from suppliers import BasicSupplier, Keystone, Meyer, Premier, Trans, Turn14
 
 
 # noinspection SpellCheckingInspection
@@ -39,6 +44,10 @@ class Program:
     suppliers = Keystone, Meyer, Premier, Trans, Turn14  # это поставщики, с которыми программа работает
     args = None  # type:argparse.Namespace # это входные параметры программы
     db = None  # type:database.Database # это связь с базой данных
+    unchanged_suppliers = set()  # поставщики, файлы которых не изменились с прошлого запуска
+    input_hashes = {}  # хеши входных файлов поставщиков, нормализованных при данном запуске {supplier: {...}}
+    streamed_suppliers = set()  # поставщики, файлы которых нормализованы прямо при загрузке
+    brand_dictionaries = {}  # бренды из входных файлов поставщиков {supplier: constants.BrandDictionary}
 
     @classmethod
     def run(cls) -> None:
@@ -72,39 +81,63 @@ class Program:
             cls.normalize_suppliers_files()
             # здесь уже имеются входные файлы поставщиков
 
-        # ШАГ 6. Подключение к базе данных
+        if 1:
+            # ШАГ 6. Разбор входных файлов поставщиков (каждый файл разбирается один раз)
+            cls.parse_input_files()
+            # здесь уже имеются разобранные item'ы поставщиков для всех шагов записи в базу данных
+
+        # ШАГ 7. Подключение к базе данных
         # при этом если нужно создаётся новая база данных
-        cls.db = database.Database(create=True, option_files=cls.args.db_config)
+        cls.db = database.Database(
+            create=True,
+            option_files=cls.args.db_config,
+            commit_policy=cls.args.commit_policy,
+            commit_rows=cls.args.commit_rows
+        )
 
         if 1:
-            # ШАГ 7. Запись в базу данных названий брендов из файлов поставщиков
-            cls.insert_into_supplier_brand()
+            # ШАГ 8. Запись в базу данных названий брендов из файлов поставщиков
+            with cls.db.transaction():
+                cls.insert_into_supplier_brand()
 
         if 1:
-            # ШАГ 8. Запись в базу данных брендов из файлов ручной модерации брендов
-            cls.make_brands_from_checked_brands_of_suppliers()
+            # ШАГ 9. Запись в базу данных брендов из файлов ручной модерации брендов
+            with cls.db.transaction():
+                cls.make_brands_from_checked_brands_of_suppliers()
 
         if 1:
-            # ШАГ 9. Запись в базу данных brand, mpn, prefix item-ов
-            cls.insert_into_supplier_item()
+            # ШАГ 10. Запись в базу данных brand, mpn, prefix item-ов
+            # (снятие и установка признака available - в одной транзакции при --commit-policy step)
+            with cls.db.transaction():
+                cls.insert_into_supplier_item()
 
         if 1:
-            # ШАГ 10. Запись в базу данных остальной информации об item-ах
+            # ШАГ 11. Запись в базу данных остальной информации об item-ах
+            # (транзакция на каждого поставщика, см. _insert_into_specific_supplier_item)
             cls.insert_into_specific_supplier_item()
 
         if 1:
-            # ШАГ 11. Обновление category и subcategory в meyer_item
-            cls.update_meyer_item__category_subcategory()
+            # ШАГ 12. Обновление category и subcategory в meyer_item
+            with cls.db.transaction():
+                cls.update_meyer_item__category_subcategory()
 
         if 1:
-            # ШАГ 12. Запись в базу данных остальной информации об item-ах поставщика Meyer
-            cls.update_meyer_item__inventory()
-
-        # ШАГ 13. Создание архива с резервной копией файлов поставщиков
+            # ШАГ 13. Запись в базу данных остальной информации об item-ах поставщика Meyer
+            with cls.db.transaction():
+                cls.update_meyer_item__inventory()
+
+        # ШАГ 14. Сохранение метаданных загруженных файлов для условной загрузки при следующем запуске
+        # и хешей содержимого записанных в базу данных файлов
+        # (сохраняем только после успешной записи в базу данных, иначе при следующем запуске
+        # неизменившиеся файлы не попали бы в базу данных)
+        BasicSupplier.save_download_manifest()
+        cls.save_loaded_hashes()
+
+        # ШАГ 15. Создание архива с резервной копией файлов поставщиков
         if cls.args.backup:
             cls.make_backup()
 
-        # ШАГ 14. Очистка временных каталогов
+        # ШАГ 16. Очистка временных каталогов
         if cls.args.clear:
             cls.clear_temp_dirs()
 
@@ -121,6 +154,20 @@ class Program:
         Выделяет следующие поля (если не заданы получаются аргументы по-умолчанию (указаны в скобках)):
         cls.args.db_config - файл конфигурации подключения к базе данных (constants.DATABASE_DB_CONFIG_FILE)
         cls.args.download_http - флаг загрузки с https://******* (False)
+        cls.args.download_workers - максимальное количество одновременных загрузок файлов поставщиков (5)
+        cls.args.force_download - флаг загрузки файлов поставщиков даже если они не изменились (False)
+        cls.args.download_segments - количество одновременно загружаемых по HTTP диапазонов одного файла (1)
+        cls.args.normalize_workers - количество процессов для нормализации файлов поставщиков (1)
+        cls.args.parse_workers - количество процессов для разбора одного входного файла поставщика (1)
+        cls.args.stream - флаг нормализации файлов поставщиков прямо при загрузке (без сохранения загруженных) (False)
+        cls.args.intermediate_format - формат входных файлов поставщиков: csv или columns (csv)
+        cls.args.export_csv - флаг выгрузки входных файлов в колоночном формате также в csv (для людей) (False)
+        cls.args.max_error_rate - количество ошибок значений на запись, при превышении которого разбор поставщика
+                                  прерывается и поставщик пропускается (None - не прерывается)
+        cls.args.db_writers - количество поставщиков, специфические данные которых записываются в базу данных
+                              одновременно, каждый через своё соединение (1)
+        cls.args.commit_policy - политика фиксации транзакций, см. database.Database.COMMIT_POLICIES (batch)
+        cls.args.commit_rows - количество строк в транзакции при cls.args.commit_policy == 'rows' (50000)
         cls.args.clear - флаг удаления загруженных файлов после отработки алгоритма (False)
         cls.args.backup - флаг сохранения резервной копии загруженных файлов (False)
         cls.args.logfile - файл с результатами логирования (sys.stderr)
@@ -149,6 +196,113 @@ class Program:
             help="download suppliers' files from https://*******/",
         )
 
+        parser.add_argument(
+            '--download-workers',
+            dest='download_workers',
+            action='store',
+            type=int,
+            default=5,
+            help="maximum number of suppliers' files downloaded simultaneously (default: %(default)s)"
+        )
+
+        parser.add_argument(
+            '--force-download',
+            dest='force_download',
+            action='store_true',
+            default=False,
+            help="download and process suppliers' files even if they have not changed since the previous run"
+        )
+
+        parser.add_argument(
+            '--download-segments',
+            dest='download_segments',
+            action='store',
+            type=int,
+            default=1,
+            help='number of byte ranges of one file downloaded simultaneously over HTTP (default: %(default)s)'
+        )
+
+        parser.add_argument(
+            '--normalize-workers',
+            dest='normalize_workers',
+            action='store',
+            type=int,
+            default=1,
+            help="number of processes normalizing suppliers' files simultaneously (default: %(default)s)"
+        )
+
+        parser.add_argument(
+            '--parse-workers',
+            dest='parse_workers',
+            action='store',
+            type=int,
+            default=1,
+            help="number of processes parsing one supplier's input file simultaneously (default: %(default)s)"
+        )
+
+        parser.add_argument(
+            '--stream',
+            dest='stream',
+            action='store_true',
+            default=False,
+            help="normalize suppliers' files while downloading them, without saving the downloaded files"
+        )
+
+        parser.add_argument(
+            '--intermediate-format',
+            dest='intermediate_format',
+            action='store',
+            choices=['csv', 'columns'],
+            default='csv',
+            help="format of normalized suppliers' files: csv or dictionary-encoded columns (default: %(default)s)"
+        )
+
+        parser.add_argument(
+            '--export-csv',
+            dest='export_csv',
+            action='store_true',
+            default=False,
+            help="also export normalized suppliers' files stored as columns to csv files"
+        )
+
+        parser.add_argument(
+            '--max-error-rate',
+            dest='max_error_rate',
+            action='store',
+            type=float,
+            default=None,
+            help="skip a supplier if its input file has more bad values per row than this (default: never skip)"
+        )
+
+        parser.add_argument(
+            '--db-writers',
+            dest='db_writers',
+            action='store',
+            type=int,
+            default=1,
+            help="number of suppliers whose items are written to the database simultaneously, each over its own "
+                 "connection (default: %(default)s)"
+        )
+
+        parser.add_argument(
+            '--commit-policy',
+            dest='commit_policy',
+            action='store',
+            choices=database.Database.COMMIT_POLICIES,
+            default=database.Database.COMMIT_BATCH,
+            help="when database writes are committed: after every row, after every batch, after --commit-rows rows "
+                 "or once per step, i.e. per supplier for suppliers' items (default: %(default)s)"
+        )
+
+        parser.add_argument(
+            '--commit-rows',
+            dest='commit_rows',
+            action='store',
+            type=int,
+            default=50000,
+            help="number of rows per transaction with --commit-policy rows (default: %(default)s)"
+        )
+
         parser.add_argument(
             '-c', '--clear',
             dest='clear',
@@ -214,18 +368,34 @@ class Program:
         os.makedirs(constants.PARSE_SUPPLIERS_FILES_TEMP_DIR, exist_ok=True)
         logging.info('{} Создание необходимых директорий.'.format(constants.LOGGING_FINISH))
 
+    @classmethod
+    def save_loaded_hashes(cls) -> None:
+        """
+        Запоминает в индексе хеши содержимого файлов поставщиков, записанных в базу данных при данном запуске
+        """
+        for supplier in cls._changed_suppliers():
+            BasicSupplier.content_index['loaded'][supplier.SUPPLIER_NAME] = {
+                'downloads': supplier.download_hashes(),
+                'inputs': cls.input_hashes.get(supplier)
+            }
+        BasicSupplier.save_content_index()
+
     @classmethod
     def make_backup(cls) -> None:
         """
-        Создаёт файлы резервной копии
+        Создаёт файлы резервной копии.
+        Входной файл, содержимое которого (по хешу) уже есть в одном из прежних архивов резервной копии,
+        в новый архив не записывается: в файле contents.json архива указывается, в каком архиве он хранится.
         """
         file = os.path.join(constants.PARSE_SUPPLIERS_FILES_BACKUP_DIR,
                             '{}.zip'.format(datetime.datetime.now().strftime('%Y%m%d%H%M%S')))
+        backups = BasicSupplier.content_index['backups']
 
         try:
             logging.info(
                 '{} Создание резервной копии входных файлов поставщиков {}.'.format(constants.LOGGING_START, file)
             )
+            contents = {}  # {входной файл: {'sha256': ..., 'archive': архив, в котором он хранится}}
             with zipfile.ZipFile(
                     file=file,
                     mode='w',
@@ -233,12 +403,27 @@ class Program:
 
             ) as zf:
                 for supplier in cls.suppliers:
-                    zf.write(
-                        filename=supplier.INPUT_FILE
-                    )
-                zf.write(
-                    filename=Meyer.INPUT_FILE_INVENTORY
-                )
+                    inputs = supplier.loaded_hashes().get('inputs', {})
+                    for input_file in map(BasicSupplier.intermediate_file, supplier.input_files()):
+                        sha256 = inputs.get(os.path.basename(input_file))
+                        archive = backups.get(sha256)
+                        if not (archive and os.path.exists(
+                                os.path.join(constants.PARSE_SUPPLIERS_FILES_BACKUP_DIR, archive)
+                        )):
+                            if not os.path.exists(input_file):
+                                logging.warning('Файл {} отсутствует и не попадёт в резервную копию.'.format(
+                                    input_file
+                                ))
+                                continue
+                            zf.write(
+                                filename=input_file
+                            )
+                            archive = os.path.basename(file)
+                            if sha256:
+                                backups[sha256] = archive
+                        contents[input_file] = {'sha256': sha256, 'archive': archive}
+                zf.writestr('contents.json', json.dumps(contents, indent=2, sort_keys=True))
+            BasicSupplier.save_content_index()
         finally:
             logging.info(
                 '{} Создание резервной копии входных файлов поставщиков {}.'.format(constants.LOGGING_FINISH, file)
@@ -266,23 +451,102 @@ class Program:
     @classmethod
     def download_suppliers_files(cls, alternative: bool = False) -> None:
         """
-        Вызывает методы классов поставщиков по загрузке файлов поставщиков
+        Вызывает методы классов поставщиков по загрузке файлов поставщиков.
+        Файлы разных поставщиков загружаются одновременно (не более cls.args.download_workers загрузок сразу),
+        поэтому общее время загрузки определяется самым медленным поставщиком, а не суммой всех загрузок.
         :param alternative: если False, то загрузка в основном с помощью pycurl (ftp),
                             иначе - загрузка с помощью requests с ******* по HTTP
         """
         try:
             logging.info('{} Загрузка файлов поставщиков.'.format(constants.LOGGING_START))
-            for supplier in cls.suppliers:
-                if not alternative:
-                    try:
-                        supplier.download()
-                    except pycurl.error:
-                        supplier.download_alternative()  # при ошибке загружаем с *******
+            BasicSupplier.load_content_index()
+            if not cls.args.force_download:
+                BasicSupplier.load_download_manifest()
+            BasicSupplier.DOWNLOAD_SEGMENTS = max(1, cls.args.download_segments)
+            BasicSupplier.INTERMEDIATE_FORMAT = cls.args.intermediate_format
+            with ThreadPoolExecutor(
+                    max_workers=max(1, cls.args.download_workers),
+                    thread_name_prefix='download'
+            ) as executor:
+                futures = {
+                    supplier: executor.submit(
+                        cls._download_supplier_files,
+                        supplier,
+                        alternative,
+                        cls.args.stream and supplier.STREAMING
+                    )
+                    for supplier in cls.suppliers
+                }
+            errors = []
+            for supplier, future in futures.items():
+                try:
+                    changed = future.result()
+                except Exception as err:
+                    logging.error('Ошибка {!r} при загрузке файлов поставщика {}.'.format(err, supplier.SUPPLIER_NAME))
+                    errors.append(err)
                 else:
-                    supplier.download_alternative()
+                    if cls.args.stream and supplier.STREAMING:
+                        cls.streamed_suppliers.add(supplier)
+                    if not changed and all(
+                            os.path.exists(BasicSupplier.intermediate_file(file)) for file in supplier.input_files()
+                    ):
+                        logging.info(
+                            'Файлы поставщика {} не изменились. Дальнейшая обработка поставщика пропускается.'.format(
+                                supplier.SUPPLIER_NAME
+                            )
+                        )
+                        cls.unchanged_suppliers.add(supplier)
+                    elif not cls.args.force_download and supplier.download_hashes() is not None \
+                            and supplier.download_hashes() == supplier.loaded_hashes().get('downloads'):
+                        logging.info(
+                            'Содержимое файлов поставщика {} совпадает с последним записанным в базу данных. '
+                            'Дальнейшая обработка поставщика пропускается.'.format(supplier.SUPPLIER_NAME)
+                        )
+                        cls.unchanged_suppliers.add(supplier)
+            if errors:
+                raise errors[0]
         finally:
             logging.info('{} Загрузка файлов поставщиков.'.format(constants.LOGGING_FINISH))
 
+    @staticmethod
+    def _download_supplier_files(supplier, alternative: bool, stream: bool = False) -> bool:
+        """
+        Загружает файлы одного поставщика (выполняется в отдельном потоке).
+        При ошибке загрузки по ftp поставщик сам переходит на загрузку с альтернативного сервера.
+        :param stream: если True, то файлы нормализуются прямо при загрузке (см. BasicSupplier.download_and_normalize)
+        :return: True - файлы поставщика загружены, False - файлы поставщика не изменились
+        """
+        started = time.monotonic()
+        try:
+            if stream:
+                try:
+                    return supplier.download_and_normalize(alternative)
+                except pycurl.error:
+                    if alternative:
+                        raise
+                    return supplier.download_and_normalize(alternative=True)  # при ошибке загружаем с *******
+            elif not alternative:
+                try:
+                    return supplier.download()
+                except pycurl.error:
+                    return supplier.download_alternative()  # при ошибке загружаем с *******
+            else:
+                return supplier.download_alternative()
+        finally:
+            logging.info(
+                'Загрузка файлов поставщика {} заняла {:.1f} с.'.format(
+                    supplier.SUPPLIER_NAME,
+                    time.monotonic() - started
+                )
+            )
+
+    @classmethod
+    def _changed_suppliers(cls) -> tuple:
+        """
+        Возвращает поставщиков, файлы которых нужно обрабатывать (т.е. изменившиеся с прошлого запуска)
+        """
+        return tuple(supplier for supplier in cls.suppliers if supplier not in cls.unchanged_suppliers)
+
     @classmethod
     def normalize_suppliers_files(cls) -> None:
         """
@@ -298,22 +562,40 @@ class Program:
                 )
             )
 
-            for supplier in cls.suppliers:
-                try:
-                    logging.info(
-                        '{} Нормализация файлов поставщика {}.'.format(
-                            constants.LOGGING_START,
-                            supplier.SUPPLIER_NAME
+            suppliers = [supplier for supplier in cls._changed_suppliers() if supplier not in cls.streamed_suppliers]
+            if cls.args.normalize_workers > 1:
+                cls._normalize_in_processes(suppliers)
+            else:
+                for supplier in suppliers:
+                    try:
+                        logging.info(
+                            '{} Нормализация файлов поставщика {}.'.format(
+                                constants.LOGGING_START,
+                                supplier.SUPPLIER_NAME
+                            )
                         )
-                    )
-                    supplier.normalize_download_file()
-                finally:
-                    logging.info(
-                        '{} Нормализация файлов поставщика {}.'.format(
-                            constants.LOGGING_FINISH,
-                            supplier.SUPPLIER_NAME
+                        supplier.normalize_download_file()
+                    finally:
+                        logging.info(
+                            '{} Нормализация файлов поставщика {}.'.format(
+                                constants.LOGGING_FINISH,
+                                supplier.SUPPLIER_NAME
+                            )
                         )
+
+            if cls.args.export_csv:
+                for supplier in cls._changed_suppliers():
+                    supplier.export_csv()
+
+            for supplier in cls._changed_suppliers():
+                cls.input_hashes[supplier] = supplier.input_hashes()
+                if not cls.args.force_download \
+                        and cls.input_hashes[supplier] == supplier.loaded_hashes().get('inputs'):
+                    logging.info(
+                        'Входные файлы поставщика {} совпадают с последними записанными в базу данных. '
+                        'Дальнейшая обработка поставщика пропускается.'.format(supplier.SUPPLIER_NAME)
                     )
+                    cls.unchanged_suppliers.add(supplier)
         finally:
             logging.info(
                 '{} Нормализация загруженных файлов поставщиков.'.format(
@@ -321,6 +603,166 @@ class Program:
                 )
             )
 
+    @classmethod
+    def _normalize_in_processes(cls, suppliers: list) -> None:
+        """
+        Нормализует файлы поставщиков suppliers одновременно в cls.args.normalize_workers процессах:
+        каждый входной файл (в т.ч. каждый из двух файлов Meyer) получается в отдельном процессе.
+        Поэтому время нормализации определяется самым большим файлом, а не суммой всех файлов.
+        """
+        with ProcessPoolExecutor(max_workers=cls.args.normalize_workers) as executor:
+            futures = {
+                (supplier, input_file): executor.submit(
+                    cls._normalize_input_file, supplier, input_file, BasicSupplier.INTERMEDIATE_FORMAT
+                )
+                for supplier in suppliers
+                for input_file in supplier.input_files()
+            }
+            errors = []
+            durations = {}
+            for (supplier, input_file), future in futures.items():
+                try:
+                    duration = future.result()
+                except Exception as err:
+                    logging.error('Ошибка {!r} при нормализации файла {}.'.format(err, input_file))
+                    errors.append(err)
+                else:
+                    logging.info('Файл {} нормализован за {:.1f} с.'.format(input_file, duration))
+                    durations[supplier] = durations.get(supplier, 0) + duration
+        for supplier, duration in durations.items():
+            logging.info(
+                'Нормализация файлов поставщика {} заняла {:.1f} с (сумма по файлам).'.format(
+                    supplier.SUPPLIER_NAME, duration
+                )
+            )
+        if errors:
+            raise errors[0]
+
+    @staticmethod
+    def _normalize_input_file(supplier, input_file: str, intermediate_format: str) -> float:
+        """
+        Получает входной файл input_file поставщика supplier в формате intermediate_format
+        (выполняется в отдельном процессе)
+        :return: время нормализации, с
+        """
+        BasicSupplier.INTERMEDIATE_FORMAT = intermediate_format
+        started = time.monotonic()
+        supplier.normalize_input_file(input_file)
+        return time.monotonic() - started
+
+    @classmethod
+    def parse_input_files(cls) -> None:
+        """
+        Разбирает входные файлы поставщиков за один проход по каждому файлу.
+        Собирает бренды (cls.brand_dictionaries), category и subcategory Meyer,
+        а item'ы, нужные для записи в базу данных, с номерами брендов вместо брендов сохраняет частями
+        в файл supplier.parsed_file(), который затем читают шаги записи в базу данных
+        (им нужны id брендов, которые появляются в базе данных только после записи брендов)
+        """
+        try:
+            logging.info('{} Разбор входных файлов поставщиков.'.format(constants.LOGGING_START))
+            for supplier in cls._changed_suppliers():
+                collector = converters.ValidationCollector(
+                    supplier.SUPPLIER_NAME, max_error_rate=cls.args.max_error_rate
+                )
+                try:
+                    logging.debug('{} Запись {}.'.format(constants.LOGGING_START, supplier.parsed_file()))
+                    with collector:
+                        with open(
+                                file=supplier.parsed_file(),
+                                mode='wb'
+                        ) as f_out:
+                            brand_dictionary = cls.brand_dictionaries[supplier] = constants.BrandDictionary()
+                            specific_values = supplier.item.values_getter(supplier.SPECIFIC_FIELDS)
+                            extra_values = supplier.item.values_getter(supplier.EXTRA_FIELDS)
+                            batch = []
+                            for item in supplier.iter_items(full_parse=True, workers=cls.args.parse_workers):
+                                collector.add_rows()
+                                if item.norm_brand and item.norm_mpn:
+                                    brand_code = brand_dictionary.encode(item.brand)
+                                    if supplier == Meyer:
+                                        if item.Category:
+                                            cls.meyer_category.add(item.Category)
+                                        if item.Sub_Category:
+                                            cls.meyer_subcategory.add(item.Sub_Category)
+                                elif supplier.EXTRA_FIELDS and item.number:
+                                    brand_code = None
+                                else:
+                                    continue
+                                batch.append(
+                                    constants.ParsedItem(
+                                        brand_code=brand_code,
+                                        norm_mpn=item.norm_mpn,
+                                        prefix=item.prefix,
+                                        mpn=item.mpn,
+                                        number=item.number,
+                                        specific=specific_values(item),
+                                        extra=extra_values(item)
+                                    )
+                                )
+                                if len(batch) == 5000:
+                                    pickle.dump(batch, f_out, protocol=pickle.HIGHEST_PROTOCOL)
+                                    batch.clear()
+                            if batch:
+                                pickle.dump(batch, f_out, protocol=pickle.HIGHEST_PROTOCOL)
+                    logging.info('Бренды поставщика {}: {!r}.'.format(supplier.SUPPLIER_NAME, brand_dictionary))
+                    if cls.args.parse_workers <= 1:  # при параллельном разборе кэш в процессах разбора
+                        logging.info('Кэш очистки брендов: {}.'.format(constants.clean_brand.cache_info()))
+                except converters.ValidationAbort as err:
+                    logging.error(
+                        'Разбор поставщика {} прерван: {}. Поставщик пропускается при данном запуске.'.format(
+                            supplier.SUPPLIER_NAME, err
+                        )
+                    )
+                    cls._reject_supplier(supplier)
+                finally:
+                    cls._log_validation_summary(collector)
+                    logging.debug('{} Запись {}.'.format(constants.LOGGING_FINISH, supplier.parsed_file()))
+        finally:
+            logging.info('{} Разбор входных файлов поставщиков.'.format(constants.LOGGING_FINISH))
+
+    @classmethod
+    def _reject_supplier(cls, supplier) -> None:
+        """
+        Исключает поставщика supplier из дальнейшей обработки при данном запуске (как неизменившегося, т.е. его данные
+        в базе данных остаются прежними) и забывает метаданные его загруженных файлов,
+        чтобы при следующем запуске они были загружены и разобраны заново
+        """
+        cls.unchanged_suppliers.add(supplier)
+        cls.brand_dictionaries.pop(supplier, None)
+        for file in supplier.download_files():
+            BasicSupplier.download_manifest.pop(file, None)
+
+    @staticmethod
+    def _log_validation_summary(collector: converters.ValidationCollector) -> None:
+        """
+        Пишет в лог одну таблицу ошибок значений, собранных collector (вместо предупреждения на каждое значение)
+        """
+        if collector.failures:
+            logging.warning(collector.summary())
+        else:
+            logging.info(collector.summary())
+
+    @staticmethod
+    def _iter_parsed_items(supplier) -> Iterator[constants.ParsedItem]:
+        """
+        Возвращает item'ы поставщика supplier, сохранённые в parse_input_files
+        """
+        try:
+            logging.debug('{} Чтение {}.'.format(constants.LOGGING_START, supplier.parsed_file()))
+            with open(
+                    file=supplier.parsed_file(),
+                    mode='rb'
+            ) as f_in:
+                while True:
+                    try:
+                        batch = pickle.load(f_in)
+                    except EOFError:
+                        break
+                    yield from batch
+        finally:
+            logging.debug('{} Чтение {}.'.format(constants.LOGGING_FINISH, supplier.parsed_file()))
+
     @classmethod
     def insert_into_supplier_brand(cls) -> None:
         try:
@@ -329,27 +771,11 @@ class Program:
                     constants.LOGGING_START
                 )
             )
-            brands = set()
-            for supplier in cls.suppliers:
-                try:
-                    logging.debug(
-                        '{} Чтение {}.'.format(constants.LOGGING_START, supplier.INPUT_FILE)
-                    )
-                    with open(
-                            file=supplier.INPUT_FILE,
-                            newline='',
-                            encoding='utf8'
-                    ) as f_in:
-                        csv_reader = csv.DictReader(f_in, dialect=constants.PROJECT_STANDARD_DIALECT)
-                        assert set(csv_reader.fieldnames) == set(supplier.INPUT_FILE_NECESSARY_FIELDS_LIST)
-                        for row in csv_reader:
-                            item = supplier.item(row)
-                            if item.norm_brand and item.norm_mpn:
-                                brands.add((supplier.id_in_db, item.brand))
-                finally:
-                    logging.debug(
-                        '{} Чтение {}.'.format(constants.LOGGING_FINISH, supplier.INPUT_FILE)
-                    )
+            brands = {
+                (supplier.id_in_db, name)
+                for supplier, brand_dictionary in cls.brand_dictionaries.items()
+                for name in brand_dictionary.brands
+            }
             data = []
             for supplier_id, name in sorted(brands, key=lambda x: x[-1].casefold()):
                 data.append({'supplier_id': supplier_id, 'name': name})
@@ -364,69 +790,64 @@ class Program:
     @classmethod
     def insert_into_supplier_item(cls) -> None:
 
-        cls.db.update_supplier_item_with_available()
+        if cls.unchanged_suppliers:
+            # у item'ов неизменившихся поставщиков признак available остаётся прежним
+            cls.db.update_supplier_item_with_available([supplier.id_in_db for supplier in cls._changed_suppliers()])
+        else:
+            cls.db.update_supplier_item_with_available()
 
         try:
             logging.info('{} Запись номеров в таблицу item базы данных'.format(constants.LOGGING_START))
 
             supplier_brand_ids = cls.db.get_from_supplier_brand__name_and_supplier_id_2_supplier_brand_id()
 
-            data = []  # список database.Item для записи в таблицу item базы данных
-            for supplier in cls.suppliers:
-                try:
-                    logging.debug(
-                        '{} Чтение {}.'.format(constants.LOGGING_START, supplier.INPUT_FILE)
-                    )
-
-                    with open(
-                            file=supplier.INPUT_FILE,
-                            newline='',
-                            encoding='utf8'
-                    ) as f_in:
-                        csv_reader = csv.DictReader(f_in, dialect=constants.PROJECT_STANDARD_DIALECT)
-                        assert set(supplier.INPUT_FILE_NECESSARY_FIELDS_LIST).issubset(set(csv_reader.fieldnames)), \
-                            'INPUT FILE NECESSARY FIELDS LIST: {}\nINPUT FILE ACTUAL FIELDS LIST:    {}'.format(
-                                sorted(supplier.INPUT_FILE_NECESSARY_FIELDS_LIST),
-                                sorted(csv_reader.fieldnames)
-                            )
-                        for row in csv_reader:
-                            item = supplier.item(row)
-                            if item.norm_brand and item.norm_mpn:
-                                key = (item.brand, supplier.id_in_db)
-                                try:
-                                    supplier_brand_id = supplier_brand_ids[key]
-                                except KeyError:
-                                    logging.error('Error key {} in supplier_brand_ids'.format(key))
-                                    continue
+            # все item'ы записываются в таблицу одним запросом из промежуточной таблицы (см. database.BulkLoad)
+            with cls.db.bulk_insert_into_supplier_item() as bulk_load:
+                data = []  # список database.Item для записи в таблицу item базы данных
+                for supplier in cls._changed_suppliers():
+                    brand_code_ids = cls._resolve_brand_codes(supplier, supplier_brand_ids)
+                    for item in cls._iter_parsed_items(supplier):
+                        if item.brand_code is not None:
+                            supplier_brand_id = brand_code_ids[item.brand_code]
+                            if supplier_brand_id is None:
+                                continue
 
-                                data.append(
-                                    dict(
-                                        supplier_brand_id=supplier_brand_id,
-                                        norm_mpn=item.norm_mpn,
-                                        available=True,
-                                        prefix=item.prefix,
-                                        mpn=item.mpn,
-                                        number=item.number
-                                    )
+                            data.append(
+                                dict(
+                                    supplier_brand_id=supplier_brand_id,
+                                    norm_mpn=item.norm_mpn,
+                                    available=True,
+                                    prefix=item.prefix,
+                                    mpn=item.mpn,
+                                    number=item.number
                                 )
+                            )
 
-                                if len(data) == 5000:
-                                    # записываем в базу частями по 5000 item'ов, чтобы избежать чрезмерной нагрузки
-                                    cls.db.insert_into_supplier_item(data)
-                                    data.clear()
-
-                finally:
-                    logging.debug(
-                        '{} Чтение {}.'.format(constants.LOGGING_FINISH, supplier.INPUT_FILE)
-                    )
-
-            if data:
-                # дописываем оствавшиеся item'ы
-                cls.db.insert_into_supplier_item(data)
-                data.clear()
+                            if len(data) == 5000:
+                                # передаём в базу частями по 5000 item'ов, чтобы не держать в памяти все item'ы
+                                bulk_load.write(data)
+                                data.clear()
+                if data:
+                    # дописываем оствавшиеся item'ы
+                    bulk_load.write(data)
+                    data.clear()
         finally:
             logging.info('{} Запись номеров в таблицу item базы данных'.format(constants.LOGGING_FINISH))
 
+    @classmethod
+    def _resolve_brand_codes(cls, supplier, supplier_brand_ids: dict) -> list:
+        """
+        Возвращает supplier_brand_id для каждого номера бренда из словаря брендов поставщика supplier
+        (None, если бренда нет в supplier_brand_ids; ошибка об этом пишется один раз на бренд, а не на каждый item)
+        :param supplier_brand_ids: {(name, supplier_id): supplier_brand_id}
+        """
+        brand_dictionary = cls.brand_dictionaries[supplier]
+        brand_code_ids = brand_dictionary.resolve(supplier_brand_ids, supplier.id_in_db)
+        for brand, supplier_brand_id in zip(brand_dictionary.brands, brand_code_ids):
+            if supplier_brand_id is None:
+                logging.error('Error key {} in supplier_brand_ids'.format((brand, supplier.id_in_db)))
+        return brand_code_ids
+
     @classmethod
     def _get_supplier_brands(cls) -> Tuple[
         Dict[int, constants.SupplierBrandKey], Dict[constants.SupplierBrandKey, int]
@@ -808,8 +1229,10 @@ class Program:
         )
 
         # Работа с базой: очистка таблицы brand_supplier_brand
+        # (DELETE, а не TRUNCATE: TRUNCATE неявно фиксирует транзакцию шага)
+        # noinspection SqlWithoutWhere
         cls.db.execute_without_results(
-            statement="""TRUNCATE brand_supplier_brand;""",
+            statement="""DELETE FROM brand_supplier_brand;""",
             many=False,
             commit=True
         )
@@ -1050,171 +1473,117 @@ class Program:
         #     )
 
     # У Meyer есть category и subcategory в файлах.
-    # Их можно извлекать при первом разборе fullparse=True в insert_into_specific_supplier_item
-    # и сохранять в переменных класса meyer_category, meyer_subcategory
-    # а дальше уже в update_meyer_item__category_subcategory добавлять в таблицы meyer_category и meyer_subcategory
-    # и сопоставлять id в update_meyer_item__category_subcategory
+    # Их извлекаем при единственном разборе full_parse=True в parse_input_files
+    # и сохраняем в переменных класса meyer_category, meyer_subcategory,
+    # а значения полей Category и Sub_Category каждого item'а - в item.extra сохранённых item'ов.
+    # Дальше уже в update_meyer_item__category_subcategory добавляем их в таблицы meyer_category и meyer_subcategory
+    # и сопоставляем id'шники
     meyer_category = set()
     meyer_subcategory = set()
 
     @classmethod
     def insert_into_specific_supplier_item(cls) -> None:
-
+        """
+        Записывает специфические данные item'ов изменившихся поставщиков.
+        Таблицы поставщиков (keystone_item, meyer_item, ...) не пересекаются, поэтому при cls.args.db_writers > 1
+        поставщики записываются одновременно (не более cls.args.db_writers сразу), каждый в отдельном потоке
+        через своё соединение из пула (см. database.ConnectionPool). Ошибка записи одного поставщика
+        не прерывает запись остальных и пробрасывается после их завершения.
+        """
         try:
             logging.info('{} Запись специфических данных по item\'ам в базу.'.format(constants.LOGGING_START))
             supplier_brand_ids = cls.db.get_from_supplier_brand__name_and_supplier_id_2_supplier_brand_id()
-
-            for supplier in cls.suppliers:
+            changed_suppliers = cls._changed_suppliers()
+            writers = min(cls.args.db_writers, len(changed_suppliers))
+
+            if writers <= 1:
+                for supplier in changed_suppliers:
+                    cls._insert_into_specific_supplier_item(cls.db, supplier, supplier_brand_ids)
+                return
+
+            with cls.db.connection_pool(writers) as pool:
+                def write(supplier) -> None:
+                    with pool.connection() as db:
+                        cls._insert_into_specific_supplier_item(db, supplier, supplier_brand_ids)
+
+                with ThreadPoolExecutor(max_workers=writers, thread_name_prefix='db-writer') as executor:
+                    futures = {supplier: executor.submit(write, supplier) for supplier in changed_suppliers}
+            errors = []
+            for supplier, future in futures.items():
                 try:
-                    logging.debug(
-                        '{} Чтение {}.'.format(constants.LOGGING_START, supplier.INPUT_FILE)
+                    future.result()
+                except Exception as err:
+                    logging.error(
+                        "Ошибка {!r} при записи в базу данных item'ов поставщика {}.".format(
+                            err,
+                            supplier.SUPPLIER_NAME
+                        )
                     )
+                    errors.append(err)
+            if errors:
+                raise errors[0]
+        finally:
+            logging.info('{} Запись специфических данных по item\'ам в базу.'.format(constants.LOGGING_FINISH))
 
-                    with open(
-                            file=supplier.INPUT_FILE,
-                            newline='',
-                            encoding='utf8'
-                    ) as f_in:
-                        csv_reader = csv.DictReader(f_in, dialect=constants.PROJECT_STANDARD_DIALECT)
-                        assert set(csv_reader.fieldnames) == set(supplier.INPUT_FILE_NECESSARY_FIELDS_LIST)
+    @classmethod
+    def _insert_into_specific_supplier_item(cls, db: database.Database, supplier, supplier_brand_ids: dict) -> None:
+        """
+        Записывает специфические данные item'ов поставщика supplier через соединение db
+        (одним шагом записи, т.е. при --commit-policy step одной транзакцией)
+        :param supplier_brand_ids: {(name, supplier_id): supplier_brand_id}
+        """
+        try:
+            logging.info(
+                "{} Запись в базу данных полной информации по item'ам поставщика {}.".format(
+                    constants.LOGGING_START,
+                    supplier.SUPPLIER_NAME
+                )
+            )
+            brand_code_ids = cls._resolve_brand_codes(supplier, supplier_brand_ids)
+            # supplier_item_id находятся здесь, а не подзапросом в базе данных на каждую строку
+            supplier_item_ids = db.get_supplier_item_ids(supplier.id_in_db)
+            missing_items = 0
+            with db.transaction(), db.bulk_insert_into_specific_supplier_item(supplier) as bulk_load:
+                data = []  # список database.Item для записи в таблицу item базы данных
+                for item in cls._iter_parsed_items(supplier):
+                    if item.brand_code is not None:
+                        supplier_brand_id = brand_code_ids[item.brand_code]
+                        if supplier_brand_id is None:
+                            continue
                         try:
-                            logging.info(
-                                "{} Запись в базу данных полной информации по item'ам поставщика {}.".format(
-                                    constants.LOGGING_START,
-                                    supplier.SUPPLIER_NAME
-                                )
-                            )
-                            data = []  # список database.Item для записи в таблицу item базы данных
-                            for row in csv_reader:
-                                item = supplier.item(row, full_parse=True)
-                                if item.norm_brand and item.norm_mpn:
-                                    key = (item.brand, supplier.id_in_db)
-                                    try:
-                                        supplier_brand_id = supplier_brand_ids[key]
-                                    except KeyError:
-                                        logging.error('Error key {} in supplier_brand_ids'.format(key))
-                                        continue
-                                    d = {
-                                        'supplier_brand_id': supplier_brand_id,
-                                        'norm_mpn': item.norm_mpn,
-                                    }
-                                    if supplier == Keystone:
-                                        d.update(
-                                            {
-                                                'LongDescription': item.LongDescription,
-                                                'JobberPrice': item.JobberPrice,
-                                                'Cost': item.Cost,
-                                                'Fedexable': item.Fedexable,
-                                                'ExeterQty': item.ExeterQty,
-                                                'MidWestQty': item.MidWestQty,
-                                                'SouthEastQty': item.SouthEastQty,
-                                                'TexasQty': item.TexasQty,
-                                                'PacificNWQty': item.PacificNWQty,
-                                                'GreatLakesQty': item.GreatLakesQty,
-                                                'CaliforniaQty': item.CaliforniaQty,
-                                                'TotalQty': item.TotalQty,
-                                                'UPCCode': item.UPCCode,
-                                                'Prop65Toxicity': item.Prop65Toxicity,
-                                                'HazardousMaterial': item.HazardousMaterial
-                                            }
-                                        )
-                                    elif supplier == Meyer:
-                                        d.update(
-                                            {
-                                                'Description': item.Description,
-                                                'Jobber_Price': item.Jobber_Price,
-                                                'Customer_Price': item.Customer_Price,
-                                                'UPC': item.UPC,
-                                                'MAP': item.MAP,
-                                                'Length': item.Length,
-                                                'Width': item.Width,
-                                                'Height': item.Height,
-                                                'Weight': item.Weight,
-                                                'LTL_Eligible': item.LTL_Eligible,
-                                                'Discontinued': item.Discontinued
-                                            }
-                                        )
-                                        if item.Category:
-                                            cls.meyer_category.add(item.Category)
-                                        if item.Sub_Category:
-                                            cls.meyer_subcategory.add(item.Sub_Category)
-                                    elif supplier == Premier:
-                                        d.update(
-                                            {
-                                                'Distributor_Cost': item.Distributor_Cost,
-                                                'Package_Quantity': item.Package_Quantity,
-                                                'Core_Price': item.Core_Price,
-                                                'UPC': item.UPC,
-                                                'Part_Description': item.Part_Description,
-                                                'Inventory_Count': item.Inventory_Count,
-                                                'Inventory_Type': item.Inventory_Type
-                                            }
-                                        )
-                                    elif supplier == Trans:
-                                        d.update(
-                                            {
-                                                'CA': item.CA,
-                                                'TX': item.TX,
-                                                'FL': item.FL,
-                                                'CO': item.CO,
-                                                'OH': item.OH,
-                                                'ID': item.ID,
-                                                'PA': item.PA,
-                                                'LIST_PRICE': item.LIST_PRICE,
-                                                'JOBBER_PRICE': item.JOBBER_PRICE,
-                                                'TOTAL': item.TOTAL,
-                                                'STATUS': item.STATUS,
-                                            }
-                                        )
-                                    elif supplier == Turn14:
-                                        d.update(
-                                            {
-                                                'Description': item.Description,
-                                                'Cost': item.Cost,
-                                                'Retail': item.Retail,
-                                                'Jobber': item.Jobber,
-                                                'CoreCharge': item.CoreCharge,
-                                                'Map': item.Map,
-                                                'Other': item.Other,
-                                                'OtherName': item.OtherName,
-                                                'EastStock': item.EastStock,
-                                                'WestStock': item.WestStock,
-                                                'CentralStock': item.CentralStock,
-                                                'Stock': item.Stock,
-                                                'MfrStock': item.MfrStock,
-                                                'MfrStockDate': item.MfrStockDate,
-                                                'DropShip': item.DropShip,
-                                                'DSFee': item.DSFee,
-                                                'Weight': item.Weight
-                                            }
-                                        )
-                                    data.append(d)
-
-                                    if len(data) == 2000:
-                                        # записываем в базу частями по 2000 item'ов, чтобы избежать чрезмерной нагрузки
-                                        cls.db.insert_into_specific_supplier_item(supplier, data)
-                                        data.clear()
-                            if data:
-                                # записываем в базу частями по 5000 item'ов, чтобы избежать чрезмерной нагрузки
-                                cls.db.insert_into_specific_supplier_item(supplier, data)
-                                data.clear()
-                        finally:
-                            logging.info(
-                                "{} Запись в базу данных полной информации по item'ам поставщика {}.".format(
-                                    constants.LOGGING_FINISH,
-                                    supplier.SUPPLIER_NAME
-                                )
-                            )
-
-                finally:
-                    logging.debug(
-                        '{} Чтение {}.'.format(constants.LOGGING_FINISH, supplier.INPUT_FILE)
-                    )
+                            supplier_item_id = supplier_item_ids[(supplier_brand_id, item.norm_mpn)]
+                        except KeyError:
+                            missing_items += 1
+                            continue
+                        d = {'supplier_item_id': supplier_item_id}
+                        d.update(zip(supplier.SPECIFIC_FIELDS, item.specific))
+                        data.append(d)
+
+                        if len(data) == 2000:
+                            # передаём в базу частями по 2000 item'ов, чтобы не держать в памяти все item'ы
+                            bulk_load.write(data)
+                            data.clear()
+                if data:
+                    bulk_load.write(data)
+                    data.clear()
+            del supplier_item_ids
+            if missing_items:
+                logging.warning(
+                    "Для {} item'ов поставщика {} нет записи в supplier_item, "
+                    "их специфические данные не записываются.".format(missing_items, supplier.SUPPLIER_NAME)
+                )
         finally:
-            logging.info('{} Запись специфических данных по item\'ам в базу.'.format(constants.LOGGING_FINISH))
+            logging.info(
+                "{} Запись в базу данных полной информации по item'ам поставщика {}.".format(
+                    constants.LOGGING_FINISH,
+                    supplier.SUPPLIER_NAME
+                )
+            )
 
     @classmethod
     def update_meyer_item__category_subcategory(cls) -> None:
+        if Meyer in cls.unchanged_suppliers:
+            return
         logging.info('START')
         # Вставляем category
         cls.db.execute_without_results(
@@ -1261,44 +1630,30 @@ class Program:
             )
             meyer_item_ids = cls.db.get_supplier_number_2_supplier_item_id(Meyer.id_in_db)
 
-            try:
-                logging.debug('{} Чтение {}.'.format(constants.LOGGING_START, Meyer.INPUT_FILE))
-
-                with open(
-                        file=Meyer.INPUT_FILE,
-                        newline='',
-                        encoding='utf8'
-                ) as f_in:
-                    csv_reader = csv.DictReader(f_in, dialect=constants.PROJECT_STANDARD_DIALECT)
-                    assert set(csv_reader.fieldnames) == set(Meyer.INPUT_FILE_NECESSARY_FIELDS_LIST)
-
-                    data = []  # список database.Item для записи в таблицу item базы данных
-                    for row in csv_reader:
-                        item = Meyer.item(row, full_parse=True)
-                        if item.number:
-                            try:
-                                supplier_item_id = meyer_item_ids[item.number]
-                            except KeyError:
-                                continue
-                            d = {
-                                'supplier_item_id': supplier_item_id,
-                                'meyer_category_id': meyer_category_ids.get(item.Category),
-                                'meyer_subcategory_id': meyer_subcategory_ids.get(item.Sub_Category)
-                            }
-                            data.append(d)
+            data = []  # список database.Item для записи в таблицу item базы данных
+            category_index = Meyer.EXTRA_FIELDS.index('Category')
+            subcategory_index = Meyer.EXTRA_FIELDS.index('Sub_Category')
+            for item in cls._iter_parsed_items(Meyer):
+                if item.number:
+                    try:
+                        supplier_item_id = meyer_item_ids[item.number]
+                    except KeyError:
+                        continue
+                    d = {
+                        'supplier_item_id': supplier_item_id,
+                        'meyer_category_id': meyer_category_ids.get(item.extra[category_index]),
+                        'meyer_subcategory_id': meyer_subcategory_ids.get(item.extra[subcategory_index])
+                    }
+                    data.append(d)
 
-                            if len(data) == 5000:
-                                # записываем в базу частями по 5000 item'ов, чтобы избежать чрезмерной нагрузки
-                                cls.db.update_meyer_item__category_subcategory(data)
-                                data.clear()
-                    if data:
+                    if len(data) == 5000:
                         # записываем в базу частями по 5000 item'ов, чтобы избежать чрезмерной нагрузки
                         cls.db.update_meyer_item__category_subcategory(data)
                         data.clear()
-
-            finally:
-                logging.debug('{} Чтение {}.'.format(constants.LOGGING_FINISH, Meyer.INPUT_FILE))
-
+            if data:
+                # записываем в базу частями по 5000 item'ов, чтобы избежать чрезмерной нагрузки
+                cls.db.update_meyer_item__category_subcategory(data)
+                data.clear()
         finally:
             logging.info(
                 "{} Запись в базу данных информации о category и subcategory по item'ам поставщика {}.".format(
@@ -1309,6 +1664,8 @@ class Program:
 
     @classmethod
     def update_meyer_item__inventory(cls) -> None:
+        if Meyer in cls.unchanged_suppliers:
+            return
         try:
             logging.info(
                 "{} Запись в базу данных дополнительной информации по item'ам поставщика {}.".format(
@@ -1318,64 +1675,51 @@ class Program:
             )
             meyer_item_ids = cls.db.get_supplier_number_2_supplier_item_id(Meyer.id_in_db)
 
-            try:
-                logging.debug(
-                    '{} Чтение {}.'.format(constants.LOGGING_START, Meyer.INPUT_FILE_INVENTORY)
-                )
-
-                with open(
-                        file=Meyer.INPUT_FILE_INVENTORY,
-                        newline='',
-                        encoding='utf8'
-                ) as f_in:
-                    csv_reader = csv.DictReader(f_in, dialect=constants.PROJECT_STANDARD_DIALECT)
-                    assert set(csv_reader.fieldnames) == set(Meyer.INPUT_FILE_INVENTORY_NECESSARY_FIELDS_LIST)
-
-                    data = []  # список database.Item для записи в таблицу item базы данных
-                    for row in csv_reader:
-                        item = Meyer.item(row, inventory=True)
-                        if item.Meyer_SKU:
-                            try:
-                                supplier_item_id = meyer_item_ids[item.Meyer_SKU]
-                            except KeyError:
-                                continue
-                            d = {
-                                'supplier_item_id': supplier_item_id,
-                                'Qty_008': item.Qty_008,
-                                'Qty_032': item.Qty_032,
-                                'Qty_041': item.Qty_041,
-                                'Qty_044': item.Qty_044,
-                                'Qty_053': item.Qty_053,
-                                'Qty_062': item.Qty_062,
-                                'Qty_063': item.Qty_063,
-                                'Qty_065': item.Qty_065,
-                                'Qty_068': item.Qty_068,
-                                'Qty_069': item.Qty_069,
-                                'Qty_070': item.Qty_070,
-                                'Qty_071': item.Qty_071,
-                                'Qty_072': item.Qty_072,
-                                'Qty_077': item.Qty_077,
-                                'Qty_093': item.Qty_093,
-                                'Qty_094': item.Qty_094,
-                                'Qty_098': item.Qty_098,
-                                'Discontinued': item.Discontinued
-                            }
-                            data.append(d)
-
-                            if len(data) == 5000:
-                                # записываем в базу частями по 5000 item'ов, чтобы избежать чрезмерной нагрузки
-                                cls.db.update_meyer_item__inventory(data)
-                                data.clear()
-                    if data:
-                        # записываем в базу частями по 5000 item'ов, чтобы избежать чрезмерной нагрузки
-                        cls.db.update_meyer_item__inventory(data)
-                        data.clear()
-
-            finally:
-                logging.debug(
-                    '{} Чтение {}.'.format(constants.LOGGING_FINISH, Meyer.INPUT_FILE_INVENTORY)
-                )
-
+            data = []  # список database.Item для записи в таблицу item базы данных
+            with converters.ValidationCollector('{} (inventory)'.format(Meyer.SUPPLIER_NAME)) as collector:
+                for item in Meyer.iter_items(
+                        Meyer.INPUT_FILE_INVENTORY,
+                        workers=cls.args.parse_workers,
+                        inventory=True
+                ):
+                    collector.add_rows()
+                    if item.Meyer_SKU:
+                        try:
+                            supplier_item_id = meyer_item_ids[item.Meyer_SKU]
+                        except KeyError:
+                            continue
+                        d = {
+                            'supplier_item_id': supplier_item_id,
+                            'Qty_008': item.Qty_008,
+                            'Qty_032': item.Qty_032,
+                            'Qty_041': item.Qty_041,
+                            'Qty_044': item.Qty_044,
+                            'Qty_053': item.Qty_053,
+                            'Qty_062': item.Qty_062,
+                            'Qty_063': item.Qty_063,
+                            'Qty_065': item.Qty_065,
+                            'Qty_068': item.Qty_068,
+                            'Qty_069': item.Qty_069,
+                            'Qty_070': item.Qty_070,
+                            'Qty_071': item.Qty_071,
+                            'Qty_072': item.Qty_072,
+                            'Qty_077': item.Qty_077,
+                            'Qty_093': item.Qty_093,
+                            'Qty_094': item.Qty_094,
+                            'Qty_098': item.Qty_098,
+                            'Discontinued': item.Discontinued
+                        }
+                        data.append(d)
+
+                        if len(data) == 5000:
+                            # записываем в базу частями по 5000 item'ов, чтобы избежать чрезмерной нагрузки
+                            cls.db.update_meyer_item__inventory(data)
+                            data.clear()
+            cls._log_validation_summary(collector)
+            if data:
+                # записываем в базу частями по 5000 item'ов, чтобы избежать чрезмерной нагрузки
+                cls.db.update_meyer_item__inventory(data)
+                data.clear()
         finally:
             logging.info(
                 "{} Запись в базу данных дополнительной информации по item'ам поставщика {}.".format(
@@ -0,0 +1,245 @@
+"""
+Очистка и нормализация текстовых значений (номеров, брендов, префиксов, SKU) из файлов поставщиков.
+
+Почти все значения - печатаемый ASCII, поэтому сначала проверяется str.isascii() и str.isprintable()
+(обе проверки выполняются в C без регулярных выражений), и только остальные значения проходят полную очистку.
+Для ASCII очистка и нормализация выполняются одним str.translate по объединённой таблице
+(удаление непечатаемых символов, пунктуации и пробелов и перевод в нижний регистр - за один проход).
+Функции *_column обрабатывают весь столбец (список значений) одним вызовом:
+проверка и translate выполняются один раз для всех значений столбца, склеенных в одну строку.
+"""
+
+import re
+from string import ascii_uppercase, printable, punctuation, whitespace
+from typing import Callable, List, Sequence, Tuple
+
+# Прежнее регулярное выражение удаляло не только символы не из string.printable, но и '\\'
+# (в r'[^{}]'.format(printable) он экранирует ']'), поэтому '\\' удаляется и здесь - результат не меняется
+UNPRINTABLE = ''.join(chr(i) for i in range(128) if chr(i) not in printable) + '\\'
+
+p_unprintable = re.compile(r'[^{}]'.format(printable))  # прежнее выражение, для не-ASCII строк
+
+NUMBER_TRANSLATION_TABLE = str.maketrans('', '', punctuation + whitespace)
+
+BRAND_TRANSLATION_TABLE = str.maketrans(dict.fromkeys(punctuation + whitespace, ' '))
+
+# Таблицы только для ASCII-строк: casefold() для ASCII совпадает с lower(), т.е. A-Z -> a-z
+_ASCII_UNPRINTABLE_TABLE = str.maketrans('', '', UNPRINTABLE)
+_ASCII_NUMBER_TABLE = str.maketrans(ascii_uppercase, ascii_uppercase.lower(), punctuation + whitespace)
+_ASCII_CLEAN_NUMBER_TABLE = str.maketrans(
+    ascii_uppercase, ascii_uppercase.lower(), UNPRINTABLE + punctuation + whitespace
+)
+_ASCII_BRAND_TABLE = str.maketrans(
+    dict(dict.fromkeys(punctuation + whitespace, ' '), **dict(zip(ascii_uppercase, ascii_uppercase.lower())))
+)
+
+# Разделитель значений столбца в склеенной строке: не печатаемый, не пунктуация и не пробел,
+# поэтому таблицы номера и бренда его не меняют
+_SEPARATOR = '\x00'
+
+
+def _is_clean(s: str) -> bool:
+    return s.isascii() and s.isprintable() and '\\' not in s
+
+
+def delete_unprintable(s: str) -> str:
+    """
+    Удаляет из s символы не из string.printable (и '\\')
+    """
+    if _is_clean(s):
+        return s
+    if s.isascii():
+        return s.translate(_ASCII_UNPRINTABLE_TABLE)
+    return p_unprintable.sub('', s)
+
+
+def normalize_number(number: str) -> str:
+    """
+    Удаляет из number пунктуацию и пробелы и переводит его в нижний регистр (casefold)
+    """
+    if number.isascii():
+        return number.translate(_ASCII_NUMBER_TABLE)
+    return number.translate(NUMBER_TRANSLATION_TABLE).casefold()
+
+
+def normalize_brand(brand: str) -> str:
+    """
+    Заменяет в brand пунктуацию и пробелы одним пробелом, убирает пробелы по краям и переводит в нижний регистр
+    """
+    if brand.isascii():
+        return ' '.join(brand.translate(_ASCII_BRAND_TABLE).split())
+    return ' '.join(brand.casefold().translate(BRAND_TRANSLATION_TABLE).split())
+
+
+def clean_number(number: str) -> Tuple[str, str]:
+    """
+    Возвращает (number без непечатаемых символов, нормализованный number),
+    т.е. (delete_unprintable(number), normalize_number(delete_unprintable(number)))
+    """
+    if number.isascii():
+        return (
+            number if number.isprintable() and '\\' not in number else number.translate(_ASCII_UNPRINTABLE_TABLE),
+            number.translate(_ASCII_CLEAN_NUMBER_TABLE)
+        )
+    number = p_unprintable.sub('', number)
+    return number, number.translate(_ASCII_NUMBER_TABLE)  # после удаления непечатаемых символов number - ASCII
+
+
+def strip_excel_quotes(value: str) -> str:
+    """
+    '="0123"' -> '0123' (значения в кавычках, чтобы Excel не отбрасывал ведущие нули)
+    """
+    return value.lstrip('="').rstrip('"')
+
+
+def _translate_column(
+        values: Sequence[str],
+        table: dict,
+        function: Callable[[str], str],
+        separator: str
+) -> List[str]:
+    """
+    Возвращает [function(value) for value in values], где для ASCII-значений function(value) == value.translate(table):
+    ASCII-значения склеиваются через separator (table его не меняет) и переводятся одним translate
+    (для ASCII-строки translate работает быстрее всего), а не-ASCII значения (обычно их единицы) - через function
+    """
+    joined = separator.join(values)
+    if joined.isascii():
+        translated = joined.translate(table).split(separator)
+        if len(translated) == len(values):
+            return translated
+        return [function(value) for value in values]  # separator в одном из значений
+    ascii_values = [value for value in values if value.isascii()]
+    translated = separator.join(ascii_values).translate(table).split(separator)
+    if len(translated) != len(ascii_values) or not ascii_values:
+        return [function(value) for value in values]
+    translated = iter(translated)
+    return [next(translated) if value.isascii() else function(value) for value in values]
+
+
+def delete_unprintable_column(values: Sequence[str]) -> List[str]:
+    """
+    Возвращает [delete_unprintable(value) for value in values]
+    """
+    if not values:
+        return []
+    if _is_clean(''.join(values)):
+        return list(values)
+    return _translate_column(values, _ASCII_UNPRINTABLE_TABLE, delete_unprintable, '\n')
+
+
+def normalize_number_column(values: Sequence[str]) -> List[str]:
+    """
+    Возвращает [normalize_number(value) for value in values]
+    """
+    if not values:
+        return []
+    return _translate_column(values, _ASCII_NUMBER_TABLE, normalize_number, _SEPARATOR)
+
+
+def normalize_brand_column(values: Sequence[str]) -> List[str]:
+    """
+    Возвращает [normalize_brand(value) for value in values]
+    """
+    if not values:
+        return []
+    # ' '.join(value.split()) не меняет уже нормализованные normalize_brand значения
+    translated = _translate_column(values, _ASCII_BRAND_TABLE, normalize_brand, _SEPARATOR)
+    return [' '.join(value.split()) for value in translated]
+
+
+def clean_number_column(values: Sequence[str]) -> Tuple[List[str], List[str]]:
+    """
+    Возвращает ([delete_unprintable(value) ...], [normalize_number(delete_unprintable(value)) ...]) для values
+    """
+    cleaned = delete_unprintable_column(values)
+    return cleaned, normalize_number_column(cleaned)
+
+
+def strip_excel_quotes_column(values: Sequence[str]) -> List[str]:
+    """
+    Возвращает [strip_excel_quotes(value) for value in values]
+    """
+    return [value.lstrip('="').rstrip('"') for value in values]
+
+
+if __name__ == '__main__':
+    # Сравнение с прежними функциями constants (регулярное выражение и translate + casefold на каждое значение)
+    # на 200000 значений, похожих на значения файлов поставщиков: номера с дефисами, точками и пробелами,
+    # номера Keystone в кавычках Excel, бренды, немного значений с не-ASCII и управляющими символами
+    import random
+    import time
+
+    def old_delete_unprintable(s: str) -> str:
+        return p_unprintable.sub('', s)
+
+    def old_normalize_number(number: str) -> str:
+        return number.translate(NUMBER_TRANSLATION_TABLE).casefold()
+
+    def old_normalize_brand(brand: str) -> str:
+        return ' '.join(brand.casefold().translate(BRAND_TRANSLATION_TABLE).split())
+
+    def random_number() -> str:
+        number = '{}{}-{}'.format(
+            random.choice(('', 'AB', 'K', 'TRX')), random.randint(0, 99999), random.choice(('', 'BLK', '2', 'X.5'))
+        )
+        dirt = random.random()
+        if dirt < 0.01:
+            number += random.choice(('®', '–', '\xa0'))
+        elif dirt < 0.02:
+            number += random.choice(('\t', '\x1a', '\\'))
+        return number
+
+    brand_names = ['Bilstein', 'K&N Engineering', 'MOPAR®', 'Rancho', 'WeatherTech', 'Edelbrock  Corp.', 'ACDelco']
+    corpora = {
+        'numbers': [random_number() for _ in range(200000)],
+        'Keystone numbers': ['="{}"'.format(random_number()) for _ in range(200000)],
+        'brands': [random.choice(brand_names) for _ in range(200000)],
+    }
+
+    def measure(function, values) -> float:
+        started = time.perf_counter()
+        function(values)
+        return len(values) / (time.perf_counter() - started)
+
+    for corpus, values in corpora.items():
+        print(corpus + ':')
+        for name, before, after, column in (
+                (
+                    'delete_unprintable',
+                    lambda vs: [old_delete_unprintable(v) for v in vs],
+                    lambda vs: [delete_unprintable(v) for v in vs],
+                    delete_unprintable_column
+                ),
+                (
+                    'normalize_number',
+                    lambda vs: [old_normalize_number(v) for v in vs],
+                    lambda vs: [normalize_number(v) for v in vs],
+                    normalize_number_column
+                ),
+                (
+                    'delete + normalize number',
+                    lambda vs: [old_normalize_number(old_delete_unprintable(v)) for v in vs],
+                    lambda vs: [clean_number(v) for v in vs],
+                    clean_number_column
+                ),
+                (
+                    'normalize_brand',
+                    lambda vs: [old_normalize_brand(v) for v in vs],
+                    lambda vs: [normalize_brand(v) for v in vs],
+                    normalize_brand_column
+                ),
+                (
+                    'strip_excel_quotes',
+                    lambda vs: [v.lstrip('="').rstrip('"') for v in vs],
+                    lambda vs: [strip_excel_quotes(v) for v in vs],
+                    strip_excel_quotes_column
+                ),
+        ):
+            old = measure(before, values)
+            new = measure(after, values)
+            columns = measure(column, values)
+            print(
+                '    {:<26} values/s: {:>9.0f} before, {:>9.0f} by value (x{:.1f}), '
+                '{:>9.0f} by column (x{:.1f})'.format(name, old, new, new / old, columns, columns / old)
+            )
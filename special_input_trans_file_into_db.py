@@ -113,6 +113,7 @@ class Program:
 
                 try:
                     logging.debug('{} вставка в trans_item'.format(constants.LOGGING_START))
+                    supplier_item_ids = self.db.get_supplier_item_ids(Trans.id_in_db)
                     data = []
                     for item in items:
                         if item.norm_brand and item.norm_mpn:
@@ -122,9 +123,15 @@ class Program:
                             except KeyError:
                                 logging.error('Error key {} in supplier_brand_ids'.format(key))
                                 continue
+                            try:
+                                supplier_item_id = supplier_item_ids[(supplier_brand_id, item.norm_mpn)]
+                            except KeyError:
+                                logging.error('Error key {} in supplier_item_ids'.format(
+                                    (supplier_brand_id, item.norm_mpn)
+                                ))
+                                continue
                             d = {
-                                'supplier_brand_id': supplier_brand_id,
-                                'norm_mpn': item.norm_mpn,
+                                'supplier_item_id': supplier_item_id,
                                 'DESCRIPTION': item.Description,
                                 'YOUR_PRICE': item.Your_Price,
                                 'JOBBER_PRICE': item.Jobber,
@@ -1,24 +1,141 @@
 """
 Классы для обработки файлов поставщиков.
 Под обработкой подразумевается загрузка по ftp (или http) и нормализация.
-Под нормализацией подразумевается приведение файлов к формату csv и запись в унифицированном диалекте.
+Под нормализацией подразумевается приведение файлов к формату csv и запись в унифицированном диалекте
+(или в колоночном формате, см. модуль columnar).
 """
 
 import abc
+import contextlib
 import csv
+import hashlib
+import io
+import itertools
+import json
 import logging
+import operator
 import os
 import re
-import shutil
+import socket
+import threading
+import time
 import zipfile
-from typing import List
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
 
 import requests
 import pycurl
 
+import columnar
 import constants
+import converters
 from items import BaseItem, KeystoneItem, MeyerItem, PremierItem, TransItem, Turn14Item
 
+CONTENT_RANGE_P = re.compile(r'^bytes (?P<first>\d+)-(?P<last>\d+)/(?P<size>\d+|\*)$')
+
+
+class DownloadCancelled(Exception):
+    """
+    Загрузка отменена, т.к. файл уже загружен с другого сервера
+    """
+
+
+class DownloadProgress:
+    """
+    Состояние загрузки, доступное из других потоков (используется при хеджированной загрузке):
+    количество загруженных байт, флаг отмены и соперничающая загрузка того же файла с другого сервера.
+    """
+
+    def __init__(self, lock: threading.Lock):
+        self.downloaded = 0
+        self.cancelled = threading.Event()
+        self.rival = None  # type: Optional[DownloadProgress]
+        self.response = None  # текущий ответ requests загрузки (она может ждать в нём данных)
+        self._lock = lock  # общий для соперничающих загрузок
+
+    def cancel(self) -> None:
+        """
+        Отменяет загрузку. Соединение ответа requests закрывается (shutdown сокета), чтобы загрузка не ждала
+        следующей части данных до DOWNLOAD_READ_TIMEOUT, а сразу заметила отмену и удалила свой временный файл.
+        Сам ответ закрывает загружающий поток: response.close() из другого потока ждал бы окончания чтения
+        """
+        self.cancelled.set()
+        response = self.response
+        if response is None or response.raw.closed:
+            return
+        try:
+            connection = response.raw.connection
+            if connection is not None and connection.sock is not None:
+                sock, duplicate = connection.sock, False
+            else:
+                # при ответе с Connection: close http.client отвязывает сокет от соединения,
+                # но ответ продолжает читать из него - берём копию сокета по дескриптору ответа
+                sock, duplicate = socket.socket(fileno=os.dup(response.raw.fileno())), True
+        except (AttributeError, OSError, ValueError) as err:
+            logging.warning(
+                'Не удалось получить соединение отменённой загрузки ({!r}), '
+                'она завершится не позже чем через {} с.'.format(err, BasicSupplier.DOWNLOAD_READ_TIMEOUT)
+            )
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError as err:
+            logging.debug('Ошибка {!r} при закрытии соединения отменённой загрузки.'.format(err))
+        finally:
+            if duplicate:
+                sock.close()
+
+    def check(self) -> None:
+        """
+        Прерывает загрузку исключением DownloadCancelled, если она отменена
+        """
+        if self.cancelled.is_set():
+            raise DownloadCancelled()
+
+    def claim(self) -> bool:
+        """
+        Вызывается загрузкой перед заменой файла загруженным и отменяет соперничающую загрузку.
+        :return: True - файл можно заменять, False - файл уже загружен соперничающей загрузкой
+        """
+        with self._lock:
+            if self.cancelled.is_set():
+                return False
+            if self.rival:
+                self.rival.cancel()
+            return True
+
+
+class HashingReader(io.RawIOBase):
+    """
+    Обёртка над бинарным потоком, вычисляющая хеш sha256 и размер прочитанного из него содержимого.
+    raw.read(n) может вернуть больше n байт (urllib3 1.x при decode_content возвращает распакованные данные),
+    лишние байты отдаются при следующем чтении
+    """
+
+    def __init__(self, raw: BinaryIO):
+        super().__init__()
+        self.raw = raw
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self._pending = b''  # прочитанные из raw, но ещё не отданные байты
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = len(buffer)
+        if self._pending:
+            data, self._pending = self._pending[:size], self._pending[size:]
+        else:
+            data = self.raw.read(size)
+            self.sha256.update(data)
+            self.size += len(data)
+            if len(data) > size:
+                data, self._pending = data[:size], data[size:]
+        buffer[:len(data)] = data
+        return len(data)
+
 
 class BasicSupplier(abc.ABC):
     """
@@ -27,12 +144,38 @@ class BasicSupplier(abc.ABC):
     """
     item = BaseItem
     INPUT_FILE_NECESSARY_FIELDS_LIST = None  # необходимые поля во входном файле
+    KEY_FIELDS = None  # поля входного файла, из которых item без full_parse получает brand, mpn и prefix
+    SPECIFIC_FIELDS = None  # атрибуты item'а, записываемые в специфическую таблицу поставщика (e.g. keystone_item)
+    EXTRA_FIELDS = ()  # атрибуты item'а, необходимые для дополнительных шагов записи в базу данных
     SUPPLIER_NAME = None  # название поставщика
     DOWNLOAD_FILE = None  # имя загруженного файла
     INPUT_FILE = None  # имя входного файла
     DOWNLOAD_URL = None  # url для загрузки '*******'
     DOWNLOAD_USERPASSWORD = None  # e.g., '*******:*******'
     DOWNLOAD_URL_ALTERNATIVE = None  # ссылка на файл поставщика на альтернативном сервере
+    DOWNLOAD_CHUNK_SIZE = 2 ** 20  # размер части файла, записываемой на диск при потоковой загрузке по HTTP
+    DOWNLOAD_CONNECT_TIMEOUT = 20  # таймаут установки соединения, с
+    DOWNLOAD_READ_TIMEOUT = 300  # таймаут ожидания очередной части данных, с
+    DOWNLOAD_PROGRESS_STEP = 50 * 2 ** 20  # через сколько загруженных байт сообщать о ходе загрузки
+    DOWNLOAD_RETRIES = 3  # количество попыток загрузки (повторные попытки продолжают загрузку с места обрыва)
+    DOWNLOAD_SEGMENTS = 1  # количество одновременно загружаемых диапазонов одного файла по HTTP (1 - без сегментов)
+    DOWNLOAD_HEDGE = False  # запускать ли параллельно загрузку с альтернативного сервера, если основной медленный
+    DOWNLOAD_HEDGE_DELAY = 60  # через сколько секунд после начала загрузки с основного сервера проверять её скорость
+    DOWNLOAD_HEDGE_MIN_SPEED = 512 * 2 ** 10  # скорость (байт/с), ниже которой запускается загрузка с альтернативного
+    DOWNLOAD_ENCODING = 'utf8'  # кодировка загружаемого файла
+    DOWNLOAD_DIALECT = None  # диалект загружаемого csv-файла (None - определяется автоматически)
+    STREAMING = True  # можно ли нормализовать файл прямо при загрузке, не сохраняя загруженный файл на диск
+    PARSE_CHUNK_SIZE = 16 * 2 ** 20  # размер части входного файла, разбираемой одним процессом при параллельном разборе
+    PARSE_BATCH_SIZE = 5000  # количество записей, item'ы которых создаются вместе (см. BaseItem.from_batch)
+    INTERMEDIATE_FORMAT = 'csv'  # формат входных файлов: 'csv' или 'columns' (см. модуль columnar)
+
+    # метаданные загруженных файлов, общие для всех поставщиков: {file: {'url': ссылка последней загрузки,
+    #  'size': ..., 'sha256': ..., 'sources': {ссылка: {'filetime': ...} или {'etag': ..., 'last_modified': ...}}}}
+    download_manifest = {}
+    # хеши содержимого файлов поставщиков, последними успешно записанных в базу данных, и файлов резервных копий:
+    # {'loaded': {SUPPLIER_NAME: {'downloads': {имя файла: sha256}, 'inputs': {имя файла: sha256}}},
+    #  'backups': {sha256: имя архива резервной копии}}
+    content_index = {'loaded': {}, 'backups': {}}
 
     def __repr__(self):
         return '{} object with __dict__: {}'.format(self.__class__, self.__dict__)
@@ -42,99 +185,836 @@ class BasicSupplier(abc.ABC):
         return os.path.join(constants.PARSE_SUPPLIERS_FILES_TEMP_DIR, file)
 
     @staticmethod
-    def _download_curl(file: str, url: str, userpassword: str = None) -> None:
+    def load_download_manifest() -> None:
         """
-        Загружает с помощью pycurl содержимое по ссылке url с опциональным паролем userpassword в файл file
+        Загружает из файла constants.PARSE_SUPPLIERS_FILES_DOWNLOAD_MANIFEST_FILE метаданные файлов,
+        загруженных при предыдущем запуске (ETag, Last-Modified, время изменения и размер файла на сервере)
         """
+        BasicSupplier.download_manifest.clear()
         try:
-            logging.info('Загрузка {}'.format(url))
+            with open(
+                    file=constants.PARSE_SUPPLIERS_FILES_DOWNLOAD_MANIFEST_FILE,
+                    mode='r',
+                    encoding='utf8'
+            ) as f_in:
+                BasicSupplier.download_manifest.update(json.load(f_in))
+        except FileNotFoundError:
+            logging.info(
+                'Файл {} не найден. Все файлы поставщиков будут загружены.'.format(
+                    constants.PARSE_SUPPLIERS_FILES_DOWNLOAD_MANIFEST_FILE
+                )
+            )
+        except ValueError as err:
+            logging.warning(
+                'Файл {} повреждён ({}). Все файлы поставщиков будут загружены.'.format(
+                    constants.PARSE_SUPPLIERS_FILES_DOWNLOAD_MANIFEST_FILE,
+                    err
+                )
+            )
+
+    @staticmethod
+    def save_download_manifest() -> None:
+        """
+        Сохраняет метаданные загруженных файлов в файл constants.PARSE_SUPPLIERS_FILES_DOWNLOAD_MANIFEST_FILE
+        """
+        with open(
+                file=constants.PARSE_SUPPLIERS_FILES_DOWNLOAD_MANIFEST_FILE,
+                mode='w',
+                encoding='utf8'
+        ) as f_out:
+            json.dump(BasicSupplier.download_manifest, f_out, indent=2, sort_keys=True)
+
+    @staticmethod
+    def load_content_index() -> None:
+        """
+        Загружает индекс хешей содержимого из файла constants.PARSE_SUPPLIERS_FILES_CONTENT_INDEX_FILE
+        """
+        BasicSupplier.content_index = {'loaded': {}, 'backups': {}}
+        try:
+            with open(
+                    file=constants.PARSE_SUPPLIERS_FILES_CONTENT_INDEX_FILE,
+                    mode='r',
+                    encoding='utf8'
+            ) as f_in:
+                BasicSupplier.content_index.update(json.load(f_in))
+        except FileNotFoundError:
+            logging.info('Файл {} не найден.'.format(constants.PARSE_SUPPLIERS_FILES_CONTENT_INDEX_FILE))
+        except ValueError as err:
+            logging.warning(
+                'Файл {} повреждён ({}).'.format(constants.PARSE_SUPPLIERS_FILES_CONTENT_INDEX_FILE, err)
+            )
+
+    @staticmethod
+    def save_content_index() -> None:
+        """
+        Сохраняет индекс хешей содержимого в файл constants.PARSE_SUPPLIERS_FILES_CONTENT_INDEX_FILE
+        """
+        with open(
+                file=constants.PARSE_SUPPLIERS_FILES_CONTENT_INDEX_FILE,
+                mode='w',
+                encoding='utf8'
+        ) as f_out:
+            json.dump(BasicSupplier.content_index, f_out, indent=2, sort_keys=True)
+
+    @staticmethod
+    def file_sha256(file: str, chunk_size: int = 2 ** 20) -> hashlib.sha256:
+        """
+        Вычисляет хеш sha256 содержимого файла file, читая его по частям размером chunk_size
+        """
+        sha256 = hashlib.sha256()
+        with open(
+                file=file,
+                mode='rb'
+        ) as f_in:
+            for chunk in iter(lambda: f_in.read(chunk_size), b''):
+                sha256.update(chunk)
+        return sha256
+
+    @classmethod
+    def download_files(cls) -> List[str]:
+        """
+        Возвращает список загружаемых файлов поставщика
+        """
+        return [cls.DOWNLOAD_FILE]
+
+    @classmethod
+    def download_hashes(cls) -> Optional[dict]:
+        """
+        Возвращает хеши содержимого загруженных файлов поставщика {имя файла: sha256},
+        вычисленные при загрузке, или None, если хеш какого-либо файла неизвестен
+        """
+        hashes = {}
+        for file in cls.download_files():
+            sha256 = BasicSupplier.download_manifest.get(file, {}).get('sha256')
+            if not sha256:
+                return None
+            hashes[os.path.basename(file)] = sha256
+        return hashes
+
+    @classmethod
+    def input_hashes(cls) -> dict:
+        """
+        Вычисляет хеши содержимого входных (нормализованных) файлов поставщика {имя файла: sha256}
+        """
+        return {
+            os.path.basename(file): BasicSupplier.file_sha256(file).hexdigest()
+            for file in map(BasicSupplier.intermediate_file, cls.input_files())
+        }
+
+    @classmethod
+    def loaded_hashes(cls) -> dict:
+        """
+        Возвращает хеши содержимого файлов поставщика, последними успешно записанных в базу данных
+        {'downloads': {...}, 'inputs': {...}} (пустой словарь, если таких нет)
+        """
+        return BasicSupplier.content_index['loaded'].get(cls.SUPPLIER_NAME, {})
+
+    @staticmethod
+    def _get_previous_download(file: str, url: str) -> Optional[dict]:
+        """
+        Возвращает метаданные файла file с прошлого запуска вместе с проверочными данными ссылки url
+        (filetime или etag и last_modified), если они для неё известны и файл до сих пор есть на диске
+        """
+        previous = BasicSupplier.download_manifest.get(file)
+        if not previous or not os.path.exists(file):
+            return None
+        if 'sources' not in previous:  # манифест до хранения проверочных данных по ссылкам
+            return previous if previous.get('url') == url else None
+        if url not in previous['sources']:
+            return None
+        return dict(previous, **previous['sources'][url])
+
+    @staticmethod
+    def _record_download(file: str, url: str, size: int, sha256: str, **validators) -> None:
+        """
+        Сохраняет в download_manifest метаданные файла file, загруженного по ссылке url.
+        Проверочные данные validators хранятся по каждой ссылке отдельно: если содержимое файла не изменилось,
+        то данные других ссылок (например, основного сервера после загрузки с альтернативного) остаются
+        """
+        previous = BasicSupplier.download_manifest.get(file) or {}
+        sources = {}
+        if previous.get('sha256') == sha256:
+            sources = dict(previous.get('sources', {}))
+        sources[url] = validators
+        BasicSupplier.download_manifest[file] = {'url': url, 'size': size, 'sha256': sha256, 'sources': sources}
+
+    @staticmethod
+    def _make_curl(url: str, userpassword: str = None) -> pycurl.Curl:
+        """
+        Создаёт экземпляр Curl с общими для всех загрузок опциями
+        """
+        curl = pycurl.Curl()  # создаём экземпляр Curl
+        curl.setopt(curl.URL, url)  # установка опции загрузки URL=download_url
+        if userpassword:
+            curl.setopt(
+                curl.USERPWD,
+                userpassword
+            )  # установка опции загрузки USERPWD=download_userpwd
+        curl.setopt(curl.SSL_VERIFYPEER, 0)  # данная опция необходима для загрузки через FTP
+        curl.setopt(curl.SSL_VERIFYHOST, 0)  # данная опция необходима для загрузки через FTP
+        curl.setopt(curl.NOSIGNAL, 1)  # данная опция необходима для загрузки в нескольких потоках
+        curl.setopt(curl.OPT_FILETIME, 1)  # запрашиваем время изменения файла на сервере (MDTM для FTP)
+        return curl
+
+    @staticmethod
+    def _probe_curl(url: str, userpassword: str = None) -> Tuple[int, int]:
+        """
+        Получает с помощью pycurl время изменения и размер файла на сервере, не загружая сам файл
+        :return: (время изменения, размер); -1 вместо значения, которое сервер не сообщает
+        """
+        curl = BasicSupplier._make_curl(url, userpassword)
+        curl.setopt(curl.NOBODY, 1)  # запрашиваем только метаданные файла (MDTM и SIZE для FTP)
+        try:
+            curl.perform()
+            return curl.getinfo(curl.INFO_FILETIME), int(curl.getinfo(curl.CONTENT_LENGTH_DOWNLOAD))
+        finally:
+            curl.close()
+
+    @staticmethod
+    def _perform_curl(
+            file: str,
+            url: str,
+            userpassword: str = None,
+            offset: int = 0,
+            progress: DownloadProgress = None,
+            sha256: hashlib.sha256 = None
+    ) -> int:
+        """
+        Загружает с помощью pycurl содержимое по ссылке url в файл file.
+        Если offset > 0, то загрузка продолжается с позиции offset и дописывается в конец файла file.
+        Если задан progress, то в нём отражается количество загруженных байт, а при его отмене загрузка прерывается.
+        Если задан sha256, то им хешируется загружаемое содержимое по мере записи.
+        :return: время изменения файла на сервере (-1, если сервер его не сообщает)
+        """
+
+        def write(chunk):
+            f_out.write(chunk)
+            sha256.update(chunk)
+
+        def xferinfo(download_total, downloaded, upload_total, uploaded):
+            progress.downloaded = offset + downloaded
+            return 1 if progress.cancelled.is_set() else 0  # ненулевое значение прерывает загрузку
+
+        with open(
+                file=file,
+                mode='ab' if offset else 'wb'  # открываем выходной файл для бинарной записи
+        ) as f_out:
+            curl = BasicSupplier._make_curl(url, userpassword)
+            if sha256:
+                curl.setopt(curl.WRITEFUNCTION, write)
+            else:
+                curl.setopt(curl.WRITEDATA, f_out)  # данная опция необходима для записи в выходной файл
+            if offset:
+                curl.setopt(curl.RESUME_FROM_LARGE, offset)  # REST для FTP, Range для HTTP
+            if progress:
+                curl.setopt(curl.NOPROGRESS, 0)
+                curl.setopt(curl.XFERINFOFUNCTION, xferinfo)
+            try:
+                curl.perform()  # запускаем загрузку
+                return curl.getinfo(curl.INFO_FILETIME)
+            except pycurl.error:
+                if progress:
+                    progress.check()
+                logging.error('Ошибка {} при загрузке {}'.format(repr(curl.errstr()), url))
+                raise
+            finally:
+                curl.close()  # закрываем Curl
+
+    @staticmethod
+    def _download_curl(file: str, url: str, userpassword: str = None, progress: DownloadProgress = None) -> bool:
+        """
+        Загружает с помощью pycurl содержимое по ссылке url с опциональным паролем userpassword в файл file.
+        Если время изменения и размер файла на сервере совпадают с сохранёнными при предыдущей загрузке,
+        то файл не загружается повторно.
+        Загрузка идёт во временный файл file.part; при обрыве соединения загрузка продолжается
+        с места обрыва (если размер файла на сервере это позволяет), а не начинается заново.
+        :param progress: состояние загрузки для хеджированной загрузки (см. _download_hedged)
+        :return: True - файл загружен, False - файл на сервере не изменился
+        """
+        remote_size = -1
+        previous = BasicSupplier._get_previous_download(file, url)
+        if previous:
             try:
-                logging.debug('{} Запись {}.'.format(constants.LOGGING_START, file))
-                with open(
-                        file=file,
-                        mode='wb'  # открываем выходной файл для бинарной записи
-                ) as f_out:
-                    curl = pycurl.Curl()  # создаём экземпляр Curl
-                    curl.setopt(curl.URL, url)  # установка опции загрузки URL=download_url
-                    if userpassword:
-                        curl.setopt(
-                            curl.USERPWD,
-                            userpassword
-                        )  # установка опции загрузки USERPWD=download_userpwd
-                    curl.setopt(curl.SSL_VERIFYPEER, 0)  # данная опция необходима для загрузки через FTP
-                    curl.setopt(curl.SSL_VERIFYHOST, 0)  # данная опция необходима для загрузки через FTP
-                    curl.setopt(curl.WRITEDATA, f_out)  # данная опция необходима для записи в выходной файл
+                filetime, remote_size = BasicSupplier._probe_curl(url, userpassword)
+            except pycurl.error as err:
+                logging.warning('Ошибка {!r} при получении метаданных {}'.format(err, url))
+            else:
+                if filetime != -1 and remote_size >= 0 \
+                        and filetime == previous.get('filetime') and remote_size == previous.get('size') \
+                        and remote_size == os.path.getsize(file):
+                    # результат "не изменился" тоже должен выиграть гонку: иначе за время получения метаданных
+                    # альтернативная загрузка может заменить файл, а поставщик будет считаться неизменившимся
+                    if progress and not progress.claim():
+                        raise DownloadCancelled()
+                    logging.info('Файл {} не изменился с прошлой загрузки. Загрузка пропущена.'.format(url))
+                    return False
+
+        part = file + '.part'
+        offset = 0
+        sha256 = hashlib.sha256()
+        started = time.monotonic()
+        logging.info('Загрузка {}'.format(url))
+        try:
+            logging.debug('{} Запись {}.'.format(constants.LOGGING_START, part))
+            for attempt in range(1, BasicSupplier.DOWNLOAD_RETRIES + 1):
+                try:
+                    filetime = BasicSupplier._perform_curl(part, url, userpassword, offset, progress, sha256)
+                except DownloadCancelled:
+                    os.remove(part)
+                    logging.info('Загрузка {} отменена.'.format(url))
+                    raise
+                except pycurl.error:
+                    if attempt == BasicSupplier.DOWNLOAD_RETRIES:
+                        raise
+                    offset = os.path.getsize(part)
                     try:
-                        curl.perform()  # запускаем загрузку
+                        _, remote_size = BasicSupplier._probe_curl(url, userpassword)
                     except pycurl.error:
-                        logging.error('Ошибка {} при загрузке {}'.format(repr(curl.errstr()), url))
-                        raise
-                    finally:
-                        curl.close()  # закрываем Curl
-            finally:
-                logging.debug('{} Запись {}.'.format(constants.LOGGING_FINISH, file))
+                        remote_size = -1
+                    if not 0 < offset < remote_size:  # докачка возможна, только если известен размер на сервере
+                        offset = 0
+                    # хеш продолжаем с уже загруженной части файла
+                    sha256 = BasicSupplier.file_sha256(part) if offset else hashlib.sha256()
+                    logging.warning(
+                        'Повторная загрузка {} (попытка {} из {}) с позиции {}.'.format(
+                            url, attempt + 1, BasicSupplier.DOWNLOAD_RETRIES, offset
+                        )
+                    )
+                else:
+                    break
+        finally:
+            logging.debug('{} Запись {}.'.format(constants.LOGGING_FINISH, part))
+
+        size = os.path.getsize(part)
+        if remote_size >= 0 and size != remote_size:
+            raise pycurl.error(
+                pycurl.E_PARTIAL_FILE,
+                'Размер загруженного файла {} ({}) не совпадает с размером на сервере ({})'.format(
+                    file, size, remote_size
+                )
+            )
+        if progress and not progress.claim():
+            os.remove(part)
+            raise DownloadCancelled()
+        os.replace(part, file)
+        logging.info('Файл загружен и сохранён как {} за {:.1f} с.'.format(file, time.monotonic() - started))
+
+        BasicSupplier._record_download(file, url, size, sha256.hexdigest(), filetime=filetime)
+        return True
+
+    @classmethod
+    def _download_hedged(cls, file: str, url: str, userpassword: str, url_alternative: str) -> bool:
+        """
+        Хеджированная загрузка файла file.
+        Запускает загрузку с основного сервера с помощью pycurl. Если через cls.DOWNLOAD_HEDGE_DELAY секунд
+        она идёт со скоростью ниже cls.DOWNLOAD_HEDGE_MIN_SPEED (или раньше завершилась ошибкой),
+        то параллельно запускает загрузку с альтернативного сервера с помощью requests.
+        Используется та загрузка, которая завершится первой, вторая отменяется.
+        :return: True - файл загружен, False - файл на сервере не изменился
+        """
+        lock = threading.Lock()
+        primary_progress, mirror_progress = DownloadProgress(lock), DownloadProgress(lock)
+        primary_progress.rival, mirror_progress.rival = mirror_progress, primary_progress
+
+        started = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='hedge')
+        try:
+            primary = executor.submit(cls._download_curl, file, url, userpassword, primary_progress)
+            wait([primary], timeout=cls.DOWNLOAD_HEDGE_DELAY)
+            if primary.done():
+                if primary.exception() is None:
+                    return primary.result()
+            else:
+                speed = primary_progress.downloaded / (time.monotonic() - started)
+                if speed >= cls.DOWNLOAD_HEDGE_MIN_SPEED:
+                    return primary.result()
+                logging.warning(
+                    'Загрузка {} идёт со скоростью {:.1f} КБ/с. Запускается параллельная загрузка с {}.'.format(
+                        url, speed / 2 ** 10, url_alternative
+                    )
+                )
+            mirror = executor.submit(
+                cls._download_requests,
+                file, url_alternative, cls.DOWNLOAD_CHUNK_SIZE, mirror_progress, file + '.mirror.part'
+            )
+
+            error = None
+            pending = {primary, mirror}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        changed = future.result()
+                    except DownloadCancelled:
+                        continue
+                    except Exception as err:
+                        # ответ с ошибкой (например, 404 с альтернативного сервера) не выигрывает гонку:
+                        # _download_requests бросает исключение до замены файла, и ждём вторую загрузку
+                        if pending:
+                            logging.warning(
+                                'Загрузка {} завершилась ошибкой {!r}, ожидается загрузка с {}.'.format(
+                                    url_alternative if future is mirror else url, err,
+                                    url if future is mirror else url_alternative
+                                )
+                            )
+                        if future is mirror or error is None:
+                            error = err
+                        continue
+                    primary_progress.cancel()
+                    mirror_progress.cancel()
+                    logging.info(
+                        'Файл {} получен с {} за {:.1f} с.'.format(
+                            file, url if future is primary else url_alternative, time.monotonic() - started
+                        )
+                    )
+                    if future is mirror and changed:
+                        cls._record_primary_source(file, url, userpassword)
+                    return changed
+            raise error
         finally:
-            logging.info('Файл загружен и сохранён как {}.'.format(file))
+            executor.shutdown(wait=False)  # не ждём, пока отменённая загрузка заметит отмену
+
+    @staticmethod
+    def _record_primary_source(file: str, url: str, userpassword: str) -> None:
+        """
+        После загрузки файла file с альтернативного сервера сохраняет время изменения файла на основном сервере url,
+        если размер файла там совпадает с загруженным, чтобы при следующем запуске _download_curl мог пропустить
+        загрузку неизменившегося файла
+        """
+        try:
+            filetime, remote_size = BasicSupplier._probe_curl(url, userpassword)
+        except pycurl.error as err:
+            logging.warning('Ошибка {!r} при получении метаданных {}'.format(err, url))
+            return
+        downloaded = BasicSupplier.download_manifest[file]
+        if filetime != -1 and remote_size == downloaded['size']:
+            downloaded['sources'][url] = {'filetime': filetime}
+
+    @classmethod
+    def _download_primary(cls, file: str, url: str, userpassword: str, url_alternative: str = None) -> bool:
+        """
+        Загружает файл с основного сервера с помощью pycurl,
+        при cls.DOWNLOAD_HEDGE - с подстраховкой альтернативным сервером url_alternative
+        :return: True - файл загружен, False - файл на сервере не изменился
+        """
+        if cls.DOWNLOAD_HEDGE and url_alternative:
+            return cls._download_hedged(file, url, userpassword, url_alternative)
+        return cls._download_curl(file, url, userpassword)
 
     @classmethod
-    def download(cls) -> None:
+    def download(cls) -> bool:
         """
         Загрузка с помощью pycurl
+        :return: True - файл загружен, False - файл на сервере не изменился
         """
-        cls._download_curl(
+        return cls._download_primary(
             file=cls.DOWNLOAD_FILE,
             url=cls.DOWNLOAD_URL,
-            userpassword=cls.DOWNLOAD_USERPASSWORD
+            userpassword=cls.DOWNLOAD_USERPASSWORD,
+            url_alternative=cls.DOWNLOAD_URL_ALTERNATIVE
         )
 
     @staticmethod
-    def _download_requests(file: str, url: str) -> None:
+    def _log_download_progress(url: str, downloaded: int, total: int = None) -> None:
         """
-        Загружает с помощью requests содержимое по ссылке url в файл file
+        Сообщает в лог о ходе загрузки
+        """
+        if total:
+            logging.info(
+                'Загрузка {}: {:.1f} из {:.1f} МБ ({:.0%}).'.format(
+                    url, downloaded / 2 ** 20, total / 2 ** 20, downloaded / total
+                )
+            )
+        else:
+            logging.info('Загрузка {}: {:.1f} МБ.'.format(url, downloaded / 2 ** 20))
+
+    @staticmethod
+    def _get_conditional_headers(file: str, url: str) -> dict:
+        """
+        Возвращает заголовки условного HTTP-запроса по данным предыдущей загрузки файла file
+        """
+        headers = {}
+        previous = BasicSupplier._get_previous_download(file, url)
+        if previous:
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
+        return headers
+
+    @staticmethod
+    def _get_range_validator(response: requests.Response) -> Optional[str]:
+        """
+        Возвращает значение для заголовка If-Range, гарантирующее, что докачиваемые части относятся к тому же файлу
+        (слабый ETag для этого не подходит)
+        """
+        etag = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        return response.headers.get('Last-Modified')
+
+    @staticmethod
+    def _parse_content_range(response: requests.Response) -> Optional[Tuple[int, int, Optional[int]]]:
         """
+        Разбирает заголовок Content-Range вида 'bytes 100-199/1000'
+        :return: (первый байт, последний байт, полный размер или None)
+        """
+        m = CONTENT_RANGE_P.match(response.headers.get('Content-Range', ''))
+        if not m:
+            return None
+        return int(m.group('first')), int(m.group('last')), int(m.group('size')) if m.group('size') != '*' else None
+
+    @staticmethod
+    def _download_requests(
+            file: str,
+            url: str,
+            chunk_size: int = 2 ** 20,
+            progress: DownloadProgress = None,
+            part: str = None
+    ) -> bool:
+        """
+        Загружает с помощью requests содержимое по ссылке url в файл file.
+        Содержимое записывается в файл по частям размером chunk_size по мере получения,
+        поэтому расход памяти не зависит от размера файла.
+        Запрос делается условным (If-None-Match, If-Modified-Since) по данным предыдущей загрузки,
+        поэтому неизменившийся файл сервер не передаёт повторно.
+        Загрузка идёт во временный файл file.part; при обрыве соединения загрузка продолжается
+        с места обрыва запросом с заголовком Range (если сервер это поддерживает).
+        :param progress: состояние загрузки для хеджированной загрузки (см. _download_hedged)
+        :param part: временный файл (по умолчанию file.part)
+        :return: True - файл загружен, False - файл на сервере не изменился
+        :raises requests.HTTPError: сервер ответил ошибкой (file и метаданные его загрузки не меняются)
+        """
+        conditional_headers = BasicSupplier._get_conditional_headers(file, url)
+        headers = {'Accept-Encoding': 'gzip, deflate'}  # сжатое содержимое распаковывается в iter_content
+
+        part = part or file + '.part'
+        sha256 = hashlib.sha256()
+        downloaded = 0
+        total = None  # размер файла на сервере, если известен
+        validator = None  # значение для заголовка If-Range при докачке
+        full_response_headers = None  # заголовки ответа, с которого начата загрузка файла
+        changed = True
+        started = time.monotonic()
+        logging.info('Загрузка {}'.format(url))
         try:
-            logging.info('Загрузка {}'.format(url))
-            try:
-                logging.debug('{} Запись {}.'.format(constants.LOGGING_START, file))
-                with open(
-                        file=file,
-                        mode='wb'
-                ) as f_out:
+            logging.debug('{} Запись {}.'.format(constants.LOGGING_START, part))
+            for attempt in range(1, BasicSupplier.DOWNLOAD_RETRIES + 1):
+                if downloaded:
+                    # докачка: сжатие отключаем, т.к. позиция считается в распакованных байтах
+                    request_headers = {'Range': 'bytes={}-'.format(downloaded), 'Accept-Encoding': 'identity'}
+                    if validator:
+                        request_headers['If-Range'] = validator
+                else:
+                    request_headers = dict(headers, **conditional_headers)
+                try:
+                    response = requests.get(
+                        url,
+                        headers=request_headers,
+                        stream=True,
+                        # таймаут на соединение и на ожидание очередной части данных, а не на всю загрузку
+                        timeout=(BasicSupplier.DOWNLOAD_CONNECT_TIMEOUT, BasicSupplier.DOWNLOAD_READ_TIMEOUT)
+                    )
+                except requests.RequestException as err:
+                    logging.error('Возникла ошибка {} при загрузке: {}'.format(err, url))
+                    if attempt == BasicSupplier.DOWNLOAD_RETRIES:
+                        raise
+                    continue
+                if progress:
+                    progress.response = response
+                    progress.check()  # отмена могла произойти до того, как ответ стал доступен для закрытия
+                with response:
+                    if not downloaded and response.status_code == requests.codes.not_modified:
+                        logging.info('Файл {} не изменился с прошлой загрузки. Загрузка пропущена.'.format(url))
+                        changed = False
+                        break
+
+                    content_range = BasicSupplier._parse_content_range(response)
+                    if downloaded and response.status_code == requests.codes.partial_content \
+                            and content_range and content_range[0] == downloaded \
+                            and content_range[2] in (None, total):
+                        mode = 'ab'
+                    else:
+                        # ответ с ошибкой (страница ошибки сервера) не должен заменить загруженный ранее файл
+                        response.raise_for_status()
+                        if downloaded:
+                            logging.warning('Докачка {} невозможна. Загрузка начинается заново.'.format(url))
+                        mode = 'wb'
+                        sha256 = hashlib.sha256()
+                        downloaded = 0
+                        total = int(response.headers['Content-Length']) \
+                            if 'Content-Length' in response.headers and 'Content-Encoding' not in response.headers \
+                            else None
+                        validator = BasicSupplier._get_range_validator(response)
+                        full_response_headers = response.headers
+
+                    next_progress = downloaded + BasicSupplier.DOWNLOAD_PROGRESS_STEP
                     try:
-                        response = requests.get(url, timeout=20)
+                        with open(
+                                file=part,
+                                mode=mode
+                        ) as f_out:
+                            for chunk in response.iter_content(chunk_size=chunk_size):
+                                f_out.write(chunk)
+                                sha256.update(chunk)
+                                downloaded += len(chunk)
+                                if progress:
+                                    progress.downloaded = downloaded
+                                    progress.check()
+                                if downloaded >= next_progress:
+                                    BasicSupplier._log_download_progress(url, downloaded, total)
+                                    next_progress += BasicSupplier.DOWNLOAD_PROGRESS_STEP
                     except Exception as err:
+                        if progress:
+                            progress.check()  # ошибка чтения из ответа, закрытого при отмене
+                        if not isinstance(err, requests.RequestException):
+                            raise
                         logging.error('Возникла ошибка {} при загрузке: {}'.format(err, url))
-                        raise
-                    else:
-                        f_out.write(response.content)
-            finally:
-                logging.debug('{} Запись {}.'.format(constants.LOGGING_FINISH, file))
+                        if attempt == BasicSupplier.DOWNLOAD_RETRIES:
+                            raise
+                        logging.warning(
+                            'Повторная загрузка {} (попытка {} из {}) с позиции {}.'.format(
+                                url, attempt + 1, BasicSupplier.DOWNLOAD_RETRIES, downloaded
+                            )
+                        )
+                        continue
+                break
+            if progress:
+                progress.check()  # закрытый при отмене ответ может закончиться без ошибки
+        except DownloadCancelled:
+            changed = False
+            if os.path.exists(part):
+                os.remove(part)
+            logging.info('Загрузка {} отменена.'.format(url))
+            raise
         finally:
-            logging.info('Файл загружен и сохранён как {}.'.format(file))
+            logging.debug('{} Запись {}.'.format(constants.LOGGING_FINISH, part))
+        if not changed:
+            if progress and not progress.claim():
+                raise DownloadCancelled()
+            return False
+
+        if total is not None and downloaded != total:
+            raise requests.RequestException(
+                'Размер загруженного файла {} ({}) не совпадает с размером на сервере ({})'.format(
+                    file, downloaded, total
+                )
+            )
+        if progress and not progress.claim():
+            os.remove(part)
+            raise DownloadCancelled()
+        os.replace(part, file)
+        logging.info('Файл загружен и сохранён как {} за {:.1f} с.'.format(file, time.monotonic() - started))
+
+        BasicSupplier._record_download(
+            file,
+            url,
+            downloaded,
+            sha256.hexdigest(),
+            etag=full_response_headers.get('ETag'),
+            last_modified=full_response_headers.get('Last-Modified')
+        )
+        return True
+
+    @staticmethod
+    def _download_segment(part: str, url: str, first: int, last: int, validator: str, chunk_size: int) -> None:
+        """
+        Загружает байты с first по last (включительно) файла по ссылке url в соответствующее место файла part.
+        При обрыве соединения загрузка сегмента продолжается с места обрыва.
+        """
+        position = first
+        for attempt in range(1, BasicSupplier.DOWNLOAD_RETRIES + 1):
+            headers = {'Range': 'bytes={}-{}'.format(position, last), 'Accept-Encoding': 'identity'}
+            if validator:
+                headers['If-Range'] = validator
+            try:
+                with requests.get(
+                        url,
+                        headers=headers,
+                        stream=True,
+                        timeout=(BasicSupplier.DOWNLOAD_CONNECT_TIMEOUT, BasicSupplier.DOWNLOAD_READ_TIMEOUT)
+                ) as response:
+                    content_range = BasicSupplier._parse_content_range(response)
+                    if response.status_code != requests.codes.partial_content \
+                            or not content_range or content_range[0] != position:
+                        raise requests.RequestException(
+                            'Сервер не вернул диапазон {}-{} файла {} (файл на сервере изменился?)'.format(
+                                position, last, url
+                            )
+                        )
+                    with open(
+                            file=part,
+                            mode='r+b'
+                    ) as f_out:
+                        f_out.seek(position)
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            f_out.write(chunk)
+                            position += len(chunk)
+                if position != last + 1:
+                    raise requests.RequestException(
+                        'Диапазон {}-{} файла {} загружен не полностью'.format(first, last, url)
+                    )
+            except requests.RequestException as err:
+                if attempt == BasicSupplier.DOWNLOAD_RETRIES:
+                    logging.error('Возникла ошибка {} при загрузке: {}'.format(err, url))
+                    raise
+                logging.warning(
+                    'Ошибка {} при загрузке диапазона {}-{} файла {}. Повтор с позиции {}.'.format(
+                        err, first, last, url, position
+                    )
+                )
+                if position > last + 1:
+                    position = first
+            else:
+                return
+
+    @staticmethod
+    def _download_requests_segmented(file: str, url: str, segments: int, chunk_size: int = 2 ** 20) -> bool:
+        """
+        Загружает с помощью requests файл по ссылке url в файл file,
+        одновременно запрашивая segments диапазонов байт файла в отдельных потоках.
+        Если сервер не поддерживает запросы диапазонов - загружает файл обычным образом.
+        :return: True - файл загружен, False - файл на сервере не изменился
+        """
+        try:
+            head = requests.head(
+                url,
+                headers=dict(BasicSupplier._get_conditional_headers(file, url), **{'Accept-Encoding': 'identity'}),
+                allow_redirects=True,
+                timeout=BasicSupplier.DOWNLOAD_CONNECT_TIMEOUT
+            )
+        except requests.RequestException as err:
+            logging.warning('Ошибка {} при получении метаданных {}'.format(err, url))
+        else:
+            if head.status_code == requests.codes.not_modified:
+                logging.info('Файл {} не изменился с прошлой загрузки. Загрузка пропущена.'.format(url))
+                return False
+            size = int(head.headers.get('Content-Length', 0))
+            if head.ok and head.headers.get('Accept-Ranges') == 'bytes' and 'Content-Encoding' not in head.headers \
+                    and size >= segments * chunk_size:
+                part = file + '.part'
+                bounds = [(size * i // segments, size * (i + 1) // segments - 1) for i in range(segments)]
+                started = time.monotonic()
+                logging.info('Загрузка {} в {} потоков'.format(url, segments))
+                try:
+                    with open(
+                            file=part,
+                            mode='wb'
+                    ) as f_out:
+                        f_out.truncate(size)
+                    with ThreadPoolExecutor(max_workers=segments, thread_name_prefix='segment') as executor:
+                        futures = [
+                            executor.submit(
+                                BasicSupplier._download_segment,
+                                part, url, first, last, BasicSupplier._get_range_validator(head), chunk_size
+                            )
+                            for first, last in bounds
+                        ]
+                    for future in futures:
+                        future.result()
+                except Exception:
+                    if os.path.exists(part):
+                        os.remove(part)  # загруженные сегменты без недостающего бесполезны
+                    raise
+                sha256 = BasicSupplier.file_sha256(part, chunk_size)
+                os.replace(part, file)
+                logging.info('Файл загружен и сохранён как {} за {:.1f} с.'.format(file, time.monotonic() - started))
+                BasicSupplier._record_download(
+                    file,
+                    url,
+                    size,
+                    sha256.hexdigest(),
+                    etag=head.headers.get('ETag'),
+                    last_modified=head.headers.get('Last-Modified')
+                )
+                return True
+        logging.info('Сегментная загрузка {} невозможна. Файл загружается в один поток.'.format(url))
+        return BasicSupplier._download_requests(file, url, chunk_size)
 
     @classmethod
-    def download_alternative(cls) -> None:
+    def _download_http(cls, file: str, url: str) -> bool:
+        """
+        Загружает файл по HTTP с помощью requests в один поток или по сегментам (если cls.DOWNLOAD_SEGMENTS > 1)
+        :return: True - файл загружен, False - файл на сервере не изменился
+        """
+        if cls.DOWNLOAD_SEGMENTS > 1:
+            return cls._download_requests_segmented(file, url, cls.DOWNLOAD_SEGMENTS, cls.DOWNLOAD_CHUNK_SIZE)
+        return cls._download_requests(file, url, cls.DOWNLOAD_CHUNK_SIZE)
+
+    @classmethod
+    def download_alternative(cls) -> bool:
         """
         Загрузка с помощью requests
+        :return: True - файл загружен, False - файл на сервере не изменился
         """
-        cls._download_requests(
+        return cls._download_http(
             file=cls.DOWNLOAD_FILE,
             url=cls.DOWNLOAD_URL_ALTERNATIVE
         )
 
+    @classmethod
+    def input_files(cls) -> List[str]:
+        """
+        Возвращает список входных (нормализованных) файлов поставщика
+        """
+        return [cls.INPUT_FILE]
+
+    @staticmethod
+    def intermediate_file(input_file: str) -> str:
+        """
+        Возвращает файл, в котором в действительности хранится входной файл input_file
+        в формате BasicSupplier.INTERMEDIATE_FORMAT (сам input_file для формата csv)
+        """
+        if BasicSupplier.INTERMEDIATE_FORMAT == 'columns':
+            return os.path.splitext(input_file)[0] + columnar.EXTENSION
+        return input_file
+
+    @classmethod
+    def export_csv(cls) -> None:
+        """
+        Выгружает входные файлы, хранящиеся в колоночном формате, в csv-файлы input_file (для людей)
+        """
+        if BasicSupplier.INTERMEDIATE_FORMAT != 'columns':
+            return
+        for input_file in cls.input_files():
+            try:
+                logging.debug('{} Выгрузка в {}.'.format(constants.LOGGING_START, input_file))
+                columnar.export_csv(BasicSupplier.intermediate_file(input_file), input_file)
+            finally:
+                logging.debug('{} Выгрузка в {}.'.format(constants.LOGGING_FINISH, input_file))
+
     @classmethod
     def normalize_download_file(cls) -> None:
         """
-        Преобразует загруженный файл во входной файл
+        Преобразует загруженные файлы во входные файлы
+        """
+        for input_file in cls.input_files():
+            cls.normalize_input_file(input_file)
+
+    @classmethod
+    def normalize_input_file(cls, input_file: str) -> None:
+        """
+        Преобразует соответствующий загруженный файл во входной файл input_file (один из cls.input_files()).
+        Входные файлы независимы, поэтому их можно получать одновременно в разных процессах.
         """
         cls._rewrite_in_standard_dialect(
             file_in=cls.DOWNLOAD_FILE,
-            file_out=cls.INPUT_FILE,
-            fieldnames=cls.INPUT_FILE_NECESSARY_FIELDS_LIST
+            file_out=BasicSupplier.intermediate_file(cls.INPUT_FILE),
+            fieldnames=cls.INPUT_FILE_NECESSARY_FIELDS_LIST,
+            dialect=cls.DOWNLOAD_DIALECT
         )
 
-    @staticmethod
+    @classmethod
+    def _fix_lines(cls, file: str, lines: Iterable[str]) -> Iterable[str]:
+        """
+        Исправляет строки загружаемого файла file перед разбором как csv (по умолчанию ничего не делает).
+        Переопределяется поставщиками, файлы которых не являются корректными csv-файлами.
+        """
+        return lines
+
+    @classmethod
     def _rewrite_in_standard_dialect(
+            cls,
             file_in: str,
             file_out: str,
             fieldnames: List[str],
@@ -154,38 +1034,501 @@ class BasicSupplier(abc.ABC):
                     file=file_in,
                     mode='r',
                     newline='',
-                    encoding='utf8'
+                    encoding=cls.DOWNLOAD_ENCODING
             ) as f_in:
-                if not dialect:  # если заранее неизвестен диалект - разнюхиваем
-                    dialect = csv.Sniffer().sniff(f_in.read(20000))  # Определяем диалект в файле
-                    f_in.seek(0)  # Восстанавливаем курсор в файле в начальную позицию
-                reader = csv.DictReader(
-                    f_in,
+                cls._write_in_standard_dialect(
+                    lines=cls._fix_lines(file_in, f_in),
+                    file_out=file_out,
+                    fieldnames=fieldnames,
                     dialect=dialect
                 )
-                assert set(fieldnames).issubset(set(reader.fieldnames)), (fieldnames, reader.fieldnames)
-                try:
-                    logging.debug('{} Запись {}.'.format(constants.LOGGING_START, file_out))
-                    with open(
-                            file=file_out,
-                            mode='w',
-                            newline='',
-                            encoding='utf8'
-                    ) as f_out:
-                        writer = csv.DictWriter(
-                            f_out,
-                            fieldnames=fieldnames,
-                            extrasaction='ignore',
-                            dialect=constants.PROJECT_STANDARD_DIALECT
-                        )
-                        writer.writeheader()
-                        for row in reader:
-                            writer.writerow(row)
-                finally:
-                    logging.debug('{} Запись {}.'.format(constants.LOGGING_FINISH, file_out))
         finally:
             logging.debug('{} Чтение {}.'.format(constants.LOGGING_FINISH, file_in))
 
+    @staticmethod
+    def _write_in_standard_dialect(
+            lines: Iterable[str],
+            file_out: str,
+            fieldnames: List[str],
+            dialect: csv.Dialect = None
+    ) -> None:
+        """
+        Записывает csv-содержимое, построчно получаемое из lines, в csv-файл file_out
+        используя стандартный диалект constants.PROJECT_STANDARD_DIALECT
+        (или в колоночный файл file_out, если BasicSupplier.INTERMEDIATE_FORMAT == 'columns').
+        Строки обрабатываются по мере получения, поэтому lines может быть потоком, который ещё загружается.
+        :param lines: строки входного csv-содержимого (с символами конца строки)
+        :param file_out: выходной файл (путь и имя)
+        :param fieldnames: предполагаемые заголовки во входном содержимом
+        :param dialect: диалект входного содержимого задаваемый пользователем (если заранее известен)
+        """
+        lines = iter(lines)
+        if not dialect:  # если заранее неизвестен диалект - разнюхиваем по первым строкам
+            head = []
+            size = 0
+            for line in lines:
+                head.append(line)
+                size += len(line)
+                if size >= 20000:
+                    break
+            dialect = csv.Sniffer().sniff(''.join(head))  # Определяем диалект
+            lines = itertools.chain(head, lines)  # возвращаем прочитанные строки в начало
+        reader = csv.DictReader(
+            lines,
+            dialect=dialect
+        )
+        assert set(fieldnames).issubset(set(reader.fieldnames)), (fieldnames, reader.fieldnames)
+        try:
+            logging.debug('{} Запись {}.'.format(constants.LOGGING_START, file_out))
+            if BasicSupplier.INTERMEDIATE_FORMAT == 'columns':
+                with columnar.ColumnarWriter(file_out, fieldnames) as writer:
+                    writer.writerows(reader)
+                return
+            with open(
+                    file=file_out,
+                    mode='w',
+                    newline='',
+                    encoding='utf8'
+            ) as f_out:
+                writer = csv.DictWriter(
+                    f_out,
+                    fieldnames=fieldnames,
+                    extrasaction='ignore',
+                    dialect=constants.PROJECT_STANDARD_DIALECT
+                )
+                writer.writeheader()
+                for row in reader:
+                    writer.writerow(row)
+        finally:
+            logging.debug('{} Запись {}.'.format(constants.LOGGING_FINISH, file_out))
+
+    @classmethod
+    def parsed_file(cls) -> str:
+        """
+        Возвращает файл, в который сохраняются item'ы, разобранные из входного файла (см. Program.parse_input_files)
+        """
+        return BasicSupplier._put_into_temp_dir('parsed__{}.pickle'.format(cls.SUPPLIER_NAME))
+
+    @classmethod
+    def necessary_fields(cls, input_file: str) -> List[str]:
+        """
+        Возвращает необходимые поля входного файла input_file (одного из cls.input_files())
+        """
+        return cls.INPUT_FILE_NECESSARY_FIELDS_LIST
+
+    @classmethod
+    def iter_items(
+            cls,
+            input_file: str = None,
+            workers: int = 1,
+            ordered: bool = True,
+            fields: List[str] = None,
+            **item_kwargs
+    ) -> Iterator[BaseItem]:
+        """
+        Разбирает входной файл input_file (по умолчанию cls.INPUT_FILE) и возвращает item'ы поставщика (cls.item).
+        Из файла читаются только поля fields: позиции полей определяются один раз по строке заголовков,
+        а item получает словарь только из этих полей. Поэтому стоимость разбора зависит от количества
+        используемых полей, а не от всех полей файла.
+        Если workers > 1, то файл делится на части по границам записей (см. _split_into_chunks),
+        которые разбираются одновременно в workers процессах.
+        :param ordered: возвращать ли item'ы в порядке записей в файле
+                        (если порядок не важен, то False - item'ы возвращаются по мере готовности частей)
+        :param fields: читаемые поля (по умолчанию все необходимые поля, e.g. cls.KEY_FIELDS для brand, mpn, prefix);
+                       должны включать все поля, которые читает cls.item с аргументами item_kwargs
+        :param item_kwargs: дополнительные аргументы cls.item (full_parse, inventory)
+        """
+        input_file = input_file or cls.INPUT_FILE
+        necessary_fields = cls.necessary_fields(input_file)
+        fields = fields or necessary_fields
+        if BasicSupplier.INTERMEDIATE_FORMAT == 'columns':
+            yield from cls._iter_columnar_items(
+                BasicSupplier.intermediate_file(input_file), necessary_fields, fields, workers, ordered, item_kwargs
+            )
+            return
+        try:
+            logging.debug('{} Чтение {}.'.format(constants.LOGGING_START, input_file))
+            with open(
+                    file=input_file,
+                    newline='',
+                    encoding='utf8'
+            ) as f_in:
+                csv_reader = csv.reader(f_in, dialect=constants.PROJECT_STANDARD_DIALECT)
+                fieldnames = next(csv_reader)
+                assert set(necessary_fields).issubset(set(fieldnames)), \
+                    'INPUT FILE NECESSARY FIELDS LIST: {}\nINPUT FILE ACTUAL FIELDS LIST:    {}'.format(
+                        sorted(necessary_fields),
+                        sorted(fieldnames)
+                    )
+                positions = [fieldnames.index(field) for field in fields]
+                if workers <= 1:
+                    yield from cls._make_items(BasicSupplier._project_rows(csv_reader, fields, positions), item_kwargs)
+                    return
+
+            parts = max(workers, os.path.getsize(input_file) // cls.PARSE_CHUNK_SIZE)
+            collect = converters.active_collector() is not None
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for start, end in cls._split_into_chunks(input_file, parts):
+                    pending.append(
+                        executor.submit(
+                            BasicSupplier._parse_chunk, cls, input_file, start, end, fields, positions, item_kwargs,
+                            collect
+                        )
+                    )
+                    if len(pending) >= 2 * workers:  # в памяти не более 2 * workers разобранных частей
+                        yield from BasicSupplier._pop_parsed_chunk(pending, ordered)
+                while pending:
+                    yield from BasicSupplier._pop_parsed_chunk(pending, ordered)
+        finally:
+            logging.debug('{} Чтение {}.'.format(constants.LOGGING_FINISH, input_file))
+
+    @classmethod
+    def key_items(cls, input_file: str = None, workers: int = 1, ordered: bool = True) -> Iterator[BaseItem]:
+        """
+        Возвращает item'ы поставщика только с brand, mpn, prefix (и производными от них),
+        читая из входного файла только поля cls.KEY_FIELDS
+        """
+        return cls.iter_items(input_file, workers, ordered, fields=cls.KEY_FIELDS)
+
+    @classmethod
+    def _make_items(cls, rows: Iterable[dict], item_kwargs: dict) -> Iterator[BaseItem]:
+        """
+        Создаёт item'ы из записей rows частями по cls.PARSE_BATCH_SIZE записей:
+        значения полей full_parse преобразуются по столбцам, каждое различное значение столбца - один раз
+        (см. BaseItem.from_batch)
+        """
+        rows = iter(rows)
+        while True:
+            batch = list(itertools.islice(rows, cls.PARSE_BATCH_SIZE))
+            if not batch:
+                return
+            yield from cls.item.from_batch(batch, **item_kwargs)
+
+    @staticmethod
+    def _project_rows(rows: Iterable[List[str]], fields: List[str], positions: List[int]) -> Iterator[dict]:
+        """
+        Возвращает из записей rows (списков значений) словари только с полями fields,
+        значения которых находятся в записях на позициях positions
+        """
+        getter = operator.itemgetter(*positions)
+        single = len(positions) == 1  # itemgetter с одной позицией возвращает значение, а не кортеж
+        for row in rows:
+            if row:  # пустые строки пропускаются, как в csv.DictReader
+                values = getter(row)
+                yield dict(zip(fields, (values,) if single else values))
+
+    @classmethod
+    def _iter_columnar_items(
+            cls,
+            file: str,
+            necessary_fields: List[str],
+            fields: List[str],
+            workers: int,
+            ordered: bool,
+            item_kwargs: dict
+    ) -> Iterator[BaseItem]:
+        """
+        Разбирает колоночный файл file (см. iter_items), читая из него только столбцы fields.
+        Если workers > 1, то записи делятся на части, которые разбираются одновременно в workers процессах.
+        """
+        try:
+            logging.debug('{} Чтение {}.'.format(constants.LOGGING_START, file))
+            fieldnames, rows = columnar.read_header(file)
+            assert set(necessary_fields).issubset(set(fieldnames)), \
+                'INPUT FILE NECESSARY FIELDS LIST: {}\nINPUT FILE ACTUAL FIELDS LIST:    {}'.format(
+                    sorted(necessary_fields),
+                    sorted(fieldnames)
+                )
+            if workers <= 1:
+                rows = (dict(zip(fields, row)) for row in columnar.iter_rows(file, fields))
+                yield from cls._make_items(rows, item_kwargs)
+                return
+
+            parts = max(workers, os.path.getsize(file) // cls.PARSE_CHUNK_SIZE)
+            collect = converters.active_collector() is not None
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for i in range(parts):
+                    start, end = rows * i // parts, rows * (i + 1) // parts
+                    if start == end:
+                        continue
+                    pending.append(
+                        executor.submit(
+                            BasicSupplier._parse_columnar_chunk, cls, file, start, end, fields, item_kwargs, collect
+                        )
+                    )
+                    if len(pending) >= 2 * workers:  # в памяти не более 2 * workers разобранных частей
+                        yield from BasicSupplier._pop_parsed_chunk(pending, ordered)
+                while pending:
+                    yield from BasicSupplier._pop_parsed_chunk(pending, ordered)
+        finally:
+            logging.debug('{} Чтение {}.'.format(constants.LOGGING_FINISH, file))
+
+    @staticmethod
+    def _parse_columnar_chunk(
+            supplier,
+            file: str,
+            start: int,
+            end: int,
+            fieldnames: List[str],
+            item_kwargs: dict,
+            collect: bool = False
+    ) -> Tuple[List[BaseItem], Optional[converters.ValidationCollector]]:
+        """
+        Разбирает записи с start по end (не включительно) колоночного файла file поставщика supplier
+        (выполняется в отдельном процессе, см. _collect_items)
+        """
+        return BasicSupplier._collect_items(
+            supplier._make_items(
+                (dict(zip(fieldnames, row)) for row in columnar.iter_rows(file, fieldnames, start, end)),
+                item_kwargs
+            ),
+            collect
+        )
+
+    @staticmethod
+    def _collect_items(
+            items: Iterable[BaseItem],
+            collect: bool
+    ) -> Tuple[List[BaseItem], Optional[converters.ValidationCollector]]:
+        """
+        Создаёт item'ы items в процессе разбора части файла.
+        Если collect (в главном процессе активен converters.ValidationCollector), то ошибки значений собираются
+        в отдельный ValidationCollector, который возвращается вместе с item'ами и объединяется с активным
+        в _pop_parsed_chunk, иначе ошибки пишутся в лог процесса разбора
+        """
+        if not collect:
+            return list(items), None
+        with converters.ValidationCollector('') as collector:
+            return list(items), collector
+
+    @staticmethod
+    def _pop_parsed_chunk(pending: deque, ordered: bool) -> List[BaseItem]:
+        """
+        Дожидается и извлекает из очереди pending разобранную часть файла:
+        первую в очереди, если ordered, иначе - первую готовую.
+        Ошибки значений, собранные при разборе части, добавляются в активный converters.ValidationCollector
+        """
+        if ordered:
+            future = pending.popleft()
+        else:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            future = done.pop()
+            pending.remove(future)
+        items, collector = future.result()
+        if collector is not None and converters.active_collector() is not None:
+            converters.active_collector().merge(collector)
+        return items
+
+    @staticmethod
+    def _split_into_chunks(file: str, parts: int) -> List[Tuple[int, int]]:
+        """
+        Делит csv-файл file в диалекте constants.PROJECT_STANDARD_DIALECT (без строки заголовков)
+        примерно на parts частей [(начальный байт, конечный байт)], границы которых совпадают с границами записей.
+        Перевод строки является границей записи, только если он вне кавычек, т.е. если до него
+        чётное количество кавычек (удвоенные кавычки внутри значений чётность не меняют).
+        """
+        size = os.path.getsize(file)
+        with open(
+                file=file,
+                mode='rb'
+        ) as f_in:
+            header_end = len(f_in.readline())  # заголовки полей не содержат кавычек и переводов строки
+            targets = deque(header_end + (size - header_end) * i // parts for i in range(1, parts))
+            bounds = [header_end]
+            odd = False  # нечётно ли количество кавычек от начала данных до текущей позиции
+            base = header_end  # позиция начала текущего блока в файле
+            while targets:
+                block = f_in.read(2 ** 20)
+                if not block:
+                    break
+                position = 0  # позиция в блоке, до которой учтены кавычки
+                while targets and targets[0] < base + len(block):
+                    start = max(targets[0] - base, position)
+                    odd ^= block.count(b'"', position, start) % 2 == 1
+                    position = start
+                    newline = block.find(b'\n', position)
+                    if newline == -1:
+                        break
+                    odd ^= block.count(b'"', position, newline) % 2 == 1
+                    position = newline + 1
+                    if not odd:
+                        bounds.append(base + position)
+                        while targets and targets[0] < base + position:
+                            targets.popleft()
+                odd ^= block.count(b'"', position) % 2 == 1
+                base += len(block)
+        bounds.append(size)
+        return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+    @staticmethod
+    def _parse_chunk(
+            supplier,
+            file: str,
+            start: int,
+            end: int,
+            fields: List[str],
+            positions: List[int],
+            item_kwargs: dict,
+            collect: bool = False
+    ) -> Tuple[List[BaseItem], Optional[converters.ValidationCollector]]:
+        """
+        Разбирает байты с start по end (не включительно) входного файла file поставщика supplier,
+        читая только поля fields с позиций positions (выполняется в отдельном процессе, см. _collect_items)
+        """
+        with open(
+                file=file,
+                mode='rb'
+        ) as f_in:
+            f_in.seek(start)
+            text = f_in.read(end - start).decode('utf8')
+        reader = csv.reader(
+            io.StringIO(text, newline=''),
+            dialect=constants.PROJECT_STANDARD_DIALECT
+        )
+        return BasicSupplier._collect_items(
+            supplier._make_items(BasicSupplier._project_rows(reader, fields, positions), item_kwargs),
+            collect
+        )
+
+    @classmethod
+    def stream_files(cls) -> List[Tuple[str, str, List[str], str, str]]:
+        """
+        Возвращает описание файлов поставщика для потоковой нормализации:
+        [(загружаемый файл, входной файл, необходимые поля, url, url на альтернативном сервере)]
+        """
+        return [
+            (
+                cls.DOWNLOAD_FILE,
+                cls.INPUT_FILE,
+                cls.INPUT_FILE_NECESSARY_FIELDS_LIST,
+                cls.DOWNLOAD_URL,
+                cls.DOWNLOAD_URL_ALTERNATIVE
+            )
+        ]
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _open_stream_curl(url: str, userpassword: str = None) -> Iterator[BinaryIO]:
+        """
+        Открывает загружаемое с помощью pycurl содержимое по ссылке url как бинарный поток.
+        pycurl пишет в канал (pipe) в отдельном потоке, ошибка загрузки пробрасывается при закрытии потока.
+        Если чтение прервано собственной ошибкой (например, csv.Error), пробрасывается она, а не ошибка записи
+        в закрытый канал, которой после этого завершается загрузка.
+        """
+        read_fd, write_fd = os.pipe()
+        f_in = os.fdopen(read_fd, 'rb')
+        f_out = os.fdopen(write_fd, 'wb')
+        reader_stopped = threading.Event()  # устанавливается перед закрытием читающей стороны канала
+
+        def perform() -> None:
+            curl = BasicSupplier._make_curl(url, userpassword)
+            curl.setopt(curl.WRITEDATA, f_out)
+            try:
+                curl.perform()
+            except pycurl.error as err:
+                if reader_stopped.is_set() and err.args[0] == pycurl.E_WRITE_ERROR:
+                    logging.debug('Загрузка {} прервана, т.к. чтение прекращено.'.format(url))
+                    return
+                logging.error('Ошибка {} при загрузке {}'.format(repr(curl.errstr()), url))
+                raise
+            finally:
+                curl.close()
+                f_out.close()  # читающая сторона получит конец файла
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='stream')
+        try:
+            future = executor.submit(perform)
+            try:
+                yield f_in
+            except Exception:
+                reader_stopped.set()
+                f_in.close()
+                # чтение могло прерваться из-за обрыва загрузки (загрузка завершилась ошибкой раньше, чем
+                # прервано чтение) - тогда пробрасываем ошибку загрузки, ошибка чтения остаётся в её контексте
+                error = future.exception()
+                if isinstance(error, pycurl.error):
+                    raise error
+                raise
+            future.result()
+        finally:
+            reader_stopped.set()
+            f_in.close()  # если чтение прервано - загрузка прервётся ошибкой записи в закрытый канал
+            executor.shutdown()
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _open_stream_requests(url: str) -> Iterator[BinaryIO]:
+        """
+        Открывает загружаемое с помощью requests содержимое по ссылке url как бинарный поток
+        """
+        with requests.get(
+                url,
+                headers={'Accept-Encoding': 'gzip, deflate'},
+                stream=True,
+                timeout=(BasicSupplier.DOWNLOAD_CONNECT_TIMEOUT, BasicSupplier.DOWNLOAD_READ_TIMEOUT)
+        ) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True  # сжатое содержимое распаковывается при чтении
+            yield response.raw
+
+    @classmethod
+    def _stream_normalize(
+            cls,
+            stream: BinaryIO,
+            download_file: str,
+            file_out: str,
+            fieldnames: List[str]
+    ) -> HashingReader:
+        """
+        Нормализует содержимое бинарного потока stream прямо при загрузке и записывает его в файл file_out
+        :param download_file: имя, под которым файл сохранялся бы при обычной загрузке (для _fix_lines)
+        :return: обёртка над потоком с хешем и размером прочитанного содержимого
+        """
+        hashing_reader = HashingReader(stream)
+        with io.TextIOWrapper(
+                io.BufferedReader(hashing_reader, buffer_size=cls.DOWNLOAD_CHUNK_SIZE),
+                encoding=cls.DOWNLOAD_ENCODING,
+                newline=''
+        ) as f_in:
+            cls._write_in_standard_dialect(
+                lines=cls._fix_lines(download_file, f_in),
+                file_out=file_out,
+                fieldnames=fieldnames,
+                dialect=cls.DOWNLOAD_DIALECT
+            )
+        return hashing_reader
+
+    @classmethod
+    def download_and_normalize(cls, alternative: bool = False) -> bool:
+        """
+        Потоковая загрузка с нормализацией: загружаемое содержимое сразу преобразуется во входной файл,
+        загруженный файл на диск не записывается
+        :param alternative: если False, то загрузка с помощью pycurl, иначе - с помощью requests
+        :return: True - файл загружен
+        """
+        for download_file, input_file, fieldnames, url, url_alternative in cls.stream_files():
+            if alternative:
+                url = url_alternative
+                stream = cls._open_stream_requests(url)
+            else:
+                stream = cls._open_stream_curl(url, cls.DOWNLOAD_USERPASSWORD)
+            intermediate_file = BasicSupplier.intermediate_file(input_file)
+            part = intermediate_file + '.part'
+            started = time.monotonic()
+            logging.info('Потоковая загрузка и нормализация {}'.format(url))
+            with stream as f_in:
+                hashing_reader = cls._stream_normalize(f_in, download_file, part, fieldnames)
+            os.replace(part, intermediate_file)  # только после успешного завершения загрузки
+            BasicSupplier._record_download(download_file, url, hashing_reader.size, hashing_reader.sha256.hexdigest())
+            logging.info(
+                'Файл {} загружен и нормализован как {} за {:.1f} с.'.format(
+                    url, intermediate_file, time.monotonic() - started
+                )
+            )
+        return True
+
 
 class Keystone(BasicSupplier):
     item = KeystoneItem
@@ -195,12 +1538,19 @@ class Keystone(BasicSupplier):
         'SouthEastQty', 'TexasQty', 'PacificNWQty', 'GreatLakesQty', 'CaliforniaQty', 'TotalQty', 'VendorName',
         'UPCCode', 'Prop65Toxicity', 'HazardousMaterial'
     ]
+    KEY_FIELDS = ['VendorName', 'PartNumber', 'VenCode']
+    SPECIFIC_FIELDS = [
+        'LongDescription', 'JobberPrice', 'Cost', 'Fedexable', 'ExeterQty', 'MidWestQty', 'SouthEastQty',
+        'TexasQty', 'PacificNWQty', 'GreatLakesQty', 'CaliforniaQty', 'TotalQty', 'UPCCode', 'Prop65Toxicity',
+        'HazardousMaterial'
+    ]
     SUPPLIER_NAME = 'Keystone'
     DOWNLOAD_FILE = BasicSupplier._put_into_temp_dir('downloaded__{}.csv'.format(SUPPLIER_NAME))
     INPUT_FILE = BasicSupplier._put_into_temp_dir('input__{}.csv'.format(SUPPLIER_NAME))
     DOWNLOAD_URL = '*******'
     DOWNLOAD_USERPASSWORD = '*******'
     DOWNLOAD_URL_ALTERNATIVE = '*******'
+    DOWNLOAD_HEDGE = True
 
 
 class Meyer(BasicSupplier):
@@ -222,6 +1572,12 @@ class Meyer(BasicSupplier):
         'Discontinued'
     ]
 
+    KEY_FIELDS = ['Manufacturer Name', 'Meyer SKU']
+    SPECIFIC_FIELDS = [
+        'Description', 'Jobber_Price', 'Customer_Price', 'UPC', 'MAP', 'Length', 'Width', 'Height', 'Weight',
+        'LTL_Eligible', 'Discontinued'
+    ]
+    EXTRA_FIELDS = ('Category', 'Sub_Category')  # для update_meyer_item__category_subcategory
     SUPPLIER_NAME = 'Meyer'
     DOWNLOAD_FILE = BasicSupplier._put_into_temp_dir('downloaded__{}_Pricing.csv'.format(SUPPLIER_NAME))
     DOWNLOAD_FILE_INVENTORY = BasicSupplier._put_into_temp_dir('downloaded__{}_Inventory.csv'.format(SUPPLIER_NAME))
@@ -234,74 +1590,89 @@ class Meyer(BasicSupplier):
 
     DOWNLOAD_URL_ALTERNATIVE = '*******'
     DOWNLOAD_URL_ALTERNATIVE_INVENTORY = '*******'
+    DOWNLOAD_HEDGE = True
 
-    @classmethod
-    def normalize_download_file(cls) -> None:
-        """
-        Преобразует загруженный файл во входной файл
-        """
-        cls._rewrite_with_triple_quotes(cls.DOWNLOAD_FILE)
+    class MeyerDialect(csv.Dialect):
+        delimiter = ','
+        quotechar = '"'
+        escapechar = None
+        doublequote = True
+        skipinitialspace = False
+        lineterminator = '\r\n'
+        quoting = csv.QUOTE_MINIMAL
 
-        class MeyerDialect(csv.Dialect):
-            delimiter = ','
-            quotechar = '"'
-            escapechar = None
-            doublequote = True
-            skipinitialspace = False
-            lineterminator = '\r\n'
-            quoting = csv.QUOTE_MINIMAL
+    DOWNLOAD_DIALECT = MeyerDialect()
 
-        cls._rewrite_in_standard_dialect(
-            file_in=cls.DOWNLOAD_FILE,
-            file_out=cls.INPUT_FILE,
-            fieldnames=cls.INPUT_FILE_NECESSARY_FIELDS_LIST,
-            dialect=MeyerDialect()
-        )
+    @classmethod
+    def normalize_input_file(cls, input_file: str) -> None:
+        if input_file != cls.INPUT_FILE_INVENTORY:
+            super(Meyer, cls).normalize_input_file(input_file)
+            return
 
         cls._rewrite_in_standard_dialect(
             file_in=cls.DOWNLOAD_FILE_INVENTORY,
-            file_out=cls.INPUT_FILE_INVENTORY,
+            file_out=BasicSupplier.intermediate_file(cls.INPUT_FILE_INVENTORY),
             fieldnames=cls.INPUT_FILE_INVENTORY_NECESSARY_FIELDS_LIST,
-            dialect=MeyerDialect()
+            dialect=cls.DOWNLOAD_DIALECT
         )
 
-    @staticmethod
-    def _rewrite_with_triple_quotes(file):
-        temp = file + '.temp'
-        shutil.move(file, temp)
+    @classmethod
+    def necessary_fields(cls, input_file: str) -> List[str]:
+        if input_file == cls.INPUT_FILE_INVENTORY:
+            return cls.INPUT_FILE_INVENTORY_NECESSARY_FIELDS_LIST
+        return super(Meyer, cls).necessary_fields(input_file)
+
+    @classmethod
+    def _fix_lines(cls, file: str, lines: Iterable[str]) -> Iterable[str]:
+        """
+        В файле pricing кавычки в конце значения поля не удвоены (например, 12"",) - исправляем
+        """
+        if file != cls.DOWNLOAD_FILE:
+            return lines
         p = re.compile(r'([^"])"",')
-        with open(
-                file=temp,
-                mode='r',
-                encoding='utf8'
-        ) as f_in:
-            with open(
-                    file=file,
-                    mode='w',
-                    encoding='utf8'
-            ) as f_out:
-                for row in f_in:
-                    f_out.write(p.sub(r'\g<1>""",', row))
-        os.remove(temp)
+        return (p.sub(r'\g<1>""",', line) for line in lines)
 
     @classmethod
-    def download(cls) -> None:
-        super(Meyer, cls).download()
+    def stream_files(cls) -> List[Tuple[str, str, List[str], str, str]]:
+        return super(Meyer, cls).stream_files() + [
+            (
+                cls.DOWNLOAD_FILE_INVENTORY,
+                cls.INPUT_FILE_INVENTORY,
+                cls.INPUT_FILE_INVENTORY_NECESSARY_FIELDS_LIST,
+                cls.DOWNLOAD_URL_INVENTORY,
+                cls.DOWNLOAD_URL_ALTERNATIVE_INVENTORY
+            )
+        ]
+
+    @classmethod
+    def download(cls) -> bool:
+        changed = super(Meyer, cls).download()
 
-        cls._download_curl(
+        changed_inventory = cls._download_primary(
             file=cls.DOWNLOAD_FILE_INVENTORY,
             url=cls.DOWNLOAD_URL_INVENTORY,
-            userpassword=cls.DOWNLOAD_USERPASSWORD
+            userpassword=cls.DOWNLOAD_USERPASSWORD,
+            url_alternative=cls.DOWNLOAD_URL_ALTERNATIVE_INVENTORY
         )
+        return changed or changed_inventory
 
     @classmethod
-    def download_alternative(cls) -> None:
-        super(Meyer, cls).download_alternative()
+    def download_alternative(cls) -> bool:
+        changed = super(Meyer, cls).download_alternative()
 
-        cls._download_requests(
+        changed_inventory = cls._download_http(
             file=cls.DOWNLOAD_FILE_INVENTORY,
             url=cls.DOWNLOAD_URL_ALTERNATIVE_INVENTORY
         )
+        return changed or changed_inventory
+
+    @classmethod
+    def download_files(cls) -> List[str]:
+        return [cls.DOWNLOAD_FILE, cls.DOWNLOAD_FILE_INVENTORY]
+
+    @classmethod
+    def input_files(cls) -> List[str]:
+        return [cls.INPUT_FILE, cls.INPUT_FILE_INVENTORY]
 
 
 class Premier(BasicSupplier):
@@ -316,113 +1687,70 @@ class Premier(BasicSupplier):
         'Part Description', 'Inventory Count', 'Inventory Type'
     ]
 
+    KEY_FIELDS = ['Brand', 'SKU', 'Line Code']
+    SPECIFIC_FIELDS = [
+        'Distributor_Cost', 'Package_Quantity', 'Core_Price', 'UPC', 'Part_Description', 'Inventory_Count',
+        'Inventory_Type'
+    ]
     SUPPLIER_NAME = 'Premier'
     DOWNLOAD_FILE = BasicSupplier._put_into_temp_dir('downloaded__{}.zip'.format(SUPPLIER_NAME))
-    TEMP_INPUT_FILE_NAME = BasicSupplier._put_into_temp_dir('temp_input__{}.csv'.format(SUPPLIER_NAME))
     INPUT_FILE = BasicSupplier._put_into_temp_dir('input__{}.csv'.format(SUPPLIER_NAME))
+    ZIP_MEMBER = 'AmazonExport.csv'  # необходимый файл в загружаемом архиве
 
     DOWNLOAD_URL = '*******'
     DOWNLOAD_USERPASSWORD = '*******'
 
     DOWNLOAD_URL_ALTERNATIVE = '*******'
+    DOWNLOAD_HEDGE = True
+    STREAMING = False  # оглавление zip-архива находится в его конце, поэтому архив сначала сохраняется на диск
+    DOWNLOAD_ENCODING = 'cp1251'
 
-    @classmethod
-    def normalize_download_file(cls) -> None:
-        """
-        Преобразует загруженный файл во входной файл
-        """
-        cls._extract_downloaded_zip()
-        cls._remove_null_bytes()
+    class PremierDialect(csv.Dialect):
+        delimiter = '|'
+        quotechar = None
+        escapechar = None
+        doublequote = False
+        skipinitialspace = False
+        lineterminator = '\r\n'
+        quoting = csv.QUOTE_NONE
 
-        class PremierDialect(csv.Dialect):
-            delimiter = '|'
-            quotechar = None
-            escapechar = None
-            doublequote = False
-            skipinitialspace = False
-            lineterminator = '\r\n'
-            quoting = csv.QUOTE_NONE
-
-        cls._rewrite_in_standard_dialect(
-            file_in=cls.TEMP_INPUT_FILE_NAME,
-            file_out=cls.INPUT_FILE,
-            fieldnames=cls.INPUT_FILE_NECESSARY_FIELDS_LIST,
-            dialect=PremierDialect()
-        )
-
-        os.remove(cls.TEMP_INPUT_FILE_NAME)
+    DOWNLOAD_DIALECT = PremierDialect()
 
     @classmethod
-    def _extract_downloaded_zip(cls) -> None:
+    def normalize_input_file(cls, input_file: str) -> None:
         """
-        Извлекает необходимый файл из архива в директории загруженных файлов.
-        Сохраняет извлеченный файл в директории входных файлов.
+        Преобразует загруженный файл во входной файл.
+        Необходимый файл читается прямо из архива и перекодируется по частям,
+        поэтому на диск записывается только входной файл, а расход памяти не зависит от размера файла.
         """
-        member = 'AmazonExport.csv'
         try:
             logging.debug(
-                '{} Извлечение из архива {} файла {} и сохранение его как {}.'.format(
-                    constants.LOGGING_START,
-                    cls.DOWNLOAD_FILE,
-                    member,
-                    cls.TEMP_INPUT_FILE_NAME
-                )
+                '{} Чтение из архива {} файла {}.'.format(constants.LOGGING_START, cls.DOWNLOAD_FILE, cls.ZIP_MEMBER)
             )
-            zip_file = zipfile.ZipFile(cls.DOWNLOAD_FILE)
-            zip_file.extract(member=member, path=constants.PARSE_SUPPLIERS_FILES_TEMP_DIR)
-            shutil.move(os.path.join(constants.PARSE_SUPPLIERS_FILES_TEMP_DIR, member), cls.TEMP_INPUT_FILE_NAME)
+            with zipfile.ZipFile(cls.DOWNLOAD_FILE) as zip_file:
+                with zip_file.open(cls.ZIP_MEMBER) as member:
+                    with io.TextIOWrapper(
+                            member,
+                            encoding=cls.DOWNLOAD_ENCODING,
+                            newline=''
+                    ) as f_in:
+                        cls._write_in_standard_dialect(
+                            lines=cls._fix_lines(cls.DOWNLOAD_FILE, f_in),
+                            file_out=BasicSupplier.intermediate_file(cls.INPUT_FILE),
+                            fieldnames=cls.INPUT_FILE_NECESSARY_FIELDS_LIST,
+                            dialect=cls.DOWNLOAD_DIALECT
+                        )
         finally:
             logging.debug(
-                '{} Извлечение из архива {} файла {} и сохранение его как {}.'.format(
-                    constants.LOGGING_FINISH,
-                    cls.DOWNLOAD_FILE,
-                    member,
-                    cls.TEMP_INPUT_FILE_NAME
-                )
+                '{} Чтение из архива {} файла {}.'.format(constants.LOGGING_FINISH, cls.DOWNLOAD_FILE, cls.ZIP_MEMBER)
             )
 
     @classmethod
-    def _remove_null_bytes(cls) -> None:
+    def _fix_lines(cls, file: str, lines: Iterable[str]) -> Iterable[str]:
         """
-        Удаляет NULL-байты в извлеченном из архива файле AmazonExport.csv (Необходимо для работы модуля csv)
-        Перезаписывает файл с уже удаленными NULL-байтами в директории входных файлов
+        Удаляет NULL-байты из строк файла AmazonExport.csv (Необходимо для работы модуля csv)
         """
-        try:
-            logging.debug(
-                '{} Перезапись файла {} в кодировке UTF-8 без NULL-bytes.'.format(
-                    constants.LOGGING_START,
-                    cls.TEMP_INPUT_FILE_NAME
-                )
-            )
-            try:
-                logging.debug('{} Чтение {}.'.format(constants.LOGGING_START, cls.TEMP_INPUT_FILE_NAME))
-                with open(
-                        file=cls.TEMP_INPUT_FILE_NAME,
-                        mode='r',
-                        encoding="cp1251"
-                ) as f_in:
-                    data = f_in.read()
-                    if '\0' in data:
-                        data = data.replace('\0', '')
-            finally:
-                logging.debug('{} Чтение {}.'.format(constants.LOGGING_FINISH, cls.TEMP_INPUT_FILE_NAME))
-            try:
-                logging.debug('{} Запись {}.'.format(constants.LOGGING_START, cls.TEMP_INPUT_FILE_NAME))
-                with open(
-                        file=cls.TEMP_INPUT_FILE_NAME,
-                        mode='w',
-                        encoding='utf8'
-                ) as f_out:
-                    f_out.write(data)
-            finally:
-                logging.debug('{} Запись {}.'.format(constants.LOGGING_FINISH, cls.TEMP_INPUT_FILE_NAME))
-        finally:
-            logging.debug(
-                '{} Перезапись файла {} в кодировке UTF-8 без NULL-bytes.'.format(
-                    constants.LOGGING_FINISH,
-                    cls.TEMP_INPUT_FILE_NAME
-                )
-            )
+        return (line.replace('\0', '') for line in lines)
 
 
 class Trans(BasicSupplier):
@@ -437,12 +1765,17 @@ class Trans(BasicSupplier):
         'LINE', 'CLASS', 'PART_NUMBER_FULL', 'CA', 'TX', 'FL', 'CO', 'OH', 'ID', 'PA', 'LIST_PRICE', 'JOBBER_PRICE',
         'TOTAL', 'STATUS'
     ]
+    KEY_FIELDS = ['LINE', 'PART_NUMBER_FULL']
+    SPECIFIC_FIELDS = [
+        'CA', 'TX', 'FL', 'CO', 'OH', 'ID', 'PA', 'LIST_PRICE', 'JOBBER_PRICE', 'TOTAL', 'STATUS'
+    ]
     SUPPLIER_NAME = 'Trans'
     DOWNLOAD_FILE = BasicSupplier._put_into_temp_dir('downloaded__{}.txt'.format(SUPPLIER_NAME))
     INPUT_FILE = BasicSupplier._put_into_temp_dir('input__{}.csv'.format(SUPPLIER_NAME))
     DOWNLOAD_URL = '*******'
     DOWNLOAD_USERPASSWORD = '*******'
     DOWNLOAD_URL_ALTERNATIVE = '*******'
+    DOWNLOAD_HEDGE = True
 
 
 class Turn14(BasicSupplier):
@@ -453,35 +1786,34 @@ class Turn14(BasicSupplier):
         'CoreCharge', 'Map', 'Other', 'OtherName', 'EastStock', 'WestStock', 'CentralStock', 'Stock', 'MfrStock',
         'MfrStockDate', 'DropShip', 'DSFee', 'Weight'
     ]
+    KEY_FIELDS = ['PrimaryVendor', 'PartNumber', 'InternalPartNumber']
+    SPECIFIC_FIELDS = [
+        'Description', 'Cost', 'Retail', 'Jobber', 'CoreCharge', 'Map', 'Other', 'OtherName', 'EastStock',
+        'WestStock', 'CentralStock', 'Stock', 'MfrStock', 'MfrStockDate', 'DropShip', 'DSFee', 'Weight'
+    ]
     SUPPLIER_NAME = 'Turn14'
     DOWNLOAD_FILE = BasicSupplier._put_into_temp_dir('downloaded__{}.csv'.format(SUPPLIER_NAME))
     INPUT_FILE = BasicSupplier._put_into_temp_dir('input__{}.csv'.format(SUPPLIER_NAME))
     DOWNLOAD_URL = DOWNLOAD_URL_ALTERNATIVE = '*******'
     DOWNLOAD_USERPASSWORD = '*******'
 
+    class Turn14Dialect(csv.Dialect):
+        delimiter = ','
+        quotechar = '"'
+        escapechar = None
+        doublequote = True
+        skipinitialspace = False
+        lineterminator = '\r\n'
+        quoting = csv.QUOTE_MINIMAL
+
+    DOWNLOAD_DIALECT = Turn14Dialect()
+
     @classmethod
-    def download(cls) -> None:
+    def download(cls) -> bool:
         # файл данного поставщика скачиваем по HTTP с помощью requests в любом случае
-        cls.download_alternative()
+        return cls.download_alternative()
 
     @classmethod
-    def normalize_download_file(cls) -> None:
-        """
-        Преобразует загруженный файл во входной файл
-        """
-
-        class Turn14Dialect(csv.Dialect):
-            delimiter = ','
-            quotechar = '"'
-            escapechar = None
-            doublequote = True
-            skipinitialspace = False
-            lineterminator = '\r\n'
-            quoting = csv.QUOTE_MINIMAL
-
-        cls._rewrite_in_standard_dialect(
-            file_in=cls.DOWNLOAD_FILE,
-            file_out=cls.INPUT_FILE,
-            fieldnames=cls.INPUT_FILE_NECESSARY_FIELDS_LIST,
-            dialect=Turn14Dialect()
-        )
+    def download_and_normalize(cls, alternative: bool = False) -> bool:
+        # файл данного поставщика скачиваем по HTTP с помощью requests в любом случае
+        return super(Turn14, cls).download_and_normalize(alternative=True)